@@ -1,7 +1,7 @@
 import pandas as pd
 import datetime
 import os
-import glob
+import time
 import html
 import csv
 import urllib.request
@@ -18,7 +18,7 @@ from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QComboBox, QTableWidget, QTableWidgetItem, QPushButton, QFileDialog, QMenu,
     QMessageBox, QDialog, QCheckBox, QDialogButtonBox, QLineEdit, QLabel,
-    QDateEdit, QToolBar, QGroupBox, QScrollArea, QFrame, QHeaderView,
+    QDateTimeEdit, QToolBar, QGroupBox, QScrollArea, QFrame, QHeaderView,
     QStatusBar, QTextEdit, QListWidget, QGraphicsBlurEffect, QKeySequenceEdit,
     QShortcut, QStyledItemDelegate, QProgressDialog, QTableView, QStyle,
     QColorDialog, QTabWidget
@@ -26,6 +26,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import (
     Qt,
     QDate,
+    QTime,
     QUrl,
     QTimer,
     QThread,
@@ -46,9 +47,13 @@ import urllib.parse
 import shutil
 import hashlib
 import tempfile
+import multiprocessing
 from functools import lru_cache
 import re
 from PyQt5.QtWidgets import QInputDialog
+import kik_ingest
+from kik_ingest import (KikIngestEngine, IngestError, IngestCancelled, GROUP_LEGEND_FIELDS,
+                        KeywordHits, KeywordMatcher, MessageRow, SearchIndex, build_load_report, clear_case_cache)
 
 # Set up logging (disabled by default)
 # Get user's home directory for storing configuration and data files
@@ -58,13 +63,19 @@ if not USER_HOME or not os.path.exists(USER_HOME):
     USER_HOME = os.environ.get('USERPROFILE', os.getcwd())
 
 log_file = os.path.join(USER_HOME, 'kik_analyzer.log')
+LOAD_REPORT_FILE = os.path.join(USER_HOME, 'kik_load_report.json')  # Stage profile of the last load, when collected
+CASE_CACHE_DIR = os.path.join(USER_HOME, 'KikParser_cache')  # Parsed cases, reused while their input files are unchanged
 logging_enabled = False  # Logging is off by default
 
 # Create logger but don't configure handlers yet
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 # Add a null handler to prevent "No handler found" warnings when logging is disabled
 logger.addHandler(logging.NullHandler())
+# One call site may only log LOG_RATE_LIMIT records per window (shared with the ingestion engine)
+logger.addFilter(kik_ingest.log_rate_limiter)
+LOGGING_OFF = logging.CRITICAL + 1  # Logger level while logging is disabled: no records are created at all
+for _lg in (logger, kik_ingest.logger):
+    _lg.setLevel(LOGGING_OFF)
 
 def enable_logging():
     """Enable logging to file."""
@@ -76,6 +87,11 @@ def enable_logging():
         handler = RotatingFileHandler(log_file, maxBytes=5*1024*1024, backupCount=3)
         handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
         logger.addHandler(handler)
+        # The headless ingestion engine logs to the same file
+        kik_ingest.logger.handlers.clear()
+        kik_ingest.logger.addHandler(handler)
+        for lg in (logger, kik_ingest.logger):
+            lg.setLevel(logging.INFO)
         logging_enabled = True
         logger.info("Logging enabled.")
 
@@ -83,8 +99,12 @@ def disable_logging():
     """Disable logging to file."""
     global logging_enabled
     if logging_enabled:
-        logger.handlers.clear()
-        logger.addHandler(logging.NullHandler())
+        for lg in (logger, kik_ingest.logger):
+            for handler in lg.handlers:
+                handler.close()
+            lg.handlers.clear()
+            lg.addHandler(logging.NullHandler())
+            lg.setLevel(LOGGING_OFF)
         logging_enabled = False
 
 APP_VERSION = "4.5"  # Dual format support (legacy text-msg-data + new data-text/data-media)
@@ -98,9 +118,11 @@ BLUR_KERNEL_SIZE = (401, 401)
 BLUR_SIGMA = 93
 SEARCH_DEBOUNCE_MS = 600  # Increased from 300ms to reduce unnecessary refreshes while typing
 DATE_DEBOUNCE_MS = 1000   # Longer delay for date changes since they're less frequent
+DATE_FILTER_FORMAT = "yyyy-MM-dd HH:mm:ss"  # From/To Date fields, also used in search cache keys
 THUMBNAIL_SIZE = (100, 100)
 MAX_CACHE_SIZE = 200  # Increased from 50 for better performance with large datasets
 PROGRESS_UPDATE_INTERVAL = 100  # Update progress dialog every N items
+INGEST_PROGRESS_INTERVAL = 0.1  # Seconds between progress signals from a background load
 
 
 class ThemeManager:
@@ -1470,7 +1492,9 @@ def set_media_thumbnail_with_tag(table, row, col, content_path, thumb_path):
         table.setCellWidget(row, col, container)
     
 class KeywordHitsDialog(BaseMessagesDialog):
-    HEADERS = ["Date", "Time", "Sender", "Receiver", "Message", "Tags", "Media", "IP", "Port", "Source", "Line Number"]
+    """Messages that hit the selected keyword list; keyword_hits holds (msg, conv_id, matched keywords)."""
+    HEADERS = ["Date", "Time", "Sender", "Receiver", "Message", "Tags", "Media", "IP", "Port", "Source", "Line Number",
+               "Keywords"]
     SORT_OPTIONS = ["Timestamp (Default)", "User/Conversation"]
 
     def __init__(self, keyword_hits, parent=None):
@@ -1515,7 +1539,7 @@ class KeywordHitsDialog(BaseMessagesDialog):
             # Sort by timestamp (default)
             messages.sort(key=lambda x: x[0]['sent_at'] if pd.notna(x[0]['sent_at']) else pd.Timestamp.min)
 
-        for _, (msg, conv_id) in enumerate(messages):
+        for _, (msg, conv_id, matched) in enumerate(messages):
             row = self.table.rowCount()
             self.table.insertRow(row)
             # Use theme-aware default color
@@ -1551,6 +1575,7 @@ class KeywordHitsDialog(BaseMessagesDialog):
             self.table.setItem(row, 9, self.make_item(source_value, bg_color, tooltip=str(source_value)))
             line_number = msg.get('line_number', '')
             self.table.setItem(row, 10, self.make_item(line_number, bg_color))
+            self.table.setItem(row, 11, self.make_item(', '.join(matched), bg_color))
 
         self.table.resizeColumnsToContents()
         self.table.resizeRowsToContents()
@@ -1990,64 +2015,146 @@ class CSVFileDialog(QDialog):
     def get_selected_files(self):
         """Return the list of selected CSV files."""
         return self.selected_files
-        
+
+
+class ProductionsDialog(QDialog):
+    """Pick the unzipped Kik return folders (productions) to load into one session."""
+
+    def __init__(self, folders=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Load Multiple Productions")
+        self.setModal(True)
+        self.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
+        layout = QVBoxLayout(self)
+        layout.setSpacing(10)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        instruction_label = QLabel(
+            "<html><head><style>body { font-size: 26px; } h3 { font-size: 31px; } p { font-size: 26px; }</style></head><body>"
+            "<h3>Load Multiple Productions</h3>"
+            "<p>Add the unzipped Kik data folder of each target account. Each folder must contain "
+            "<b>content</b> and <b>logs</b> subfolders; legacy folders load every CSV in <b>text-msg-data</b>.</p>"
+            "<p>The returns are loaded into one session. Messages that are in more than one return are shown once, "
+            "and the <b>Production</b> column shows which returns each message came from.</p>"
+            "</body></html>"
+        )
+        instruction_label.setWordWrap(True)
+        label_font = QFont()
+        label_font.setPointSize(24)
+        instruction_label.setFont(label_font)
+        layout.addWidget(instruction_label)
+
+        self.folder_list = QListWidget()
+        self.folder_list.addItems(folders or [])
+        layout.addWidget(self.folder_list)
+
+        folder_buttons = QHBoxLayout()
+        add_button = QPushButton("Add Folder...")
+        add_button.clicked.connect(self.add_folder)
+        folder_buttons.addWidget(add_button)
+        remove_button = QPushButton("Remove")
+        remove_button.clicked.connect(lambda: self.folder_list.takeItem(self.folder_list.currentRow()))
+        folder_buttons.addWidget(remove_button)
+        folder_buttons.addStretch()
+        layout.addLayout(folder_buttons)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept_folders)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.setStyleSheet("""
+            QDialog { background-color: #f4f4f9; }
+            QLabel { font-size: 26px !important; font-weight: normal; }
+            QListWidget { font-size: 22px !important; }
+            QPushButton {
+                font-size: 22px !important;
+                padding: 18px 31px !important;
+                min-width: 176px !important;
+                min-height: 55px !important;
+            }
+            QPushButton:hover { background-color: #e0e0e0; }
+        """)
+        self.setMinimumSize(1100, 800)
+        self.resize(1200, 900)
+
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Kik Data Folder - Must contain 'content' and 'logs' subfolders",
+                                                  os.getcwd())
+        if folder and folder not in self.get_folders():
+            self.folder_list.addItem(folder)
+
+    def accept_folders(self):
+        if len(self.get_folders()) < 2:
+            QMessageBox.warning(self, "Load Multiple Productions", "Please add at least two folders.")
+            return
+        self.accept()
+
+    def get_folders(self):
+        """Return the chosen folders in the order they were added."""
+        return [self.folder_list.item(i).text() for i in range(self.folder_list.count())]
+
+
 class SearchWorker(QThread):
     """Background thread for search processing."""
     results_ready = pyqtSignal(list, int)
 
-    def __init__(self, conversations, search_text, search_all, date_from, date_to, keywords, whole_word, selected_conversation, search_whole_word):
+    def __init__(self, conversations, search_text, search_all, date_from, date_to, keywords, whole_word, selected_conversation, search_whole_word,
+                 message_store=None, search_index=None):
         super().__init__()
         self.conversations = conversations
+        self.message_store = message_store
+        self.search_index = search_index  # SearchIndex of message_store, None while it is being built
         self.search_text = search_text
         self.search_all = search_all
         self.date_from = date_from
         self.date_to = date_to
+        # Naive UTC datetimes -> epoch ms, looked up in the sorted sent_at_ms of each conversation
+        self.date_from_ms = pd.Timestamp(date_from).value // 1_000_000
+        self.date_to_ms = pd.Timestamp(date_to).value // 1_000_000
         self.keywords = keywords
         self.whole_word = whole_word
         self.selected_conversation = selected_conversation
         self.search_whole_word = search_whole_word
 
+    def _search_mask(self):
+        """Bool array over the store's rows matching the search text."""
+        if self.search_index is not None:
+            return self.search_index.search_mask(self.search_text, self.search_whole_word)
+        # Without the index, only the messages in the date range are scanned
+        store = self.message_store
+        mask = np.zeros(len(store), dtype=bool)
+        rows = np.sort(store.rows_between(self.date_from_ms, self.date_to_ms))
+        mask[store.search_rows(self.search_text, self.search_whole_word, rows)] = True
+        return mask
+
     def run(self):
         messages_to_display = []
         message_count = 0
         conv_count = 0
         matched_conversations = set()
-
-        def matches_search(msg):
-            if not self.search_text:
-                return True
-            text = self.search_text.lower()
-            fields = [
-                msg['sender'].lower(),
-                msg['receiver'].lower(),
-                msg['message'].lower(),
-                msg['sent_at'].strftime('%Y-%m-%d %H:%M:%S').lower(),
-                msg.get('content_id', '').lower()
-            ]
-            if self.search_whole_word:
-                return any(re.search(r'\b' + re.escape(text) + r'\b', field) for field in fields)
-            return any(text in field for field in fields)
+        mask = self._search_mask() if self.search_text and self.message_store is not None else None
+
+        def matching(conversation, conv_id):
+            """('message', msg, index, conv_id) of the messages of conversation that pass the filters."""
+            # Messages without a timestamp sort last, after any range
+            start, stop = conversation.between(self.date_from_ms, self.date_to_ms)
+            rows = conversation.rows[start:stop]
+            positions = np.arange(start, stop)
+            if mask is not None:
+                keep = mask[rows]
+                rows, positions = rows[keep], positions[keep]
+            store = conversation.store
+            return [('message', MessageRow(store, row), index, conv_id)
+                    for index, row in zip(positions.tolist(), rows.tolist())]
 
         if self.search_all or self.selected_conversation == "All Conversations":
             for conv_id in sorted(self.conversations.keys(), key=lambda x: x[0]):
-                filtered_messages = []
-                for index, msg in enumerate(self.conversations[conv_id]):
-                    if pd.isna(msg['sent_at']):
-                        continue
-                    # Safely handle timezone-aware timestamps
-                    if hasattr(msg['sent_at'], 'tz') and msg['sent_at'].tz is not None:
-                        msg_sent_at = msg['sent_at'].tz_localize(None)
-                    else:
-                        msg_sent_at = msg['sent_at']
-                    if not (self.date_from <= msg_sent_at <= self.date_to):
-                        continue
-                    if not matches_search(msg):
-                        continue
-                    filtered_messages.append((msg, index, conv_id))
+                filtered_messages = matching(self.conversations[conv_id], conv_id)
                 if filtered_messages:
                     conv_str = f"Conversation: {conv_id[0]} <-> {conv_id[1]}" if len(conv_id) == 2 else f"Group: {conv_id[0]}"
                     matched_conversations.add(conv_str)
-                    messages_to_display.extend(('message', msg, index, conv_id) for msg, index, _ in filtered_messages)
+                    messages_to_display.extend(filtered_messages)
                     message_count += len(filtered_messages)
                     conv_count += 1
         else:
@@ -2056,21 +2163,8 @@ class SearchWorker(QThread):
             if conv_id in self.conversations:
                 header_text = f"Conversation: {conv_id[0]} <-> {conv_id[1]}" if len(conv_id) == 2 else f"Group: {conv_id[0]}"
                 matched_conversations.add(header_text)
-                filtered_messages = []
-                for index, msg in enumerate(self.conversations[conv_id]):
-                    if pd.isna(msg['sent_at']):
-                        continue
-                    # Safely handle timezone-aware timestamps
-                    if hasattr(msg['sent_at'], 'tz') and msg['sent_at'].tz is not None:
-                        msg_sent_at = msg['sent_at'].tz_localize(None)
-                    else:
-                        msg_sent_at = msg['sent_at']
-                    if not (self.date_from <= msg_sent_at <= self.date_to):
-                        continue
-                    if not matches_search(msg):
-                        continue
-                    filtered_messages.append((msg, index, conv_id))
-                messages_to_display.extend(('message', msg, index, conv_id) for msg, index, _ in filtered_messages)
+                filtered_messages = matching(self.conversations[conv_id], conv_id)
+                messages_to_display.extend(filtered_messages)
                 message_count = len(filtered_messages)
 
         self.results_ready.emit(messages_to_display, message_count)
@@ -2081,7 +2175,8 @@ class MessageTableModel(QAbstractTableModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.messages_data = []  # List of (item_type, *args) tuples
-        self.headers = ["Date", "Time", "Sender", "Receiver", "Message", "Tags", "Media", "IP", "Port", "Source", "Line Number"]
+        self.headers = ["Date", "Time", "Sender", "Receiver", "Message", "Tags", "Media", "IP", "Port", "Source", "Line Number",
+                        "Production"]
         self.keyword_state = {}
         self.compute_row_color_func = None
         self.get_media_path_func = None
@@ -2136,9 +2231,9 @@ class MessageTableModel(QAbstractTableModel):
                 return val_str
             
             if col == 0:  # Date
-                return msg['sent_at'].strftime('%Y-%m-%d') if pd.notna(msg['sent_at']) else ''
+                return msg['sent_at_text'][:10]
             elif col == 1:  # Time
-                return msg['sent_at'].strftime('%H:%M:%S') if pd.notna(msg['sent_at']) else ''
+                return msg['sent_at_text'][11:]
             elif col == 2:  # Sender
                 return normalize_value(msg.get('sender', ''))
             elif col == 3:  # Receiver
@@ -2165,6 +2260,8 @@ class MessageTableModel(QAbstractTableModel):
                 return os.path.basename(source_str) if source_str else 'Unknown'
             elif col == 10:  # Line Number
                 return normalize_value(msg.get('line_number', ''))
+            elif col == 11:  # Production
+                return msg.get('production', '')
         
         elif role == Qt.BackgroundRole:
             # Compute background color
@@ -2252,7 +2349,45 @@ class MessageTableModel(QAbstractTableModel):
             if item_type == 'message':
                 return args[2]  # Return the conv_id
         return None
-        
+
+
+class GroupLegendModel(QAbstractTableModel):
+    """Read-only table model for the Group Legend dialog: legend rows plus send/receive counts."""
+
+    headers = ['GID', 'Name', 'Code', 'Public', 'Deleted', 'Last join', 'Last activity', 'Send count', 'Receive count']
+
+    def __init__(self, legend_rows, group_counts, parent=None):
+        super().__init__(parent)
+        self.legend_rows = legend_rows
+        self.group_counts = group_counts
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.legend_rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def row_values(self, row):
+        """The values of one row, in header order (counts as ints)."""
+        rec = self.legend_rows[row]
+        send, receive = self.group_counts.get(rec['gid'], (0, 0))
+        return [rec[key] for key in GROUP_LEGEND_FIELDS] + [send, receive]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        rec = self.legend_rows[index.row()]
+        col = index.column()
+        if col < len(GROUP_LEGEND_FIELDS):
+            return rec[GROUP_LEGEND_FIELDS[col]]
+        return str(self.group_counts.get(rec['gid'], (0, 0))[col - len(GROUP_LEGEND_FIELDS)])
+
+
 class UpdateCheckWorker(QThread):
     result = pyqtSignal(object, object)  # (error, data)
 
@@ -2275,6 +2410,88 @@ class UpdateCheckWorker(QThread):
             self.result.emit(e, None)
 
 
+class IngestWorker(QThread):
+    """Runs one ingestion engine call (job) off the GUI thread.
+
+    Progress is forwarded as signals, throttled to one every
+    INGEST_PROGRESS_INTERVAL seconds; stage changes (total 0) and the end of
+    a counted step are always sent. cancel() asks the engine to stop, which
+    it does within about one chunk of the file being read.
+    """
+    progress = pyqtSignal(int, int, str)  # (done, total, label)
+    result = pyqtSignal(object, object)  # (error, data)
+
+    def __init__(self, engine, job, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.job = job
+        self._last_progress = 0.0
+        engine.progress_callback = self._on_progress
+
+    def _on_progress(self, done, total, label):
+        now = time.monotonic()
+        if not total or done >= total or now - self._last_progress >= INGEST_PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress.emit(done, total, label)
+
+    def cancel(self):
+        self.engine.cancel()
+
+    def run(self):
+        try:
+            self.result.emit(None, self.job())
+        except Exception as e:
+            self.result.emit(e, None)
+
+
+class SearchIndexWorker(QThread):
+    """Builds the SearchIndex of a loaded case; searches scan the messages until it is done."""
+    finished_index = pyqtSignal(object, object)  # (case, SearchIndex or None on error)
+
+    def __init__(self, case, parent=None):
+        super().__init__(parent)
+        self.case = case
+
+    def run(self):
+        try:
+            start = time.perf_counter()
+            index = SearchIndex(self.case.messages)
+            logger.info("Search index built: %s rows, %s words in %.2fs",
+                        index.size, len(index.words), time.perf_counter() - start)
+        except Exception:
+            logger.exception("Could not build the search index; searches will scan the messages")
+            index = None
+        self.finished_index.emit(self.case, index)
+
+
+class KeywordHitsWorker(QThread):
+    """Evaluates keyword lists into a KeywordHits in one pass over the messages."""
+    finished_hits = pyqtSignal(object, bool)  # (KeywordHits, whether every list was added)
+
+    def __init__(self, keyword_hits, lists, parent=None):
+        super().__init__(parent)
+        self.keyword_hits = keyword_hits
+        self.lists = lists  # name -> (keywords, whole_word)
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        added = False
+        try:
+            start = time.perf_counter()
+            self.keyword_hits.add(self.lists, cancelled=lambda: self._cancelled)
+            added = True
+            logger.info("Keyword hits of %s list(s) over %s messages in %.2fs",
+                        len(self.lists), len(self.keyword_hits.store), time.perf_counter() - start)
+        except IngestCancelled:
+            logger.info("Keyword hit pass cancelled")
+        except Exception:
+            logger.exception("Could not evaluate the keyword lists; keyword features will match each message")
+        self.finished_hits.emit(self.keyword_hits, added)
+
+
 class MediaThumbnailDelegate(QStyledItemDelegate):
     """Custom delegate for rendering media thumbnails in the table."""
     
@@ -2598,15 +2815,24 @@ class KikAnalyzerGUI(QMainWindow):
         self.reviewed_button = QPushButton("Mark as Reviewed")
         self.reviewed_button.setToolTip("Mark or unmark the selected conversation as reviewed to track analysis progress")
         self.reviewed_button.clicked.connect(self.toggle_reviewed_status)
-        self.df = None
+        self.message_store = None  # MessageStore of the loaded case; conversations index into it
+        self.search_index = None  # SearchIndex of message_store, None until SearchIndexWorker has built it
+        self.search_index_worker = None
+        self.keyword_hits = None  # KeywordHits of message_store; lists it lacks are matched message by message
+        self.keyword_hits_worker = None
+        self.parsed_case = None  # Last ParsedCase returned by the ingestion engine
+        self.load_report = None  # build_load_report() of the last load or supplemental load
+        self.ingest_worker = None  # IngestWorker of a load that is still running
         self.recently_processed = set()
         self.content_folder = None
         self.logs_folder = None
         self.group_legend_by_gid = {}
         self.group_legend_rows = []
+        self.group_counts = {}  # gid -> (send count, receive count) of the loaded messages
         self.media_files = {}
         self.keyword_lists = {}
         self.keyword_whole_word = {}
+        self._keyword_matchers = {}  # (id(keywords), whole_word) -> (keywords, KeywordMatcher), see keyword_matcher()
         self.selected_keyword_list = "Default"
         self.stats_visible = False
         self.prebuilt_tags = ["Evidence", "CSAM", "Child Notable/Age Difficult", "Of Interest"]
@@ -2676,6 +2902,20 @@ class KikAnalyzerGUI(QMainWindow):
             self.keyword_whole_word.get(self.selected_keyword_list, False)
         )
 
+    def keyword_matcher(self, keywords, whole_word):
+        """The KeywordMatcher of a keyword list, compiled once per list.
+
+        Keyword lists are replaced, never changed in place, when they are
+        edited, so a list is recognised by its identity.
+        """
+        key = (id(keywords), bool(whole_word))
+        cached = self._keyword_matchers.get(key)
+        if cached is None or cached[0] is not keywords:
+            if len(self._keyword_matchers) >= 64:
+                self._keyword_matchers.clear()  # Drop the matchers of lists that were replaced
+            cached = self._keyword_matchers[key] = (keywords, KeywordMatcher(keywords, whole_word))
+        return cached[1]
+
     def is_keyword_match(self, message_text, keywords=None, whole_word=None):
         if not message_text:
             return False
@@ -2686,16 +2926,32 @@ class KikAnalyzerGUI(QMainWindow):
             whole_word = default_whole_word
         if not keywords:
             return False
-        text = message_text.lower()
-        for kw in keywords:
-            kw_lower = kw.lower()
-            if whole_word:
-                if re.search(r'\b' + re.escape(kw_lower) + r'\b', text):
-                    return True
-            else:
-                if kw_lower in text:
-                    return True
-        return False
+        return self.keyword_matcher(keywords, whole_word).find(message_text) is not None
+
+    def is_keyword_hit(self, msg, keywords, whole_word):
+        """is_keyword_match() of a message, read from the keyword-hit bitmaps when they have its list."""
+        hits = self.keyword_hits
+        if keywords and hits is not None and isinstance(msg, MessageRow) and msg.store is hits.store:
+            hit = hits.hit(keywords, whole_word, msg.row)
+            if hit is not None:
+                return hit
+        return self.is_keyword_match(msg['message'], keywords, whole_word)
+
+    def keyword_hit_count(self, conversation=None):
+        """Messages of conversation, or of every conversation when None, that the selected list hits."""
+        keywords, whole_word = self._get_keyword_state()
+        if not keywords:
+            return 0
+        mask = self.keyword_hits.mask(keywords, whole_word) if self.keyword_hits is not None else None
+        if mask is not None:
+            return int(mask.sum() if conversation is None else mask[conversation.rows].sum())
+        conversations = self.conversations.values() if conversation is None else [conversation]
+        return sum(
+            1
+            for messages in conversations
+            for msg in messages
+            if self.is_keyword_match(msg['message'], keywords, whole_word)
+        )
 
     def compute_row_color(
         self,
@@ -2721,7 +2977,7 @@ class KikAnalyzerGUI(QMainWindow):
             return tag_color
 
         keywords, whole_word = keyword_state if keyword_state is not None else self._get_keyword_state()
-        if enable_keyword and self.is_keyword_match(msg['message'], keywords, whole_word):
+        if enable_keyword and self.is_keyword_hit(msg, keywords, whole_word):
             return keyword_color
 
         if enable_sender_colors:
@@ -2806,6 +3062,9 @@ class KikAnalyzerGUI(QMainWindow):
                 f.write("\n".join(keywords))
             self.keyword_lists[list_name] = keywords
             self.keyword_whole_word[list_name] = whole_word
+            if self.keyword_hits is not None:
+                self.keyword_hits.discard(list_name)
+                self._update_keyword_hits()
             self.populate_keyword_dropdown()
             self.keyword_selector.setCurrentText(list_name)
             self.save_config()
@@ -2847,6 +3106,8 @@ class KikAnalyzerGUI(QMainWindow):
                 del self.keyword_lists[list_name]
             if list_name in self.keyword_whole_word:
                 del self.keyword_whole_word[list_name]
+            if self.keyword_hits is not None:
+                self.keyword_hits.discard(list_name)
             
             # If the deleted list was selected, switch to default or first available
             if self.selected_keyword_list == list_name:
@@ -2898,6 +3159,8 @@ class KikAnalyzerGUI(QMainWindow):
         self.keyword_lists = {"Default": []}
         self.keyword_whole_word = {"Default": False}
         self.available_tags = set(self.prebuilt_tags)
+        self.ingest_memory_limit_mb = 0  # 0 = no limit
+        self.load_report_enabled = False  # Trace memory per load stage and write LOAD_REPORT_FILE
         if os.path.exists(config_file):
             logger.info("Config file exists, loading...")
             try:
@@ -2911,6 +3174,8 @@ class KikAnalyzerGUI(QMainWindow):
                     # Ensure all prebuilt tags are always included
                     self.available_tags.update(self.prebuilt_tags)
                     self.hotkeys = config.get("hotkeys", self.hotkeys)
+                    self.ingest_memory_limit_mb = int(config.get("ingest_memory_limit_mb", 0) or 0)
+                    self.load_report_enabled = bool(config.get("load_report_enabled", False))
                     # Load logging setting (defaults to False if not present)
                     saved_logging_enabled = config.get("logging_enabled", False)
                     global logging_enabled
@@ -2955,6 +3220,8 @@ class KikAnalyzerGUI(QMainWindow):
             # Ensure logging is disabled by default if no config file exists
             global logging_enabled
             disable_logging()
+        if hasattr(self, 'load_report_action'):
+            self.load_report_action.setChecked(self.load_report_enabled)
         # Load keyword lists from Keywords folder
         if os.path.exists(keywords_dir):
             logger.info(f"Keywords directory exists, loading .txt files...")
@@ -3044,6 +3311,8 @@ class KikAnalyzerGUI(QMainWindow):
             "keyword_lists": self.keyword_lists,
             "keyword_whole_word": self.keyword_whole_word,
             "logging_enabled": logging_enabled,
+            "ingest_memory_limit_mb": self.ingest_memory_limit_mb,
+            "load_report_enabled": self.load_report_enabled,
             "custom_colors_light": custom_colors['light'],
             "custom_colors_dark": custom_colors['dark'],
             "cell_borders": [list(border) for border in self.cell_borders],  # Convert set of tuples to list of lists for JSON
@@ -3165,6 +3434,23 @@ class KikAnalyzerGUI(QMainWindow):
         file_menu.addAction('Manage Tags').triggered.connect(self.manage_tags)
         file_menu.addAction('Manage Hotkeys').triggered.connect(self.manage_hotkeys)
         file_menu.addAction('Load New Data').triggered.connect(self.load_data)
+        productions_action = file_menu.addAction('Load Multiple Productions...')
+        productions_action.setToolTip("Load the Kik returns of several target accounts into one session. Messages in more than one return are shown once, with the returns they came from in the Production column.")
+        productions_action.triggered.connect(self.load_productions)
+        supplement_action = file_menu.addAction('Load Supplemental Data')
+        supplement_action.setToolTip("Add new or changed files in the loaded case's folder (e.g. a supplemental production) without reloading it. Tags, notes and reviewed status are kept.")
+        supplement_action.triggered.connect(self.load_supplemental_data)
+        memory_limit_action = file_menu.addAction('Loading Memory Limit...')
+        memory_limit_action.setToolTip("Stream very large content and log files in chunks so loading stays under a memory limit.")
+        memory_limit_action.triggered.connect(self.set_ingest_memory_limit)
+        self.load_report_action = file_menu.addAction('Collect Load Report')
+        self.load_report_action.setCheckable(True)
+        self.load_report_action.setToolTip(f"Measure the memory used by each loading stage and save the load report to {LOAD_REPORT_FILE}. Loading is slower while this is on.")
+        self.load_report_action.triggered.connect(self.toggle_load_report)
+        file_menu.addAction('Load Report...').triggered.connect(self.show_load_report)
+        clear_cache_action = file_menu.addAction('Clear Case Cache')
+        clear_cache_action.setToolTip("Delete the saved copies of previously loaded cases so the next load parses every file again.")
+        clear_cache_action.triggered.connect(self.clear_case_cache)
         self.check_for_updates_action = file_menu.addAction('Check for updates')
         self.check_for_updates_action.setToolTip("Check GitHub for a newer version of the application. Opens the releases page in your default browser.")
         self.check_for_updates_action.triggered.connect(self.check_for_updates)
@@ -3246,20 +3532,26 @@ class KikAnalyzerGUI(QMainWindow):
         control_layout.addWidget(self.clear_filters_button, 0, 5)
 
         self.date_from_label = QLabel("From Date:")
-        self.date_from_label.setToolTip("Filter messages to show only those sent on or after this date. Leave empty to include all messages from the beginning.")
+        self.date_from_label.setToolTip("Filter messages to show only those sent on or after this date and time (UTC). Leave empty to include all messages from the beginning.")
         control_layout.addWidget(self.date_from_label, 1, 0)
-        self.date_from = QDateEdit()
+        # Date and time: setDate() keeps the time, which starts at the first second of the day
+        self.date_from = QDateTimeEdit()
+        self.date_from.setDisplayFormat(DATE_FILTER_FORMAT)
         self.date_from.setCalendarPopup(True)
         self.date_from.setDate(QDate(2024, 1, 1))
-        self.date_from.setToolTip("Select the start date for filtering messages. Click 'Apply Date Filter' button to apply the date filter.")
+        self.date_from.setTime(QTime(0, 0, 0))
+        self.date_from.setToolTip("Select the start date for filtering messages, and optionally a time of day (UTC) to narrow it further. Click 'Apply Date Filter' button to apply the date filter.")
         control_layout.addWidget(self.date_from, 1, 1)
         self.date_to_label = QLabel("To Date:")
-        self.date_to_label.setToolTip("Filter messages to show only those sent on or before this date. Click 'Apply Date Filter' button to apply the date filter.")
+        self.date_to_label.setToolTip("Filter messages to show only those sent on or before this date and time (UTC). Click 'Apply Date Filter' button to apply the date filter.")
         control_layout.addWidget(self.date_to_label, 1, 2)
-        self.date_to = QDateEdit()
+        # ...and the last second of the day here, so a date alone includes the whole day
+        self.date_to = QDateTimeEdit()
+        self.date_to.setDisplayFormat(DATE_FILTER_FORMAT)
         self.date_to.setCalendarPopup(True)
         self.date_to.setDate(QDate.currentDate())
-        self.date_to.setToolTip("Select the end date for filtering messages. Click 'Apply Date Filter' button to apply the date filter.")
+        self.date_to.setTime(QTime(23, 59, 59))
+        self.date_to.setToolTip("Select the end date for filtering messages, and optionally a time of day (UTC) to narrow it further. Click 'Apply Date Filter' button to apply the date filter.")
         control_layout.addWidget(self.date_to, 1, 3)
         # Add "Apply Date Filter" button next to the "To Date" field
         self.apply_date_filter_button = QPushButton("Apply Date Filter")
@@ -3324,7 +3616,7 @@ class KikAnalyzerGUI(QMainWindow):
         # Configure header: columns resizable so full content can be shown; no tight max so columns can expand
         header = self.message_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Interactive)
-        for col in range(11):
+        for col in range(12):
             header.setSectionResizeMode(col, QHeaderView.Interactive)
             header.setMinimumSectionSize(50)
             header.setMaximumSectionSize(4000)
@@ -3339,6 +3631,8 @@ class KikAnalyzerGUI(QMainWindow):
         self.message_table.setColumnWidth(8, 200)   # Port
         self.message_table.setColumnWidth(9, 560)   # Source
         self.message_table.setColumnWidth(10, 200)  # Line Number
+        self.message_table.setColumnWidth(11, 460)  # Production
+        self.message_table.setColumnHidden(11, True)  # Shown for multi-production sessions
         
         # Configure view
         self.message_table.setWordWrap(True)
@@ -3430,8 +3724,6 @@ class KikAnalyzerGUI(QMainWindow):
         self.date_timer.timeout.connect(self.execute_search)
         self.search_worker = None
         self.search_cache = OrderedDict()  # Cache for search results with size limit
-        # Multi-level caching (Strategy 3)
-        self.date_filtered_cache = OrderedDict()  # Cache for date-filtered results
         # Pre-computed unfiltered state (Strategy 1)
         self.unfiltered_messages = None  # Pre-computed unfiltered messages list
         self.earliest_date = None  # Earliest date in dataset
@@ -3667,35 +3959,12 @@ class KikAnalyzerGUI(QMainWindow):
             dialog.exec()
             return
         
-        # Compute send/receive counts per gid from loaded messages
-        send_count = defaultdict(int)
-        receive_count = defaultdict(int)
-        for conv_id, messages in (self.conversations or {}).items():
-            for msg in messages:
-                src = str(msg.get('source', ''))
-                if 'group_send_msg_platform' in src:
-                    gid_key = msg.get('receiver_gid') or str(msg.get('receiver', '')).replace('_g', '').strip()
-                    if gid_key:
-                        send_count[gid_key] += 1
-                if 'group_receive' in src:
-                    rec = str(msg.get('receiver', ''))
-                    gid_key = rec.replace('_g', '').strip()
-                    if gid_key:
-                        receive_count[gid_key] += 1
-        
-        headers = ['GID', 'Name', 'Code', 'Public', 'Deleted', 'Last join', 'Last activity', 'Send count', 'Receive count']
-        table = QTableWidget(len(self.group_legend_rows), len(headers))
-        table.setHorizontalHeaderLabels(headers)
+        # Counts were computed per GID when the messages were loaded; the view only asks for visible rows
+        model = GroupLegendModel(self.group_legend_rows, self.group_counts, dialog)
+        table = QTableView()
+        table.setModel(model)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         table.setAlternatingRowColors(True)
-        for row_idx, rec in enumerate(self.group_legend_rows):
-            gid = rec.get('gid', '')
-            for col_idx, key in enumerate(['gid', 'name', 'code', 'public', 'deleted', 'last_join_ts', 'last_activity']):
-                val = rec.get(key, '')
-                table.setItem(row_idx, col_idx, QTableWidgetItem(str(val) if val is not None else ''))
-            table.setItem(row_idx, 7, QTableWidgetItem(str(send_count.get(gid, 0))))
-            table.setItem(row_idx, 8, QTableWidgetItem(str(receive_count.get(gid, 0))))
-        
         layout.addWidget(table)
         
         def export_group_legend_csv():
@@ -3705,15 +3974,8 @@ class KikAnalyzerGUI(QMainWindow):
             try:
                 with open(path, 'w', newline='', encoding='utf-8') as f:
                     w = csv.writer(f)
-                    w.writerow(headers)
-                    for rec in self.group_legend_rows:
-                        gid = rec.get('gid', '')
-                        row = [
-                            rec.get('gid', ''), rec.get('name', ''), rec.get('code', ''),
-                            rec.get('public', ''), rec.get('deleted', ''), rec.get('last_join_ts', ''),
-                            rec.get('last_activity', ''), send_count.get(gid, 0), receive_count.get(gid, 0)
-                        ]
-                        w.writerow(row)
+                    w.writerow(model.headers)
+                    w.writerows(model.row_values(row) for row in range(model.rowCount()))
                 self.status_bar.showMessage(f"Group legend exported to {path}")
             except Exception as e:
                 QMessageBox.warning(self, "Export Error", str(e))
@@ -3753,6 +4015,137 @@ class KikAnalyzerGUI(QMainWindow):
         # Save the logging setting to config
         self.save_config()
 
+    def set_ingest_memory_limit(self):
+        """Ask for the memory limit used when reading data files (0 = no limit) and save it."""
+        value, ok = QInputDialog.getInt(
+            self, "Loading Memory Limit",
+            "Memory limit for reading data files, in MB (0 = no limit).\n"
+            "With a limit, large CSV files are read in chunks; use this for multi-GB returns.",
+            self.ingest_memory_limit_mb, 0, 1024 * 1024, 256
+        )
+        if not ok:
+            return
+        self.ingest_memory_limit_mb = value
+        self.save_config()
+        if value:
+            self.status_bar.showMessage(f"Loading memory limit set to {value} MB (applies to the next load)")
+        else:
+            self.status_bar.showMessage("Loading memory limit disabled")
+
+    def toggle_load_report(self, checked):
+        """Turn per-stage memory tracing and the saved load report on or off."""
+        self.load_report_enabled = checked
+        if checked:
+            self.status_bar.showMessage(f"Load report enabled (applies to the next load; saved to {LOAD_REPORT_FILE})")
+        else:
+            self.status_bar.showMessage("Load report disabled")
+        self.save_config()
+
+    def _record_load_report(self, case, kind):
+        """Keep the stage profile of a finished load and, when collection is on, save it as JSON."""
+        self.load_report = build_load_report(case, kind)
+        stages = ", ".join(f"{st['stage']}={st['seconds']:.2f}s" for st in self.load_report['stages'])
+        self.log_message(f"Load report ({kind}): {stages}")
+        if not self.load_report_enabled:
+            return
+        try:
+            with open(LOAD_REPORT_FILE, 'w', encoding='utf-8') as f:
+                json.dump(self.load_report, f, indent=4)
+            self.log_message(f"Load report saved to {LOAD_REPORT_FILE}")
+        except OSError as e:
+            self.log_message(f"Could not save load report: {str(e)}", "ERROR")
+
+    def show_load_report(self):
+        """Open the Load Report dialog: time, rows and memory of each stage and file of the last load."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Load Report")
+        dialog.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
+        dialog.setMinimumSize(1080, 600)
+        dialog.resize(1080, 600)
+        dialog.setStyleSheet(self.theme_manager.get_dialog_stylesheet())
+        layout = QVBoxLayout(dialog)
+        layout.setSpacing(10)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        report = self.load_report
+        if not report:
+            label = QLabel("No load report yet. Load a Kik data folder first; turn on File > Collect Load Report to also measure memory.")
+            label.setWordWrap(True)
+            layout.addWidget(label)
+            btn = QPushButton("Close")
+            btn.clicked.connect(dialog.accept)
+            layout.addWidget(btn)
+            dialog.exec()
+            return
+
+        def number(value, fmt="{:,.0f}"):
+            return "" if value is None else fmt.format(value)
+
+        summary = (
+            f"<b>{'Supplemental load' if report['kind'] == 'supplement' else 'Load'}</b> of {html.escape(report['folder'])} "
+            f"({report['format']} format{', from the case cache' if report['from_cache'] else ''}) at {report['created']}: "
+            f"{report['total_seconds']:.2f} s"
+        )
+        if report['messages'] is not None:
+            summary += f", {report['messages']:,} messages in {report['conversations']:,} conversations"
+        if report['memory_traced']:
+            summary += f"<br>Saved to {html.escape(LOAD_REPORT_FILE)}. Peak MB is memory traced by tracemalloc during the stage; parser processes are not included."
+        else:
+            summary += "<br>Memory was not measured. Turn on File &gt; Collect Load Report and load again to measure it."
+        summary_label = QLabel(summary)
+        summary_label.setWordWrap(True)
+        summary_label.setTextFormat(Qt.RichText)
+        layout.addWidget(summary_label)
+
+        headers = ['Stage', 'Seconds', 'Rows in', 'Rows out', 'Rows/sec', 'Peak MB', 'Process max MB']
+        table = QTableWidget(len(report['stages']), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        table.setAlternatingRowColors(True)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        for row_idx, st in enumerate(report['stages']):
+            values = [
+                st['stage'], number(st['seconds'], "{:.3f}"), number(st['rows_in']), number(st['rows_out']),
+                number(st['rows_per_sec']), number(st['peak_mb'], "{:,.1f}"), number(st['max_rss_mb']),
+            ]
+            for col_idx, val in enumerate(values):
+                table.setItem(row_idx, col_idx, QTableWidgetItem(val))
+        layout.addWidget(table)
+
+        if report['files']:
+            layout.addWidget(QLabel("Files parsed (seconds are per file; files may be parsed in parallel):"))
+            file_headers = ['File', 'Parser', 'MB', 'Rows', 'Seconds', 'Rows/sec']
+            file_table = QTableWidget(len(report['files']), len(file_headers))
+            file_table.setHorizontalHeaderLabels(file_headers)
+            file_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+            file_table.setAlternatingRowColors(True)
+            file_table.setEditTriggers(QTableWidget.NoEditTriggers)
+            for row_idx, fs in enumerate(report['files']):
+                rate = fs['rows'] / fs['seconds'] if fs['rows'] is not None and fs['seconds'] else None
+                values = [
+                    fs['file'], fs['parser'], number(fs['bytes'] and fs['bytes'] / (1024 * 1024), "{:,.1f}"),
+                    number(fs['rows']), number(fs['seconds'], "{:.3f}"), number(rate),
+                ]
+                for col_idx, val in enumerate(values):
+                    file_table.setItem(row_idx, col_idx, QTableWidgetItem(val))
+            file_table.resizeColumnToContents(0)
+            layout.addWidget(file_table)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(dialog.accept)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        dialog.exec()
+
+    def clear_case_cache(self):
+        """Delete all cached cases; the next load of any folder parses its files again."""
+        clear_case_cache(CASE_CACHE_DIR)
+        self.log_message(f"Cleared case cache: {CASE_CACHE_DIR}")
+        self.status_bar.showMessage("Case cache cleared (applies to the next load)")
+
     def schedule_search(self):
         """Schedule a search with debounce for text input."""
         self.status_bar.showMessage("Preparing search...")
@@ -3802,48 +4195,8 @@ class KikAnalyzerGUI(QMainWindow):
         self.search_whole_word.setChecked(False)
         self.search_all.setChecked(False)
         
-        # Use pre-computed dates if available
-        if hasattr(self, 'earliest_date') and self.earliest_date:
-            from_date = QDate(self.earliest_date.year, self.earliest_date.month, self.earliest_date.day)
-            self.date_from.setDate(from_date)
-        else:
-            # Fallback: find dates if not pre-computed
-            earliest_date = None
-            if self.conversations:
-                for conv_id, messages in self.conversations.items():
-                    for msg in messages:
-                        sent_at = msg.get('sent_at')
-                        if sent_at and pd.notna(sent_at):
-                            if hasattr(sent_at, 'tz') and sent_at.tz is not None:
-                                sent_at = sent_at.tz_localize(None)
-                            if earliest_date is None or sent_at < earliest_date:
-                                earliest_date = sent_at
-            if earliest_date:
-                from_date = QDate(earliest_date.year, earliest_date.month, earliest_date.day)
-                self.date_from.setDate(from_date)
-            else:
-                self.date_from.setDate(QDate(2024, 1, 1))
-        
-        if hasattr(self, 'latest_date') and self.latest_date:
-            to_date = QDate(self.latest_date.year, self.latest_date.month, self.latest_date.day)
-            self.date_to.setDate(to_date)
-        else:
-            # Fallback: find dates if not pre-computed
-            latest_date = None
-            if self.conversations:
-                for conv_id, messages in self.conversations.items():
-                    for msg in messages:
-                        sent_at = msg.get('sent_at')
-                        if sent_at and pd.notna(sent_at):
-                            if hasattr(sent_at, 'tz') and sent_at.tz is not None:
-                                sent_at = sent_at.tz_localize(None)
-                            if latest_date is None or sent_at > latest_date:
-                                latest_date = sent_at
-            if latest_date:
-                to_date = QDate(latest_date.year, latest_date.month, latest_date.day)
-                self.date_to.setDate(to_date)
-            else:
-                self.date_to.setDate(QDate.currentDate())
+        # Reset the date range to the days of the first and last message
+        self._reset_date_range()
         
         # Stop any running timers
         if self.search_timer.isActive():
@@ -3863,15 +4216,37 @@ class KikAnalyzerGUI(QMainWindow):
             self.execute_search()
             self.status_bar.showMessage("All filters cleared")
 
+    def _date_range_key(self):
+        """The From/To Date fields as text, as they appear in search cache keys."""
+        return (self.date_from.dateTime().toString(DATE_FILTER_FORMAT),
+                self.date_to.dateTime().toString(DATE_FILTER_FORMAT))
+
+    def _reset_date_range(self):
+        """Set the From/To Date fields to the days of the earliest and latest message (defaults without any)."""
+        bounds = self.message_store.sent_at_bounds() if self.message_store is not None else None
+        if bounds is not None:
+            self.earliest_date, self.latest_date = (pd.Timestamp(ms, unit='ms') for ms in bounds)
+            self.date_from.setDate(QDate(self.earliest_date.year, self.earliest_date.month, self.earliest_date.day))
+            self.date_to.setDate(QDate(self.latest_date.year, self.latest_date.month, self.latest_date.day))
+        else:
+            self.earliest_date = self.latest_date = None
+            self.date_from.setDate(QDate(2024, 1, 1))
+            self.date_to.setDate(QDate.currentDate())
+        self.date_from.setTime(QTime(0, 0, 0))
+        self.date_to.setTime(QTime(23, 59, 59))
+
     def execute_search(self):
-        """Execute the search with multi-level caching (Strategy 3)."""
+        """Execute the search, reusing the cached results of the same filters."""
+        # A supplemental load may be changing the case. Only a search scheduled before the load
+        # gets here (its dialog is modal), and a finished load searches again
+        if self._ingest_running():
+            return
         # Create a unique cache key for final results FIRST (before any status messages)
         cache_key = (
             self.search_bar.text().lower(),
             self.search_whole_word.isChecked(),
             self.search_all.isChecked(),
-            self.date_from.date().toString("yyyy-MM-dd"),
-            self.date_to.date().toString("yyyy-MM-dd"),
+            *self._date_range_key(),
             self.selector.currentText(),
             self.selected_keyword_list
         )
@@ -3887,52 +4262,12 @@ class KikAnalyzerGUI(QMainWindow):
         
         # Cache miss - proceed with search
         logger.info(f"Cache MISS - key not found: {cache_key}")
-        logger.debug(f"Cache size: {len(self.search_cache)}, keys: {list(self.search_cache.keys())[:3]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Cache size: {len(self.search_cache)}, keys: {list(self.search_cache.keys())[:3]}...")
         self.status_bar.showMessage("Loading...")
         self.status_bar.showMessage("Loading... (please wait)")
         logger.info("Executing search in background thread...")
 
-        # Strategy 3: Multi-level caching - check date-filtered cache
-        date_key = (
-            self.date_from.date().toString("yyyy-MM-dd"),
-            self.date_to.date().toString("yyyy-MM-dd"),
-            self.selector.currentText(),
-            self.search_all.isChecked()
-        )
-        search_text = self.search_bar.text().lower()
-        search_whole_word = self.search_whole_word.isChecked()
-        
-        # If we have date-filtered results, reuse them
-        logger.debug(f"Date-filtered cache lookup - key: {date_key}")
-        logger.debug(f"Date-filtered cache size: {len(self.date_filtered_cache)}")
-        if date_key in self.date_filtered_cache:
-            date_filtered_messages = self.date_filtered_cache[date_key]
-            
-            if search_text:
-                # Apply search text filter to date-filtered results
-                logger.info("Reusing date-filtered cache, applying search text filter...")
-                filtered_messages = self._apply_search_filter_to_list(
-                    date_filtered_messages, search_text, search_whole_word
-                )
-                message_count = len([m for m in filtered_messages if m[0] == 'message'])
-                # Cache the final result
-                while len(self.search_cache) >= MAX_CACHE_SIZE:
-                    self.search_cache.popitem(last=False)
-                self.search_cache[cache_key] = (filtered_messages, message_count)
-                self.update_message_table(filtered_messages, message_count, from_cache=True)
-                self.status_bar.showMessage(f"Displayed {message_count} messages (date-cached + search)")
-            else:
-                # No search text, use date-filtered results directly
-                logger.info("Reusing date-filtered cache (no search text)...")
-                message_count = len([m for m in date_filtered_messages if m[0] == 'message'])
-                # Cache the final result
-                while len(self.search_cache) >= MAX_CACHE_SIZE:
-                    self.search_cache.popitem(last=False)
-                self.search_cache[cache_key] = (date_filtered_messages, message_count)
-                self.update_message_table(date_filtered_messages, message_count, from_cache=True)
-                self.status_bar.showMessage(f"Displayed {message_count} messages (date-cached)")
-            return
-
         # Disconnect previous worker if active
         if self.search_worker is not None and self.search_worker.isRunning():
             # Wait a short time for graceful shutdown
@@ -3946,70 +4281,20 @@ class KikAnalyzerGUI(QMainWindow):
             self.conversations,
             self.search_bar.text().lower(),
             self.search_all.isChecked(),
-            datetime.datetime.combine(self.date_from.date().toPyDate(), datetime.time.min),
-            datetime.datetime.combine(self.date_to.date().toPyDate(), datetime.time.max),
+            self.date_from.dateTime().toPyDateTime(),
+            self.date_to.dateTime().toPyDateTime().replace(microsecond=999999),  # The whole last second
             self.keyword_lists.get(self.selected_keyword_list, []),
             self.keyword_whole_word.get(self.selected_keyword_list, False),
             self.selector.currentText(),
-            self.search_whole_word.isChecked()
+            self.search_whole_word.isChecked(),
+            self.message_store,
+            self.search_index
         )
         self.search_worker.results_ready.connect(self._on_search_results_ready)
         self.search_worker.start()
     
-    def _apply_search_filter_to_list(self, messages_list, search_text, search_whole_word):
-        """Apply search text filter to a pre-filtered message list."""
-        if not search_text:
-            return messages_list
-        
-        filtered = []
-        pending_header = None
-        current_conv_has_messages = False
-        
-        for item_type, *args in messages_list:
-            if item_type == 'header':
-                # If we had messages from previous conversation, the header was already added
-                # Store this header for the next conversation
-                pending_header = args
-                current_conv_has_messages = False
-            elif item_type == 'message':
-                msg, index, conv_id = args
-                fields = [
-                    msg['sender'].lower(),
-                    msg['receiver'].lower(),
-                    msg['message'].lower(),
-                    msg['sent_at'].strftime('%Y-%m-%d %H:%M:%S').lower() if pd.notna(msg['sent_at']) else '',
-                    msg.get('content_id', '').lower()
-                ]
-                if search_whole_word:
-                    matches = any(re.search(r'\b' + re.escape(search_text) + r'\b', field) for field in fields)
-                else:
-                    matches = any(search_text in field for field in fields)
-                if matches:
-                    if not current_conv_has_messages and pending_header:
-                        current_conv_has_messages = True
-                        pending_header = None
-                    filtered.append((item_type, *args))
-        
-        return filtered
-    
     def _on_search_results_ready(self, messages_to_display, message_count):
-        """Strategy 3: Handle search results and update date-filtered cache."""
-        # Cache date-filtered results for future use
-        date_key = (
-            self.date_from.date().toString("yyyy-MM-dd"),
-            self.date_to.date().toString("yyyy-MM-dd"),
-            self.selector.currentText(),
-            self.search_all.isChecked()
-        )
-        search_text = self.search_bar.text().lower()
-        
-        # If no search text, this is a date-filtered result we can cache
-        if not search_text:
-            while len(self.date_filtered_cache) >= MAX_CACHE_SIZE:
-                self.date_filtered_cache.popitem(last=False)
-            self.date_filtered_cache[date_key] = messages_to_display
-        
-        # Update table with results
+        """Show the results of a SearchWorker."""
         self.update_message_table(messages_to_display, message_count)
         
     def show_context_menu(self, position):
@@ -4314,6 +4599,8 @@ class KikAnalyzerGUI(QMainWindow):
         for row in selected_rows:
             row_values = []
             for col in range(col_count):
+                if self.message_table.isColumnHidden(col):
+                    continue
                 idx = self.message_model.index(row, col)
                 value = self.message_model.data(idx, Qt.DisplayRole)
                 row_values.append(str(value) if value is not None else "")
@@ -4359,7 +4646,7 @@ class KikAnalyzerGUI(QMainWindow):
         Args:
             messages_to_display: List of messages to display
             message_count: Number of messages
-            from_cache: If True, skip progress dialog for faster cached updates
+            from_cache: If True, skip status messages and defer row resizing for faster cached updates
         """
         # Quick check: If the exact same data is already displayed, skip update entirely
         if self._is_same_data_already_displayed(messages_to_display):
@@ -4371,19 +4658,6 @@ class KikAnalyzerGUI(QMainWindow):
             self.status_bar.showMessage("Updating message table...")
             self.log_message("Updating message table...")
         
-        # Show progress for large tables (including cached updates)
-        total_items = len(messages_to_display)
-        show_progress = total_items > 100
-        if show_progress:
-            progress = QProgressDialog("Updating table...", None, 0, total_items, self)
-            progress.setWindowTitle("Import Progress")
-            progress.setWindowModality(Qt.WindowModal)
-            progress.setMinimumDuration(0)
-            progress.setValue(0)
-            QApplication.processEvents()
-        else:
-            progress = None
-
         # Get keyword state and update model
         keyword_state = self._get_keyword_state()
         
@@ -4404,10 +4678,6 @@ class KikAnalyzerGUI(QMainWindow):
                 msg, index, conv_id = args
                 self.table_row_map[msg.get('msg_id', '')] = row
         
-        if show_progress and progress:
-            progress.setValue(total_items)
-            progress.close()
-        
         # Resize row heights only (keep default column widths)
         if from_cache:
             QTimer.singleShot(50, self._resize_rows_with_thumbnails)
@@ -4832,7 +5102,7 @@ class KikAnalyzerGUI(QMainWindow):
 
                 # ---------- Stats summary ----------
                 stats_summary = ""
-                if self.df is not None:
+                if self.message_store is not None:
                     total_messages = len(messages_to_export)
                     unique_conversations = len(set(conv_id for _, conv_id in messages_to_export))
                     unique_users = len(set(msg['sender'] for msg, _ in messages_to_export) |
@@ -4842,7 +5112,7 @@ class KikAnalyzerGUI(QMainWindow):
                     keyword_hits = (
                         sum(
                             1 for msg, _ in messages_to_export
-                            if self.is_keyword_match(msg['message'], keywords, whole_word)
+                            if self.is_keyword_hit(msg, keywords, whole_word)
                         ) if keywords else 0
                     )
                     total_media = len([msg for msg, _ in messages_to_export if msg.get('content_id', '')])
@@ -5239,11 +5509,7 @@ function sortTable(colIndex) {
                         elif msg['tags']:
                             tag_class = 'tag-custom'
 
-                        keyword_class = 'keyword-hit' if any(
-                            re.search(r'\b' + re.escape(kw.lower()) + r'\b', msg['message'].lower())
-                            if whole_word else kw.lower() in msg['message'].lower()
-                            for kw in keywords
-                        ) else ''
+                        keyword_class = 'keyword-hit' if self.is_keyword_hit(msg, keywords, whole_word) else ''
 
                         sender_class = ''
                         sender1, sender2 = conv_id if len(conv_id) == 2 else (msg['sender'], None)
@@ -5284,7 +5550,7 @@ function sortTable(colIndex) {
                                 cell_style = f" style='border: 3px solid {border_color} !important;'" if has_border else ""
 
                             elif field == 'timestamp':
-                                value = msg['sent_at'].strftime('%Y-%m-%d %H:%M:%S') if pd.notna(msg['sent_at']) else 'Invalid Timestamp'
+                                value = msg['sent_at_text'] or 'Invalid Timestamp'
                                 sort_val = value
                                 # Check if this cell has a border
                                 column_index = field_to_column.get(field, -1)
@@ -5444,7 +5710,7 @@ function sortTable(colIndex) {
                             if field == 'conversation':
                                 value = conv_str
                             elif field == 'timestamp':
-                                value = msg['sent_at'].strftime('%Y-%m-%d %H:%M:%S') if pd.notna(msg['sent_at']) else 'Invalid Timestamp'
+                                value = msg['sent_at_text'] or 'Invalid Timestamp'
                             elif field == 'message':
                                 msg_text = msg.get('message', '')
                                 # Replace NaN values and "nan" strings with empty string
@@ -5707,12 +5973,25 @@ function sortTable(colIndex) {
                     logger.info(f"Refreshed keyword selector after editing '{selected_list}'")
 
     def log_message(self, message, level="INFO"):
+        # stacklevel=2 records the caller's line, which is what the rate limit counts per
         if level == "ERROR":
-            logger.error(message)
+            logger.error(message, stacklevel=2)
         else:
-            logger.info(message)
+            logger.info(message, stacklevel=2)
+
+    def _show_load_error(self, text):
+        """Show a data-loading error; callers re-prompt for a folder afterwards."""
+        msg = QMessageBox(self)
+        msg.setIcon(QMessageBox.Critical)
+        msg.setWindowTitle("Error")
+        msg.setText(text)
+        msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
+        msg.setStandardButtons(QMessageBox.Ok)
+        msg.exec()
 
     def load_data(self):
+        if self._ingest_running():
+            return
         try:
             self.status_bar.showMessage("Loading data...")
             self.log_message("Prompting user to select Kik data folder...")
@@ -5859,1381 +6138,260 @@ function sortTable(colIndex) {
                 msg.exec()
                 return self.load_data()
 
-            self.content_folder = None
-            self.logs_folder = None
-            text_msg_dir = None
-
-            # Locate content and logs
-            for root, dirs, _ in os.walk(folder):
-                if 'content' in dirs and not self.content_folder:
-                    self.content_folder = os.path.join(root, 'content')
-                    logger.info(f"Found content folder: {self.content_folder}")
-                if 'logs' in dirs and not self.logs_folder:
-                    self.logs_folder = os.path.join(root, 'logs')
-                    logger.info(f"Found logs folder: {self.logs_folder}")
-                if self.content_folder and self.logs_folder:
-                    break
+            # Listing and parsing run in the headless engine on a worker thread; the dialog only mirrors its progress
+            engine = KikIngestEngine(memory_limit_mb=self.ingest_memory_limit_mb or None, cache_dir=CASE_CACHE_DIR,
+                                     profile=self.load_report_enabled)
+            self._run_ingest_job(engine, lambda: engine.discover(folder), "Locating content and logs...",
+                                 lambda error, case: self._on_case_discovered(engine, error, case))
 
-            # Load optional group-legend CSV from same folder as content/logs (parent folder)
-            self.group_legend_by_gid = {}
-            self.group_legend_rows = []
-            group_legend_files = glob.glob(os.path.join(folder, 'group-legend-*.csv'))
-            if group_legend_files:
-                try:
-                    path = group_legend_files[0]
-                    df_gl = pd.read_csv(path, encoding='utf-8', low_memory=False)
-                    df_gl.columns = [str(c).strip().lower() for c in df_gl.columns]
-                    expected = ['gid', 'name', 'code', 'public', 'deleted', 'last_join_ts', 'last_activity']
-                    for col in expected:
-                        if col not in df_gl.columns:
-                            df_gl[col] = ''
-                    for _, r in df_gl.iterrows():
-                        gid = str(r.get('gid', '')).strip() if pd.notna(r.get('gid')) else ''
-                        if not gid:
-                            continue
-                        rec = {
-                            'name': str(r.get('name', '')).strip() if pd.notna(r.get('name')) else '',
-                            'code': str(r.get('code', '')).strip() if pd.notna(r.get('code')) else '',
-                            'public': str(r.get('public', '')).strip() if pd.notna(r.get('public')) else '',
-                            'deleted': str(r.get('deleted', '')).strip() if pd.notna(r.get('deleted')) else '',
-                            'last_join_ts': str(r.get('last_join_ts', '')).strip() if pd.notna(r.get('last_join_ts')) else '',
-                            'last_activity': str(r.get('last_activity', '')).strip() if pd.notna(r.get('last_activity')) else '',
-                        }
-                        self.group_legend_by_gid[gid] = rec
-                        self.group_legend_rows.append({'gid': gid, **rec})
-                    self.log_message(f"Loaded group legend: {len(self.group_legend_rows)} groups from {os.path.basename(path)}.")
-                except Exception as e:
-                    self.log_message(f"Could not load group-legend CSV: {e}", "WARNING")
-                    self.group_legend_by_gid = {}
-                    self.group_legend_rows = []
-
-            # Detect format: new = content/data-text.csv or content/data-media.csv; old = content/text-msg-data
-            data_text_path = os.path.join(self.content_folder, 'data-text.csv') if self.content_folder else None
-            data_media_path = os.path.join(self.content_folder, 'data-media.csv') if self.content_folder else None
-            self._is_new_format = (
-                (data_text_path and os.path.isfile(data_text_path)) or
-                (data_media_path and os.path.isfile(data_media_path))
-            )
+        except Exception as e:
+            return self._show_unexpected_load_error(e)
 
-            # Locate text-msg-data under content (old format only)
-            if self.content_folder and not self._is_new_format:
-                for root, dirs, _ in os.walk(self.content_folder):
-                    if 'text-msg-data' in dirs and not text_msg_dir:
-                        text_msg_dir = os.path.join(root, 'text-msg-data')
-                        logger.info(f"Found text-msg-data folder: {text_msg_dir}")
-                        break
+    def _show_unexpected_load_error(self, e, retry=None):
+        self.log_message(f"Unexpected error in load_data: {str(e)}", "ERROR")
+        msg = QMessageBox(self)
+        msg.setIcon(QMessageBox.Critical)
+        msg.setWindowTitle("Error")
+        msg.setText(f"Unexpected error: {str(e)}.\n\nPlease try again or check the log file for details.")
+        msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
+        msg.setStandardButtons(QMessageBox.Ok)
+        msg.exec()
+        return (retry or self.load_data)()
 
-            # Validate folder structure for chosen format
-            if not self.content_folder or not self.logs_folder:
-                missing = []
-                if not self.content_folder:
-                    missing.append("'content'")
-                if not self.logs_folder:
-                    missing.append("'logs'")
-                self.log_message(f"Invalid folder structure: missing {', '.join(missing)}.", "ERROR")
-                msg = QMessageBox(self)
-                msg.setIcon(QMessageBox.Critical)
-                msg.setWindowTitle("Error")
-                msg.setText(f"The selected folder must contain {', '.join(missing)} subfolders.\n\nPlease unzip the Kik data and select the correct folder.")
-                msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                msg.setStandardButtons(QMessageBox.Ok)
-                msg.exec()
+    def _on_case_discovered(self, engine, error, case):
+        """Second step of load_data: pick the legacy CSVs, then parse the case in the background."""
+        if isinstance(error, IngestCancelled):
+            self.log_message("Data loading cancelled by user")
+            self.status_bar.showMessage("Data loading cancelled")
+            return
+        if isinstance(error, IngestError):
+            self._show_load_error(str(error))
+            return self.load_data()
+        if error is not None:
+            return self._show_unexpected_load_error(error)
+
+        self.content_folder = case.content_folder
+        self.logs_folder = case.logs_folder
+        self._is_new_format = case.is_new_format
+
+        csv_files = None
+        if not case.is_new_format:
+            csv_dialog = CSVFileDialog(case.text_msg_dir, self)
+            if csv_dialog.exec() != QDialog.Accepted:
+                self.log_message("CSV file selection cancelled.", "INFO")
+                self.status_bar.showMessage("CSV file selection cancelled")
                 return self.load_data()
+            csv_files = csv_dialog.get_selected_files()
+            self.csv_files = csv_files
 
-            if self._is_new_format:
-                if not (data_text_path and os.path.isfile(data_text_path)) and not (data_media_path and os.path.isfile(data_media_path)):
-                    self.log_message("New format: neither data-text.csv nor data-media.csv found in content.", "ERROR")
-                    msg = QMessageBox(self)
-                    msg.setIcon(QMessageBox.Critical)
-                    msg.setWindowTitle("Error")
-                    msg.setText("Content folder must contain at least one of 'data-text.csv' or 'data-media.csv' for the new format.")
-                    msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                    msg.setStandardButtons(QMessageBox.Ok)
-                    msg.exec()
-                    return self.load_data()
-                self.log_message("Detected new Kik record format (data-text/data-media).")
-            else:
-                if not text_msg_dir:
-                    self.log_message("Invalid folder structure: missing 'content/text-msg-data' for legacy format.", "ERROR")
-                    msg = QMessageBox(self)
-                    msg.setIcon(QMessageBox.Critical)
-                    msg.setWindowTitle("Error")
-                    msg.setText("The selected folder must contain 'content/text-msg-data' for the legacy format.\n\nAlternatively, use a folder with 'content/data-text.csv' and/or 'content/data-media.csv' for the new format.")
-                    msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                    msg.setStandardButtons(QMessageBox.Ok)
-                    msg.exec()
-                    return self.load_data()
-
-            # Permission checks
-            paths_to_check = [self.content_folder, self.logs_folder]
-            if text_msg_dir:
-                paths_to_check.append(text_msg_dir)
-            if any(not os.access(p, os.R_OK) for p in paths_to_check):
-                self.log_message("Permission denied for selected folder or subfolders.", "ERROR")
-                msg = QMessageBox(self)
-                msg.setIcon(QMessageBox.Critical)
-                msg.setWindowTitle("Error")
-                msg.setText("Permission denied for the selected folder or its subfolders.\n\nPlease ensure you have read permissions for the folder and try again.")
-                msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                msg.setStandardButtons(QMessageBox.Ok)
-                msg.exec()
-                return self.load_data()
+        self._run_ingest_job(engine, lambda: engine.ingest(case, csv_files), "Loading data...", self._on_data_loaded)
 
-            if not self._is_new_format:
-                # ---- Old format: build media from content folder, then CSV picker + load ----
-                self.media_files = {}
-                for root, _, files in os.walk(self.content_folder):
-                    for file in files:
-                        if file.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.mp4', '.webm', '.ogg')):
-                            content_id = os.path.splitext(file)[0]
-                            full_path = os.path.join(root, file)
-                            self.media_files[content_id] = full_path
-                            self.log_message(f"Found media file: {content_id} -> {full_path}")
-                self.log_message(f"Found {len(self.media_files)} media files in content folder")
-
-                csv_files = []
-                for root, _, files in os.walk(text_msg_dir):
-                    for file in files:
-                        if file.lower().endswith('.csv'):
-                            csv_files.append(os.path.join(root, file))
-                self.log_message(f"Found {len(csv_files)} CSV files in text-msg-data: {csv_files}")
-
-                csv_dialog = CSVFileDialog(text_msg_dir, self)
-                if csv_dialog.exec() != QDialog.Accepted:
-                    self.log_message("CSV file selection cancelled.", "INFO")
-                    self.status_bar.showMessage("CSV file selection cancelled")
-                    return self.load_data()
-
-                csv_files = csv_dialog.get_selected_files()
-                self.csv_files = csv_files
-                if not csv_files:
-                    self.log_message("No CSV files selected.", "ERROR")
-                    msg = QMessageBox(self)
-                    msg.setIcon(QMessageBox.Critical)
-                    msg.setWindowTitle("Error")
-                    msg.setText("No CSV files selected.\n\nPlease select one or more CSV files from the 'text-msg-data' folder.")
-                    msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                    msg.setStandardButtons(QMessageBox.Ok)
-                    msg.exec()
-                    return self.load_data()
-
-            dfs = []
-            if not self._is_new_format:
-                for csv_file in csv_files:
-                    try:
-                        self.log_message(f"Loading CSV: {csv_file}")
-                        df = pd.read_csv(csv_file, low_memory=False)
-                        if df.empty:
-                            self.log_message(f"CSV file {csv_file} is empty, skipping.", "ERROR")
-                            continue
-
-                        # Preserve original line numbers before any processing
-                        # pandas index represents row position in DataFrame (0-indexed)
-                        # CSV line 1 = header, CSV line 2 = DataFrame index 0
-                        # So: DataFrame index n = CSV line n+2
-                        # Formula: index 0 = line 2, index 1 = line 3, index n = line n+2
-                        df['_original_line_number'] = df.index + 2  # +2: index 0 = CSV line 2 (1 for header, 1 for 0-index offset)
-
-                        self.log_message(f"CSV {csv_file} loaded, rows: {len(df)}")
-                        self.log_message(f"CSV columns: {list(df.columns)}")
-
-                        # Port column debug
-                        if 'port' in df.columns:
-                            self.log_message(f"Port column found in {csv_file}, sample values: {df['port'].head().tolist()}")
-                            self.log_message(
-                                f"Port column null count: {df['port'].isna().sum()}, "
-                                f"non-null count: {df['port'].notna().sum()}"
-                            )
-                        else:
-                            self.log_message(f"No port column in {csv_file}", "WARNING")
-
-                        column_map = {col.lower(): col for col in df.columns}
-                        required_columns = ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at']
-                        # Columns that are truly required (cannot be empty) - msg can be empty for media messages
-                        truly_required_columns = ['msg_id', 'sender_jid', 'receiver_jid', 'sent_at']
-
-                        # Normalize required columns
-                        for req_col in required_columns:
-                            if req_col == 'sent_at':
-                                if 'sent_at' in column_map:
-                                    df.rename(columns={column_map['sent_at']: 'sent_at'}, inplace=True)
-                                elif 'timestamp' in column_map:
-                                    df.rename(columns={column_map['timestamp']: 'sent_at'}, inplace=True)
-                                else:
-                                    self.log_message(f"No 'sent_at' or 'timestamp' column found in {csv_file}", "ERROR")
-                                    continue
-                            else:
-                                if req_col not in column_map:
-                                    self.log_message(f"Missing required column {req_col} in {csv_file}", "ERROR")
-                                    continue
-
-                        # Convert optional columns to strings FIRST before dropna to preserve rows with empty msg but valid content_id
-                        for col in ['msg', 'content_id', 'ip', 'group_jid', 'port']:
-                            if col in df.columns:
-                                df[col] = df[col].astype(str).fillna('')
-                                # Enhanced handling for content_id
-                                if col == 'content_id':
-                                    df[col] = df[col].str.strip()  # Remove whitespace
-                                    df[col] = df[col].replace('nan', '')  # Normalize 'nan' strings to empty
-                            else:
-                                df[col] = ''
-
-                        self.log_message(f"Converting sent_at to datetime for {csv_file}...")
-                        df['sent_at'] = pd.to_datetime(df['sent_at'], errors='coerce')
-                        if df['sent_at'].dt.tz is not None:
-                            self.log_message(f"sent_at column in {csv_file} is already tz-aware. Converting to UTC...")
-                            df['sent_at'] = df['sent_at'].dt.tz_convert('UTC')
-                        else:
-                            self.log_message(f"sent_at column in {csv_file} is tz-naive. Localizing to UTC...")
-                            df['sent_at'] = df['sent_at'].dt.tz_localize('UTC')
-
-                        invalid_indices = df[df['sent_at'].isna()].index
-                        if not invalid_indices.empty:
-                            self.log_message(f"Found {len(invalid_indices)} invalid timestamps in {csv_file}.")
-
-                        self.log_message(f"Cleaning CSV data for {csv_file}...")
-                        pre_clean_rows = len(df)
-                        # Only drop rows where TRULY required columns are missing (not msg, since it can be empty for media)
-                        df = df.dropna(subset=truly_required_columns)
-                        self.log_message(
-                            f"After cleaning {csv_file}, rows: {len(df)} "
-                            f"(dropped {pre_clean_rows - len(df)} rows)"
-                        )
-
-                        # Log rows with content_id after cleaning
-                        if 'content_id' in df.columns:
-                            rows_with_content_id = df[df['content_id'].astype(str).str.strip() != '']
-                            if not rows_with_content_id.empty:
-                                self.log_message(f"CSV {os.path.basename(csv_file)}: Found {len(rows_with_content_id)} rows with content_id (sample: {rows_with_content_id['content_id'].iloc[0] if len(rows_with_content_id) > 0 else 'N/A'})")
-                            else:
-                                self.log_message(f"CSV {os.path.basename(csv_file)}: No rows with content_id found after cleaning")
-
-                        # --- ADD SOURCE + LINE NUMBER FOR CSV ROWS ---
-                        rel_path = os.path.relpath(csv_file, folder).replace('\\', '/')
-                        df['source'] = rel_path
-
-                        # Use preserved original line numbers (set before cleaning)
-                        if '_original_line_number' in df.columns:
-                            df['line_number'] = df['_original_line_number']
-                            df = df.drop(columns=['_original_line_number'])
-                        elif 'line_number' not in df.columns:
-                            # Fallback: if original line numbers weren't preserved, use sequential
-                            df['line_number'] = range(1, len(df) + 1)
-                        # --- END ADD ---
-
-                        dfs.append(df)
-                        self.log_message(f"Successfully processed {csv_file} with {len(df)} rows.")
-
-                    except pd.errors.EmptyDataError:
-                        self.log_message(f"CSV file {csv_file} is empty or invalid.", "ERROR")
-                        continue
-                    except Exception as e:
-                        self.log_message(f"Error loading CSV {csv_file}: {str(e)}", "ERROR")
-                        continue
+    def _on_data_loaded(self, error, case, retry=None):
+        """Last step of load_data and load_productions: show the parsed case.
 
+        retry is called after a load error (default: load_data).
+        """
+        if isinstance(error, IngestCancelled):
+            self.log_message("Data loading cancelled by user")
+            self.status_bar.showMessage("Data loading cancelled")
+            return
+        if isinstance(error, IngestError):
+            self._show_load_error(str(error))
+            return (retry or self.load_data)()
+        try:
+            if error is not None:
+                raise error
+            self.populate_conversations(case)
+            self._record_load_report(case, 'load')
+            self.log_message("Data loaded successfully!")
+            stats = case.parse_stats
+            if stats:
+                status = (
+                    f"Data loaded successfully - parsed {stats['files']} files, {stats['rows']:,} rows "
+                    f"({stats['files_per_sec']:.1f} files/sec, {stats['rows_per_sec']:,.0f} rows/sec)"
+                )
+            elif case.from_cache:
+                status = "Data loaded from the case cache (input files unchanged since the last load)"
             else:
-                # ---- New format: load data-text.csv and/or data-media.csv, build media from medias folder ----
-                self.media_files = {}
-                medias_folder = None
-                for candidate in [os.path.join(self.content_folder, 'medias'), os.path.join(folder, 'medias')]:
-                    if os.path.isdir(candidate):
-                        medias_folder = candidate
-                        self.log_message(f"Using medias folder: {medias_folder}")
-                        break
-                if not medias_folder:
-                    self.log_message("No 'medias' folder found under content or root; media paths may be missing.", "WARNING")
-
-                def _normalize_new_format_content_df(df, source_label):
-                    """Normalize new format columns to internal schema (msg_id, sender_jid, receiver_jid, msg, sent_at, ...)."""
-                    col_lower = {str(c).lower(): c for c in df.columns}
-                    renames = {}
-                    if 'id' in col_lower:
-                        renames[col_lower['id']] = 'msg_id'
-                    if 'message' in col_lower:
-                        renames[col_lower['message']] = 'msg'
-                    if 'sender_id' in col_lower:
-                        renames[col_lower['sender_id']] = 'sender_jid'
-                    if 'receiver_id' in col_lower:
-                        renames[col_lower['receiver_id']] = 'receiver_jid'
-                    df = df.rename(columns=renames)
-                    for c in ['msg', 'content_id', 'ip', 'port', 'filename', 'parent_id', 'app_name', 'group_jid']:
-                        if c in df.columns:
-                            df[c] = df[c].astype(str).fillna('')
-                        else:
-                            df[c] = ''
-                    if 'msg_id' not in df.columns:
-                        df['msg_id'] = ''
-                    if 'sender_jid' not in df.columns:
-                        df['sender_jid'] = ''
-                    if 'receiver_jid' not in df.columns:
-                        df['receiver_jid'] = ''
-                    if 'msg' not in df.columns:
-                        df['msg'] = ''
-                    if 'sent_at_ts' in df.columns:
-                        df['sent_at'] = pd.to_datetime(df['sent_at_ts'], unit='ms', utc=True, errors='coerce')
-                    elif 'sent_at' in df.columns:
-                        df['sent_at'] = pd.to_datetime(df['sent_at'], errors='coerce')
-                    else:
-                        df['sent_at'] = pd.NaT
-                    if df['sent_at'].dt.tz is None:
-                        df['sent_at'] = df['sent_at'].dt.tz_localize('UTC', ambiguous='NaT')
-                    df['source'] = source_label
-                    df['line_number'] = range(2, len(df) + 2)
-                    return df
-
-                if data_text_path and os.path.isfile(data_text_path):
-                    try:
-                        df_text = pd.read_csv(data_text_path, low_memory=False)
-                        if not df_text.empty:
-                            df_text = _normalize_new_format_content_df(df_text, 'content/data-text.csv')
-                            truly_required = ['msg_id', 'sender_jid', 'receiver_jid', 'sent_at']
-                            df_text = df_text.dropna(subset=truly_required)
-                            dfs.append(df_text)
-                            self.log_message(f"Loaded content/data-text.csv: {len(df_text)} rows.")
-                    except Exception as e:
-                        self.log_message(f"Error loading data-text.csv: {e}", "ERROR")
-
-                if data_media_path and os.path.isfile(data_media_path):
-                    try:
-                        df_media = pd.read_csv(data_media_path, low_memory=False)
-                        if not df_media.empty:
-                            df_media = _normalize_new_format_content_df(df_media, 'content/data-media.csv')
-                            truly_required = ['msg_id', 'sender_jid', 'receiver_jid', 'sent_at']
-                            df_media = df_media.dropna(subset=truly_required)
-                            if medias_folder and 'filename' in df_media.columns and 'content_id' in df_media.columns:
-                                for _, row in df_media.iterrows():
-                                    fn = (row.get('filename') or '').strip()
-                                    cid = (row.get('content_id') or '').strip()
-                                    if fn and cid:
-                                        path = os.path.join(medias_folder, fn)
-                                        if os.path.isfile(path):
-                                            self.media_files[cid] = path
-                                self.log_message(f"Built media_files from data-media.csv: {len(self.media_files)} entries.")
-                            dfs.append(df_media)
-                            self.log_message(f"Loaded content/data-media.csv: {len(df_media)} rows.")
-                    except Exception as e:
-                        self.log_message(f"Error loading data-media.csv: {e}", "ERROR")
-
-            if not dfs:
-                self.log_message("No valid CSV files loaded.", "ERROR")
-                msg = QMessageBox(self)
-                msg.setIcon(QMessageBox.Critical)
-                msg.setWindowTitle("Error")
-                msg.setText("No valid CSV files loaded.\n\nPlease select valid CSV files from the 'text-msg-data' folder (legacy) or ensure 'data-text.csv' and/or 'data-media.csv' exist in content (new format).")
-                msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                msg.setStandardButtons(QMessageBox.Ok)
-                msg.exec()
-                return self.load_data()
-
-            # Combine CSV dfs (self.df is still useful elsewhere)
-            try:
-                self.df = pd.concat(dfs, ignore_index=True)
-                # Fill all NaN values with empty strings to prevent "nan" from displaying
-                self.df = self.df.fillna('')
-                self.log_message(f"Combined {len(dfs)} CSV files, total rows: {len(self.df)}")
-            except Exception as e:
-                self.log_message(f"Error combining CSV files: {str(e)}", "ERROR")
-                msg = QMessageBox(self)
-                msg.setIcon(QMessageBox.Critical)
-                msg.setWindowTitle("Error")
-                msg.setText(f"Error combining CSV files: {str(e)}.\n\nPlease select valid CSV files.")
-                msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                msg.setStandardButtons(QMessageBox.Ok)
-                msg.exec()
-                return self.load_data()
-
-            # ---- Log file definitions ----
-            log_file_structures = {
-                'chat_platform_sent.txt': {
-                    'headers': ['Timestamp', 'User JID', 'Related User JID', 'App Name', 'ContentID', 'User IP', 'DateTime'],
-                    'csv_headers': ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at',
-                                    'content_id', 'ip', 'group_jid', 'line_number', 'app_name']
-                },
-                'group_send_msg_platform.txt': {
-                    'headers': ['Timestamp', 'User JID', 'Group JID', 'Related User JID', 'App Name', 'Content ID', 'User IP', 'DateTime'],
-                    'csv_headers': ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at',
-                                    'content_id', 'ip', 'group_jid', 'line_number', 'app_name']
-                },
-                'chat_platform_sent_received.txt': {
-                    'headers': ['Timestamp', 'User JID', 'Related User JID', 'App Name', 'ContentID', 'User IP', 'DateTime'],
-                    'csv_headers': ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at',
-                                    'content_id', 'ip', 'group_jid', 'line_number', 'app_name']
-                },
-                'group_receive_msg_platform.txt': {
-                    'headers': ['Timestamp', 'Group JID', 'Related User JID', 'Group JID Copy', 'App Name', 'Content ID', 'User IP', 'DateTime'],
-                    'csv_headers': ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at',
-                                    'content_id', 'ip', 'group_jid', 'line_number', 'app_name']
-                }
-            }
-
-            # ---- Process logs into log_dfs ----
-            log_dfs = []
-            temp_csv_dir = os.path.join(self.logs_folder, 'temp_csv')
-            os.makedirs(temp_csv_dir, exist_ok=True)
-            self.log_message(f"Created temporary CSV directory: {temp_csv_dir}")
-
-            # New-format log CSV column mapping: filename -> internal column names / msg builder
-            new_log_mappings = {
-                'chat_platform_sent.csv': {
-                    'sender_jid': 'user_jid', 'receiver_jid': 'friend_user_jid', 'sent_at': 'ts',
-                    'content_id': 'cid', 'ip': 'ip', 'group_jid': '', 'msg_id': 'cid',
-                    'msg_from': lambda row: ''
-                },
-                'group_send_msg_platform.csv': {
-                    'sender_jid': 'sender', 'receiver_jid': 'receiver', 'sent_at': 'ts',
-                    'content_id': 'cid', 'ip': 'sender_ip', 'group_jid': 'group_jid', 'msg_id': 'cid',
-                    'msg_from': lambda row: ''
-                },
-                'chat_platform_sent_received.csv': {
-                    'sender_jid': 'user_jid', 'receiver_jid': 'friend_user_jid', 'sent_at': 'ts',
-                    'content_id': 'cid', 'ip': 'ip', 'group_jid': '', 'msg_id': 'cid',
-                    'msg_from': lambda row: ''
-                },
-                'group_receive.csv': {
-                    'sender_jid': 'sender', 'receiver_jid': 'receiver', 'sent_at': 'ts',
-                    'content_id': 'cid', 'ip': 'sender_ip', 'group_jid': 'group_jid', 'msg_id': 'cid',
-                    'msg_from': lambda row: ''
-                },
-            }
-            new_log_mappings['group_receive_msg_platform.csv'] = new_log_mappings['group_receive.csv']
-
-            log_files_found = []  # list of (path, is_csv)
-            for root, _, files in os.walk(self.logs_folder):
-                for file in files:
-                    if file in new_log_mappings:
-                        log_files_found.append((os.path.join(root, file), True))
-                    elif file in log_file_structures:
-                        log_files_found.append((os.path.join(root, file), False))
-                break
-            self.log_message(f"Found {len(log_files_found)} log files: {[os.path.basename(p[0]) for p in log_files_found]}")
-
-            for log_path, is_csv_log in log_files_found:
-                log_file = os.path.basename(log_path)
-                if is_csv_log:
-                    # ---- New format: read .csv with pandas and map columns ----
-                    mapping = new_log_mappings.get(log_file)
-                    if not mapping:
-                        self.log_message(f"New-format log {log_file} has no column mapping, skipping.", "WARNING")
-                        continue
-                    try:
-                        self.log_message(f"Reading new-format log {log_file}...")
-                        actual_file_lines = []
-                        with open(log_path, 'r', encoding='utf-8') as fln:
-                            for file_line_no, raw_line in enumerate(fln, start=1):
-                                if file_line_no == 1:
-                                    continue
-                                if raw_line.strip():
-                                    actual_file_lines.append(file_line_no)
-                        df = pd.read_csv(log_path, encoding='utf-8', low_memory=False)
-                        if df.empty:
-                            continue
-                        col_lower = {str(c).lower(): c for c in df.columns}
-                        def _orig(name):
-                            return col_lower.get(str(name).lower())
-                        renames = {}
-                        for internal, source in [('sender_jid', mapping['sender_jid']), ('receiver_jid', mapping['receiver_jid']),
-                                                ('content_id', mapping['content_id']), ('ip', mapping['ip'])]:
-                            o = _orig(source)
-                            if o:
-                                renames[o] = internal
-                        if mapping.get('group_jid'):
-                            o = _orig(mapping['group_jid'])
-                            if o:
-                                renames[o] = 'group_jid'
-                        df = df.rename(columns=renames)
-                        if 'group_jid' not in df.columns:
-                            df['group_jid'] = ''
-                        ts_col = _orig(mapping['sent_at']) or _orig('ts') or _orig('dt') or _orig('epoch')
-                        if ts_col:
-                            df['sent_at'] = df[ts_col]
-                        else:
-                            continue
-                        if 'content_id' in df.columns:
-                            df['msg_id'] = df['content_id'].astype(str)
-                        else:
-                            df['msg_id'] = ''
-                        msg_from = mapping.get('msg_from')
-                        if callable(msg_from):
-                            df['msg'] = df.apply(lambda r: msg_from(r.to_dict()), axis=1)
-                        else:
-                            df['msg'] = ''
-                        for c in ['msg', 'content_id', 'ip', 'group_jid', 'port', 'app_name']:
-                            if c not in df.columns:
-                                df[c] = ''
-                            else:
-                                df[c] = df[c].astype(str).fillna('')
-                        if pd.api.types.is_numeric_dtype(df['sent_at']):
-                            df['sent_at'] = pd.to_datetime(df['sent_at'], unit='ms', utc=True, errors='coerce')
-                        else:
-                            df['sent_at'] = pd.to_datetime(df['sent_at'], errors='coerce')
-                        if df['sent_at'].dt.tz is None:
-                            df['sent_at'] = df['sent_at'].dt.tz_localize('UTC', ambiguous='NaT')
-                        else:
-                            df['sent_at'] = df['sent_at'].dt.tz_convert('UTC')
-                        df['source'] = os.path.relpath(log_path, folder).replace('\\', '/')
-                        if len(actual_file_lines) == len(df):
-                            df['line_number'] = actual_file_lines
-                        else:
-                            df['line_number'] = range(2, len(df) + 2)
-                        has_msg = df['msg'].notna() & (df['msg'] != '')
-                        has_content_id = df['content_id'].notna() & (df['content_id'] != '')
-                        df = df[has_msg | has_content_id]
-                        if df.empty:
-                            continue
-                        for c in ['msg_id', 'sender_jid', 'receiver_jid', 'sent_at', 'content_id', 'ip', 'group_jid', 'port', 'source', 'line_number']:
-                            if c not in df.columns:
-                                df[c] = '' if c != 'line_number' else 0
-                        # Keep full df (including epoch) for group_send so media pairing can match by epoch
-                        log_dfs.append(df.copy())
-                        self.log_message(f"Loaded new-format log {log_file}: {len(df)} rows.")
-                    except Exception as e:
-                        self.log_message(f"Error processing new-format log {log_file}: {e}", "ERROR")
-                    continue
-
-                structure = log_file_structures.get(log_file)
-                if not structure:
-                    self.log_message(f"Log file {log_file} not recognized, skipping.")
-                    continue
-
-                try:
-                    self.log_message(f"Reading {log_file}...")
-                    with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = [line.strip() for line in f.readlines() if line.strip()]
-
-                    if not lines:
-                        self.log_message(
-                            f"Log file {log_file} is empty or contains only whitespace. Skipping processing."
-                        )
-                        continue
-
-                    self.log_message(f"First 5 lines of {log_file}: {''.join(lines[:5])}")
-
-                    csv_filename = os.path.splitext(log_file)[0] + '.csv'
-                    csv_path = os.path.join(temp_csv_dir, csv_filename)
-
-                    csv_rows = []
-                    for line_num, line in enumerate(lines, start=1):
-                        fields = line.split('\t')
-                        expected_columns = len(structure['headers'])
-                        if len(fields) != expected_columns:
-                            self.log_message(
-                                f"Warning: {log_file} line has {len(fields)} columns, "
-                                f"expected {expected_columns}: {line}",
-                                "ERROR"
-                            )
-                            continue
-
-                        if log_file in ['chat_platform_sent.txt', 'chat_platform_sent_received.txt']:
-                            msg_id = fields[4]
-                            sender_jid = fields[1]
-                            receiver_jid = fields[2]
-                            app_name = fields[3]
-                            content_id = fields[4]
-                            msg = ''
-                            sent_at = fields[6]
-                            ip = fields[5]
-                            group_jid = ''
-                        elif log_file == 'group_send_msg_platform.txt':
-                            msg_id = fields[5]
-                            sender_jid = fields[1]
-                            receiver_jid = fields[3]
-                            app_name = fields[4]
-                            content_id = fields[5]
-                            msg = ''
-                            sent_at = fields[7]
-                            ip = fields[6]
-                            group_jid = fields[2]
-                        elif log_file == 'group_receive_msg_platform.txt':
-                            msg_id = fields[5]
-                            sender_jid = fields[1]
-                            receiver_jid = fields[2]
-                            app_name = fields[4]
-                            content_id = fields[5]
-                            msg = ''
-                            sent_at = fields[7]
-                            ip = fields[6]
-                            group_jid = fields[1]
-                        else:
-                            continue
-
-                        if not msg_id or not sender_jid or not receiver_jid:
-                            self.log_message(f"Skipping invalid row in {log_file}: {fields}", "ERROR")
-                            continue
-
-                        csv_rows.append([
-                            msg_id,
-                            sender_jid,
-                            receiver_jid,
-                            msg,
-                            sent_at,
-                            content_id,
-                            ip,
-                            group_jid,
-                            line_num,
-                            app_name
-                        ])
-
-                    if not csv_rows:
-                        self.log_message(
-                            f"No valid data in {log_file} after processing. Skipping CSV creation."
-                        )
-                        continue
-
-                    self.log_message(f"Writing converted CSV: {csv_path}")
-                    with open(csv_path, 'w', encoding='utf-8', newline='') as csv_file:
-                        writer = csv.writer(csv_file)
-                        writer.writerow(structure['csv_headers'])
-                        writer.writerows(csv_rows)
-
-                    self.log_message(f"Loading converted CSV: {csv_path}")
-                    df = pd.read_csv(csv_path, encoding='utf-8')
-                    self.log_message(
-                        f"CSV {csv_filename} loaded, rows: {len(df)}, columns: {list(df.columns)}"
-                    )
-
-                    df['sent_at'] = pd.to_datetime(
-                        df['sent_at'], format='%Y-%m-%d %H:%M:%S', errors='coerce'
-                    )
-                    if df['sent_at'].dt.tz is not None:
-                        self.log_message(f"sent_at in {csv_filename} is already tz-aware. Converting to UTC...")
-                        df['sent_at'] = df['sent_at'].dt.tz_convert('UTC')
-                    else:
-                        self.log_message(f"sent_at in {csv_filename} is tz-naive. Localizing to UTC...")
-                        df['sent_at'] = df['sent_at'].dt.tz_localize('UTC')
-
-                    invalid_timestamps = df[df['sent_at'].isna()]
-                    if not invalid_timestamps.empty:
-                        self.log_message(
-                            f"Found {len(invalid_timestamps)} invalid timestamps in {csv_filename}."
-                        )
-
-                    for col in ['msg', 'content_id', 'ip', 'group_jid', 'port']:
-                        if col in df.columns:
-                            df[col] = df[col].astype(str).fillna('')
-                        else:
-                            df[col] = ''
-
-                    df = df[df['msg'].notna() & (df['msg'] != '')]
-                    if df.empty:
-                        self.log_message(
-                            f"No valid messages in {csv_filename} after filtering. Skipping DataFrame."
-                        )
-                        continue
-
-                    # --- ADD SOURCE + LINE NUMBER FOR LOG ROWS ---
-                    rel_path = os.path.relpath(log_path, folder).replace('\\', '/')
-                    df['source'] = rel_path
-
-                    if 'line_number' not in df.columns:
-                        df['line_number'] = range(1, len(df) + 1)
-                    # --- END ADD ---
-
-                    log_dfs.append(df)
-                    self.log_message(f"Successfully processed {csv_filename} with {len(df)} rows.")
+                status = "Data loaded successfully"
+            if case.media_report and case.media_report['missing']:
+                status += f" - {len(case.media_report['missing']):,} media files missing from the medias folder"
+            self.status_bar.showMessage(status)
+            self.showNormal()
+            self._refresh_after_load()
+        except Exception as e:
+            return self._show_unexpected_load_error(e, retry)
 
-                except Exception as e:
-                    self.log_message(f"Error processing {log_file}: {str(e)}", "ERROR")
-                    try:
-                        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            first_lines = f.readlines()[:5]
-                            self.log_message(
-                                f"First 5 lines of {log_file}: {''.join(first_lines)}",
-                                "ERROR"
-                            )
-                    except Exception as e2:
-                        self.log_message(
-                            f"Could not read {log_file} for debugging: {str(e2)}",
-                            "ERROR"
-                        )
-                    continue
+    def load_productions(self, folders=None):
+        """Load several Kik returns (productions) into one session, replacing the loaded case.
 
-            self.log_message("Combining CSV and log data...")
-            all_dfs = dfs + log_dfs
-            if not log_dfs:
-                self.log_message("No valid log data loaded; using only CSV data.")
-            if not all_dfs:
-                self.log_message("No valid data loaded.", "ERROR")
-                msg = QMessageBox(self)
-                msg.setIcon(QMessageBox.Critical)
-                msg.setWindowTitle("Error")
-                msg.setText("No valid CSV or log files loaded.\n\nPlease ensure the folder structure and files are correct.")
-                msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                msg.setStandardButtons(QMessageBox.Ok)
-                msg.exec()
-                return self.load_data()
+        folders pre-fills the folder list (used to retry after an error).
+        """
+        if self._ingest_running():
+            return
+        dialog = ProductionsDialog(folders, self)
+        if dialog.exec() != QDialog.Accepted:
+            self.status_bar.showMessage("Loading productions cancelled")
+            return
+        folders = dialog.get_folders()
+        self.log_message(f"Loading {len(folders)} productions: {folders}")
+        engine = KikIngestEngine(memory_limit_mb=self.ingest_memory_limit_mb or None, profile=self.load_report_enabled)
+        self._run_ingest_job(engine, lambda: engine.ingest_productions(folders), "Loading productions...",
+                             lambda error, case: self._on_productions_loaded(folders, error, case))
+
+    def _on_productions_loaded(self, folders, error, case):
+        """Show the session built by load_productions."""
+        if error is None:
+            first = case.productions[0]
+            self.content_folder = first.content_folder
+            self.logs_folder = first.logs_folder
+            self._is_new_format = case.is_new_format
+            self.csv_files = [path for production in case.productions for path in production.csv_files]
+        self._on_data_loaded(error, case, retry=lambda: self.load_productions(folders))
+
+    def _run_ingest_job(self, engine, job, label, on_done):
+        """Run job (a call into engine) on an IngestWorker behind a cancellable progress dialog.
+
+        The GUI thread keeps handling events while the job runs; on_done(error,
+        data) is called on it once the job has finished, failed or been cancelled.
+        """
+        progress = QProgressDialog(label, "Cancel", 0, 0, self)
+        progress.setWindowTitle("Import Progress")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)  # Show immediately
+        progress.setAutoReset(False)
+        progress.setAutoClose(False)
+        worker = IngestWorker(engine, job, self)
 
-            # >>> UPDATED: include source and line_number <<<
-            required_columns = [
-                'msg_id',
-                'sender_jid',
-                'receiver_jid',
-                'msg',
-                'sent_at',
-                'content_id',
-                'ip',
-                'group_jid',
-                'port',
-                'source',
-                'line_number',
-                'app_name',
-            ]
+        def show_progress(done, total, text):
+            if progress.wasCanceled():
+                return
+            progress.setMaximum(total)
+            progress.setValue(done)
+            progress.setLabelText(text)
 
-            for df in all_dfs:
-                # Make sure all required columns exist and have sensible defaults
-                for col in required_columns:
-                    if col not in df.columns:
-                        if col == 'line_number':
-                            df[col] = 0
-                        else:
-                            df[col] = ''
+        def cancel():
+            self.log_message("Cancelling data loading...")
+            self.status_bar.showMessage("Cancelling...")
+            worker.cancel()
 
-                df['sent_at'] = pd.to_datetime(df['sent_at'], errors='coerce')
-                if df['sent_at'].dt.tz is not None:
-                    df['sent_at'] = df['sent_at'].dt.tz_convert('UTC')
-                else:
-                    df['sent_at'] = df['sent_at'].dt.tz_localize('UTC')
-
-                for col in ['msg', 'content_id', 'ip', 'group_jid', 'port', 'source']:
-                    if col in df.columns:
-                        df[col] = df[col].astype(str).fillna('')
-                        # Enhanced handling for content_id - preserve all non-empty values
-                        if col == 'content_id':
-                            # Store original count before normalization
-                            original_non_empty = len(df[df[col].astype(str).str.strip() != ''])
-                            df[col] = df[col].str.strip()  # Remove whitespace
-                            df[col] = df[col].replace('nan', '')  # Normalize 'nan' strings to empty
-                            # Verify we didn't lose any content_id values
-                            after_non_empty = len(df[df[col].astype(str).str.strip() != ''])
-                            if original_non_empty != after_non_empty:
-                                self.log_message(f"WARNING: Lost {original_non_empty - after_non_empty} content_id values during normalization in {df['source'].iloc[0] if 'source' in df.columns and len(df) > 0 else 'unknown'}", "ERROR")
-                    else:
-                        df[col] = ''
-
-            # --- Media cross-file combine BEFORE concat: match by content_id + epoch (sec) from FILE content ---
-            # Build match lists by reading the CSV files directly so file line numbers and values are exact.
-            dm_df = None
-            gs_df = None
-            dm_pos = gs_pos = -1
-            for i, df in enumerate(all_dfs):
-                if df.empty or 'source' not in df.columns:
-                    continue
-                src = str(df['source'].iloc[0]).lower()
-                if 'data-media' in src and 'content' in src:
-                    dm_df = df
-                    dm_pos = i
-                if 'group_send_msg_platform' in src:
-                    gs_df = df
-                    gs_pos = i
-            if dm_df is not None and gs_df is not None and 'content_id' in dm_df.columns and 'content_id' in gs_df.columns:
-                dm_file_list = []  # (file_line, content_id, epoch_sec)
-                gs_file_list = []  # (file_line, content_id, epoch_sec)
-                data_media_path = os.path.join(self.content_folder, 'data-media.csv') if self.content_folder else None
-                gs_src = str(gs_df['source'].iloc[0]).strip().replace('/', os.sep)
-                group_send_path = os.path.normpath(os.path.join(folder, gs_src)) if gs_src else None
-                if data_media_path and os.path.isfile(data_media_path):
-                    try:
-                        with open(data_media_path, 'r', encoding='utf-8', newline='') as f:
-                            reader = csv.reader(f)
-                            header = next(reader, None)
-                            if header:
-                                col_cid = next((i for i, h in enumerate(header) if str(h).strip().lower() == 'content_id'), -1)
-                                col_ts = next((i for i, h in enumerate(header) if str(h).strip().lower() == 'sent_at_ts'), -1)
-                                if col_cid >= 0 and col_ts >= 0:
-                                    for line_num, row in enumerate(reader, start=2):
-                                        if len(row) > max(col_cid, col_ts):
-                                            cid = str(row[col_cid]).strip()
-                                            try:
-                                                es = int(float(row[col_ts]) // 1000)
-                                            except (ValueError, TypeError, IndexError):
-                                                continue
-                                            if cid:
-                                                dm_file_list.append((line_num, cid, es))
-                    except Exception as e:
-                        self.log_message(f"Could not read data-media.csv for pairing: {e}", "WARNING")
-                if group_send_path and os.path.isfile(group_send_path):
-                    try:
-                        with open(group_send_path, 'r', encoding='utf-8', newline='') as f:
-                            reader = csv.reader(f)
-                            header = next(reader, None)
-                            if header:
-                                col_cid = next((i for i, h in enumerate(header) if str(h).strip().lower() == 'cid'), -1)
-                                col_epoch = next((i for i, h in enumerate(header) if str(h).strip().lower() == 'epoch'), -1)
-                                if col_cid >= 0 and col_epoch >= 0:
-                                    for line_num, row in enumerate(reader, start=2):
-                                        if len(row) > max(col_cid, col_epoch):
-                                            cid = str(row[col_cid]).strip()
-                                            try:
-                                                es = int(float(row[col_epoch]) // 1000)
-                                            except (ValueError, TypeError, IndexError):
-                                                continue
-                                            if cid:
-                                                gs_file_list.append((line_num, cid, es))
-                    except Exception as e:
-                        self.log_message(f"Could not read group_send CSV for pairing: {e}", "WARNING")
-                pairs = []  # (dm_idx, gs_idx, file_line_dm, file_line_gs)
-                gs_used = set()
-                for (line_dm, dm_cid, dm_es) in dm_file_list:
-                    for j, (line_gs, gs_cid, gs_es) in enumerate(gs_file_list):
-                        if j in gs_used:
-                            continue
-                        if dm_cid == gs_cid and dm_es == gs_es:
-                            gs_used.add(j)
-                            dm_idx = None
-                            gs_idx = None
-                            cid_match_dm = (dm_df['content_id'].astype(str).str.strip() == dm_cid)
-                            if 'sent_at_ts' in dm_df.columns:
-                                try:
-                                    es_match_dm = (dm_df['sent_at_ts'].astype(float) // 1000 == dm_es)
-                                    cand = dm_df[cid_match_dm & es_match_dm].index
-                                    if len(cand) > 0:
-                                        dm_idx = cand[0]
-                                except (ValueError, TypeError):
-                                    pass
-                            if dm_idx is None and 'sent_at' in dm_df.columns:
-                                try:
-                                    t = pd.to_datetime(dm_df['sent_at'], utc=True, errors='coerce')
-                                    es_series = (t.astype('int64') // 10**9).astype(int)
-                                    es_match_dm = (es_series == dm_es)
-                                    cand = dm_df[cid_match_dm & es_match_dm].index
-                                    if len(cand) > 0:
-                                        dm_idx = cand[0]
-                                except Exception:
-                                    pass
-                            cid_match_gs = (gs_df['content_id'].astype(str).str.strip() == gs_cid)
-                            if 'epoch' in gs_df.columns:
-                                try:
-                                    es_match_gs = (gs_df['epoch'].astype(float) // 1000 == gs_es)
-                                    cand = gs_df[cid_match_gs & es_match_gs].index
-                                    if len(cand) > 0:
-                                        gs_idx = cand[0]
-                                except (ValueError, TypeError):
-                                    pass
-                            if gs_idx is None and 'sent_at' in gs_df.columns:
-                                try:
-                                    t = pd.to_datetime(gs_df['sent_at'], utc=True, errors='coerce')
-                                    es_series = (t.astype('int64') // 10**9).astype(int)
-                                    es_match_gs = (es_series == gs_es)
-                                    cand = gs_df[cid_match_gs & es_match_gs].index
-                                    if len(cand) > 0:
-                                        gs_idx = cand[0]
-                                except Exception:
-                                    pass
-                            if dm_idx is not None and gs_idx is not None:
-                                pairs.append((dm_idx, gs_idx, line_dm, line_gs))
-                            break
-                if pairs:
-                    merged_rows = []
-                    for (dm_idx, gs_idx, ln_dm, ln_gs) in pairs:
-                        dm_row = dm_df.loc[dm_idx]
-                        gs_row = gs_df.loc[gs_idx]
-                        base = gs_row.to_dict()
-                        gs_src = str(gs_row.get('source', '')).strip()
-                        base['source'] = os.path.basename(gs_src)
-                        base['line_number'] = str(ln_gs)
-                        dm_port = str(dm_row.get('port', '')).strip()
-                        if dm_port and dm_port not in ('', 'nan', 'None'):
-                            base['port'] = dm_port
-                        dm_app = str(dm_row.get('app_name', '')).strip()
-                        if dm_app and dm_app not in ('', 'nan', 'None') and (not str(base.get('app_name', '')).strip() or str(base.get('app_name', '')).strip() in ('', 'nan', 'None')):
-                            base['app_name'] = dm_app
-                        for c in required_columns:
-                            if c not in base or pd.isna(base.get(c)):
-                                base[c] = ''
-                        merged_rows.append({c: base.get(c, '') for c in required_columns})
-                    dm_drop = {p[0] for p in pairs}
-                    gs_drop = {p[1] for p in pairs}
-                    new_all_dfs = []
-                    for i, df in enumerate(all_dfs):
-                        if i == dm_pos:
-                            new_all_dfs.append(df.loc[~df.index.isin(dm_drop)])
-                        elif i == gs_pos:
-                            new_all_dfs.append(df.loc[~df.index.isin(gs_drop)])
-                        else:
-                            new_all_dfs.append(df)
-                    new_all_dfs.append(pd.DataFrame(merged_rows))
-                    all_dfs = new_all_dfs
-                    self.log_message(f"Media cross-file combine: merged {len(pairs)} row(s) where data-media and group_send_msg_platform have same content_id and same date/time.")
-
-            # Hide ALL data-media.csv rows from final output (used only as metadata source)
-            if dm_pos >= 0:
-                final_all_dfs = []
-                for i, df in enumerate(all_dfs):
-                    if i == dm_pos:
-                        if not df.empty:
-                            self.log_message(f"Hiding {len(df)} remaining data-media.csv row(s) from output (metadata only).")
-                        continue
-                    final_all_dfs.append(df)
-                all_dfs = final_all_dfs
+        def finished(error, data):
+            progress.canceled.disconnect(cancel)  # Closing the dialog emits canceled too
+            progress.close()
+            progress.deleteLater()
+            self.ingest_worker = None
+            worker.deleteLater()
+            on_done(error, data)
+
+        worker.progress.connect(show_progress)
+        worker.result.connect(finished)
+        progress.canceled.connect(cancel)
+        self.ingest_worker = worker
+        progress.setValue(0)
+        worker.start()
 
-            try:
-                combined_df = pd.concat(
-                    [df[required_columns] for df in all_dfs if not df.empty],
-                    ignore_index=True
-                )
-                # Fill all NaN values with empty strings to prevent "nan" from displaying
-                combined_df = combined_df.fillna('')
-                
-                # NEW: Intelligent deduplication based on sender, receiver, date/time, IP, and port
-                # Multiple records can have the same content_id and not be duplicates
-                # Only merge if sender_jid, receiver_jid, sent_at, ip, and port all match
-                self.log_message("Checking for duplicate messages from CSV and log files...")
-                
-                # Log content_id statistics before deduplication
-                csv_with_content_id = combined_df[combined_df['source'].str.contains(r'text-msg-data|\.csv', case=False, na=False) & (combined_df['content_id'] != '')]
-                log_with_content_id = combined_df[combined_df['source'].str.contains('logs/', case=False, na=False) & (combined_df['content_id'] != '')]
-                self.log_message(f"Before deduplication: {len(csv_with_content_id)} CSV rows with content_id, {len(log_with_content_id)} log rows with content_id")
-                
-                # Mark source type for prioritization (CSV sources take priority for content_id)
-                # Be more explicit about CSV detection to ensure we catch all CSV sources
-                def identify_source_type(source_str):
-                    source_lower = str(source_str).lower()
-                    if ('text-msg-data' in source_lower or source_lower.endswith('.csv') or
-                            '/text-msg-data/' in source_lower or 'content/data-text.csv' in source_lower or
-                            'content/data-media.csv' in source_lower):
-                        return 'csv'
-                    return 'log'
-                
-                combined_df['_source_type'] = combined_df['source'].apply(identify_source_type)
-                
-                # Log source type distribution
-                csv_count = len(combined_df[combined_df['_source_type'] == 'csv'])
-                log_count = len(combined_df[combined_df['_source_type'] == 'log'])
-                csv_with_content_id_count = len(combined_df[(combined_df['_source_type'] == 'csv') & (combined_df['content_id'].astype(str).str.strip() != '')])
-                self.log_message(f"Source type distribution: {csv_count} CSV rows ({csv_with_content_id_count} with content_id), {log_count} log rows")
-                
-                # Create a function to merge duplicate rows
-                def merge_duplicate_rows(group):
-                    # Prefer non-empty content_id from CSV, then from logs
-                    csv_rows = group[group['_source_type'] == 'csv']
-                    log_rows = group[group['_source_type'] == 'log']
-                    
-                    # Get non-empty content_ids from CSV (strip whitespace to ensure proper matching)
-                    csv_content_ids = csv_rows['content_id'] if not csv_rows.empty else pd.Series(dtype=object)
-                    log_content_ids = log_rows['content_id'] if not log_rows.empty else pd.Series(dtype=object)
-                    
-                    # Convert to string and strip to handle any edge cases
-                    csv_content_ids_str = csv_content_ids.astype(str).str.strip()
-                    log_content_ids_str = log_content_ids.astype(str).str.strip()
-                    
-                    # Get non-empty content_ids
-                    csv_non_empty = csv_content_ids_str[csv_content_ids_str != ''].tolist()
-                    log_non_empty = log_content_ids_str[log_content_ids_str != ''].tolist()
-                    
-                    # Prefer CSV content_id if available, otherwise use log content_id
-                    merged_content_id = csv_non_empty[0] if csv_non_empty else (log_non_empty[0] if log_non_empty else '')
-                    
-                    # Log when merging preserves CSV content_id
-                    if csv_non_empty and merged_content_id == csv_non_empty[0]:
-                        self.log_message(f"Merging duplicate: preserving CSV content_id '{merged_content_id}'")
-                    elif log_non_empty and merged_content_id == log_non_empty[0]:
-                        self.log_message(f"Merging duplicate: using log content_id '{merged_content_id}' (no CSV content_id)")
-                    elif not csv_non_empty and not log_non_empty:
-                        self.log_message(f"Merging duplicate: no content_id in either source")
-                    
-                    # For other fields, prefer CSV row if available, otherwise use first log row
-                    if not csv_rows.empty:
-                        result = csv_rows.iloc[0].copy()
-                    else:
-                        result = log_rows.iloc[0].copy() if not log_rows.empty else group.iloc[0].copy()
-                    
-                    # Set merged content_id - CRITICAL: Always preserve CSV content_id if it exists
-                    if csv_non_empty:
-                        result['content_id'] = csv_non_empty[0]
-                        self.log_message(f"Merge result: Set content_id to CSV value '{csv_non_empty[0]}'")
-                    elif log_non_empty:
-                        result['content_id'] = log_non_empty[0]
-                    else:
-                        result['content_id'] = ''
-                    
-                    # Merge source information to show both sources if different
-                    sources = group['source'].unique()
-                    if len(sources) > 1:
-                        # Collect source and line number pairs, preserving order
-                        source_line_pairs = []
-                        for _, row in group.iterrows():
-                            source_val = str(row.get('source', '')).strip()
-                            line_num = str(row.get('line_number', '')).strip()
-                            if line_num and line_num.lower() not in ('nan', 'none', ''):
-                                source_line_pairs.append((os.path.basename(source_val), line_num))
-                            else:
-                                source_line_pairs.append((os.path.basename(source_val), ''))
-                        
-                        # Remove duplicate sources while preserving order and collecting line numbers
-                        seen_sources = {}
-                        ordered_sources = []
-                        ordered_line_numbers = []
-                        
-                        for source_name, line_num in source_line_pairs:
-                            if source_name not in seen_sources:
-                                seen_sources[source_name] = []
-                                ordered_sources.append(source_name)
-                            if line_num:
-                                seen_sources[source_name].append(line_num)
-                        
-                        # Build source string (without line numbers)
-                        result['source'] = '; '.join(ordered_sources)
-                        
-                        # Build line number string matching source order
-                        for source_name in ordered_sources:
-                            line_nums = seen_sources[source_name]
-                            if line_nums:
-                                # Remove duplicates and keep first occurrence
-                                unique_line_nums = []
-                                seen_line_nums = set()
-                                for ln in line_nums:
-                                    if ln not in seen_line_nums:
-                                        unique_line_nums.append(ln)
-                                        seen_line_nums.add(ln)
-                                ordered_line_numbers.extend(unique_line_nums)
-                        
-                        if ordered_line_numbers:
-                            result['line_number'] = '; '.join(ordered_line_numbers)
-                        else:
-                            result['line_number'] = ''
-                    else:
-                        # Single source, just use its line number
-                        result['source'] = os.path.basename(str(group.iloc[0].get('source', '')).strip())
-                        result['line_number'] = str(group.iloc[0].get('line_number', '')).strip()
-                    
-                    # Merge msg_id if available (prefer CSV msg_id)
-                    if 'msg_id' in group.columns:
-                        csv_msg_ids = csv_rows['msg_id']
-                        csv_msg_ids_non_empty = csv_msg_ids[csv_msg_ids != ''].tolist()
-                        if csv_msg_ids_non_empty:
-                            result['msg_id'] = csv_msg_ids_non_empty[0]
-                        else:
-                            log_msg_ids = group[group['_source_type'] == 'log']['msg_id']
-                            log_msg_ids_non_empty = log_msg_ids[log_msg_ids != ''].tolist()
-                            result['msg_id'] = log_msg_ids_non_empty[0] if log_msg_ids_non_empty else ''
-                    
-                    # Convert Series to dict to ensure proper handling
-                    if isinstance(result, pd.Series):
-                        return result.to_dict()
-                    return result
-                
-                # Group by sender_jid, receiver_jid, sent_at, ip, port to find duplicates
-                # Only deduplicate if we have both CSV and log data
-                csv_count = len(combined_df[combined_df['_source_type'] == 'csv'])
-                log_count = len(combined_df[combined_df['_source_type'] == 'log'])
-                
-                if csv_count > 0 and log_count > 0:
-                    # Normalize values for deduplication key to handle differences
-                    # Normalize sender_jid and receiver_jid (strip whitespace, handle 'nan')
-                    normalized_sender = combined_df['sender_jid'].astype(str).str.strip().replace('nan', '')
-                    normalized_receiver = combined_df['receiver_jid'].astype(str).str.strip().replace('nan', '')
-                    
-                    # Normalize timestamps to seconds precision (round to nearest second to handle microsecond differences)
-                    # Also ensure timezone is consistent (convert to UTC and format)
-                    def normalize_timestamp(ts):
-                        if pd.isna(ts):
-                            return ''
-                        try:
-                            # Ensure it's a datetime
-                            if isinstance(ts, pd.Timestamp):
-                                # Convert to UTC if timezone-aware, otherwise assume UTC
-                                if ts.tz is not None:
-                                    ts_utc = ts.tz_convert('UTC')
-                                else:
-                                    ts_utc = ts.tz_localize('UTC')
-                                # Format to seconds precision (no microseconds)
-                                return ts_utc.strftime('%Y-%m-%d %H:%M:%S')
-                            else:
-                                return str(ts)
-                        except Exception:
-                            return str(ts)
-                    
-                    normalized_sent_at = combined_df['sent_at'].apply(normalize_timestamp)
-                    
-                    # Normalize IP (strip whitespace, handle 'nan')
-                    normalized_ip = combined_df['ip'].astype(str).str.strip().replace('nan', '')
-                    
-                    # Normalize content_id for deduplication key
-                    # Empty/nan content_id normalized to 'NO_CONTENT_ID' so rows without media can still match
-                    normalized_content_id = combined_df['content_id'].astype(str).str.strip().replace('nan', '')
-                    normalized_content_id = normalized_content_id.replace('', 'NO_CONTENT_ID')
-                    
-                    # Create deduplication key based on: sender, receiver, date/time, IP, content_id
-                    # Port is NOT included in the key since it may differ between sources
-                    # content_id IS included to prevent merging different media messages with same metadata
-                    combined_df['_dup_key'] = (
-                        normalized_sender + '|' +
-                        normalized_receiver + '|' +
-                        normalized_sent_at + '|' +
-                        normalized_ip + '|' +
-                        normalized_content_id
-                    )
-                    
-                    # Log sample of deduplication keys for debugging
-                    sample_keys = combined_df['_dup_key'].head(10).tolist()
-                    self.log_message(f"Sample deduplication keys (first 10): {sample_keys[:3]}")
-                    
-                    grouped = combined_df.groupby('_dup_key', as_index=False)
-                    merged_rows = []
-                    duplicates_found = 0
-                    
-                    for key, group in grouped:
-                        if len(group) > 1:
-                            # Multiple rows with same key - merge them
-                            duplicates_found += len(group) - 1  # Count how many duplicates we're removing
-                            
-                            # Log details about the merge
-                            csv_rows_in_group = group[group['_source_type'] == 'csv']
-                            log_rows_in_group = group[group['_source_type'] == 'log']
-                            csv_with_content_id = csv_rows_in_group[csv_rows_in_group['content_id'].astype(str).str.strip() != '']
-                            if not csv_with_content_id.empty:
-                                self.log_message(f"Merging {len(group)} rows with key '{key[:50]}...': CSV has content_id '{csv_with_content_id.iloc[0]['content_id']}'")
-                            
-                            merged_row = merge_duplicate_rows(group)
-                            # Convert Series to dict to ensure proper DataFrame construction
-                            if isinstance(merged_row, pd.Series):
-                                merged_rows.append(merged_row.to_dict())
-                            else:
-                                merged_rows.append(merged_row)
-                        else:
-                            # Single row - keep as is (no duplicate to merge with)
-                            row = group.iloc[0]
-                            # Log single CSV rows with content_id for debugging
-                            if group.iloc[0]['_source_type'] == 'csv':
-                                row_content_id = str(group.iloc[0].get('content_id', '')).strip()
-                                if row_content_id and row_content_id != '':
-                                    self.log_message(f"Keeping single CSV row with content_id '{row_content_id}' (no duplicate found)")
-                                elif row_content_id == '':
-                                    self.log_message(f"Keeping single CSV row with empty content_id (no duplicate found)")
-                            # Ensure content_id is preserved as string
-                            if isinstance(row, pd.Series):
-                                row_dict = row.to_dict()
-                                # Explicitly preserve content_id
-                                if 'content_id' in row_dict:
-                                    row_dict['content_id'] = str(row_dict['content_id']).strip()
-                                merged_rows.append(row_dict)
-                            else:
-                                # If it's already a dict, ensure content_id is preserved
-                                if isinstance(row, dict) and 'content_id' in row:
-                                    row['content_id'] = str(row['content_id']).strip()
-                                merged_rows.append(row)
-                    
-                    # Reconstruct DataFrame ensuring all required columns are present
-                    if merged_rows:
-                        combined_df = pd.DataFrame(merged_rows)
-                        # Ensure all required columns exist
-                        for col in required_columns:
-                            if col not in combined_df.columns:
-                                combined_df[col] = ''
-                        # Ensure content_id is properly formatted as string
-                        if 'content_id' in combined_df.columns:
-                            combined_df['content_id'] = combined_df['content_id'].astype(str).str.strip()
-                            combined_df['content_id'] = combined_df['content_id'].replace('nan', '')
-                    else:
-                        combined_df = pd.DataFrame(columns=required_columns)
-                    
-                    # Log content_id statistics after deduplication
-                    csv_with_content_id_after = combined_df[combined_df['source'].str.contains(r'text-msg-data|\.csv', case=False, na=False) & (combined_df['content_id'].astype(str).str.strip() != '')]
-                    log_with_content_id_after = combined_df[combined_df['source'].str.contains('logs/', case=False, na=False) & (combined_df['content_id'].astype(str).str.strip() != '')]
-                    self.log_message(
-                        f"After merging duplicates: {len(combined_df)} rows "
-                        f"(removed {duplicates_found} duplicate entries)"
-                    )
-                    self.log_message(f"After deduplication: {len(csv_with_content_id_after)} CSV rows with content_id, {len(log_with_content_id_after)} log rows with content_id")
-                    
-                    # Log specific content_id values from CSV for debugging
-                    if not csv_with_content_id_after.empty:
-                        sample_content_ids = csv_with_content_id_after['content_id'].head(5).tolist()
-                        self.log_message(f"Sample CSV content_id values after deduplication: {sample_content_ids}")
-                else:
-                    self.log_message("Only one source type found, skipping deduplication")
-                
-                # Remove temporary columns
-                if '_source_type' in combined_df.columns:
-                    combined_df = combined_df.drop(columns=['_source_type'])
-                if '_dup_key' in combined_df.columns:
-                    combined_df = combined_df.drop(columns=['_dup_key'])
-                
-                self.log_message(
-                    f"Combined dataframe rows: {len(combined_df)}, "
-                    f"columns: {list(combined_df.columns)}"
-                )
-                if not combined_df.empty:
-                    self.log_message(
-                        f"Sample combined data (first row): {combined_df.iloc[0].to_dict()}"
-                    )
-            except Exception as e:
-                self.log_message(f"Error combining DataFrames: {str(e)}", "ERROR")
-                msg = QMessageBox(self)
-                msg.setIcon(QMessageBox.Critical)
-                msg.setWindowTitle("Error")
-                msg.setText(f"Error combining data: {str(e)}.\n\nPlease ensure all files are valid and try again.")
-                msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
-                msg.setStandardButtons(QMessageBox.Ok)
-                msg.exec()
-                return self.load_data()
+    def _ingest_running(self):
+        """True (and say so in the status bar) while a background load is still running."""
+        if self.ingest_worker is not None and self.ingest_worker.isRunning():
+            self.status_bar.showMessage("Data is still loading - wait for it to finish or cancel it first")
+            return True
+        return False
 
-            # >>> THIS WAS MISSING – actually build conversations/UI <<<
-            self.populate_conversations(combined_df)
-            self.log_message("Data loaded successfully!")
-            self.status_bar.showMessage("Data loaded successfully")
-            self.showNormal()
+    def closeEvent(self, event):
+        # The worker thread must not outlive the window that owns it
+        if self.ingest_worker is not None and self.ingest_worker.isRunning():
+            self.ingest_worker.cancel()
+            self.ingest_worker.wait()
+        if self.search_index_worker is not None:
+            self.search_index_worker.wait()
+        if self.keyword_hits_worker is not None and self.keyword_hits_worker.isRunning():
+            self.keyword_hits_worker.cancel()
+            self.keyword_hits_worker.wait()
+        super().closeEvent(event)
+
+    def _refresh_after_load(self):
+        """Invalidate any stale search results from pre-load searches and refresh."""
+        self.search_cache.clear()
+        self.unfiltered_messages = None
+        self.table_row_map.clear()
+        self.earliest_date = None
+        self.latest_date = None
+        self.schedule_search()
 
-            # Invalidate any stale search results from pre-load searches and refresh
-            self.search_cache.clear()
-            self.date_filtered_cache.clear()
-            self.unfiltered_messages = None
-            self.table_row_map.clear()
-            self.earliest_date = None
-            self.latest_date = None
-            self.schedule_search()
+    def load_supplemental_data(self):
+        """Add new or changed files in the loaded case's folder without reloading it.
 
-        except Exception as e:
-            self.log_message(f"Unexpected error in load_data: {str(e)}", "ERROR")
+        Tags, notes and reviewed status are kept; only the new files are parsed.
+        """
+        if self._ingest_running():
+            return
+        case = self.parsed_case
+        if case is None:
             msg = QMessageBox(self)
-            msg.setIcon(QMessageBox.Critical)
-            msg.setWindowTitle("Error")
-            msg.setText(f"Unexpected error: {str(e)}.\n\nPlease try again or check the log file for details.")
+            msg.setIcon(QMessageBox.Warning)
+            msg.setWindowTitle("No Data")
+            msg.setText("No case loaded. Please use 'Load New Data' first, then copy the supplemental files into the same folder.")
             msg.setWindowFlags(Qt.Dialog | Qt.WindowTitleHint | Qt.WindowCloseButtonHint)
             msg.setStandardButtons(QMessageBox.Ok)
             msg.exec()
-            return self.load_data()
-
+            return
 
-    def populate_conversations(self, df):
-        self.log_message("Grouping conversations...")
-        self.conversations = {}
-        self.media_counts = {}
-        self.df = df
+        # The supplement changes the message store and conversations in place, so no search may be reading them
+        if self.search_worker is not None and self.search_worker.isRunning():
+            self.search_worker.wait()
+        engine = KikIngestEngine(memory_limit_mb=self.ingest_memory_limit_mb or None, cache_dir=CASE_CACHE_DIR,
+                                 profile=self.load_report_enabled)
+        self._run_ingest_job(engine, lambda: engine.ingest_supplement(case), "Loading supplemental data...",
+                             lambda error, added: self._on_supplement_loaded(case, error, added))
+
+    def _on_supplement_loaded(self, case, error, added):
+        """Show the result of the background load started by load_supplemental_data."""
+        if isinstance(error, IngestCancelled):
+            # Parsing is cancelled before anything is merged, so the case is unchanged
+            self.log_message("Supplemental load cancelled by user")
+            self.status_bar.showMessage("Supplemental load cancelled")
+            return
+        if isinstance(error, IngestError):
+            self._show_load_error(str(error))
+            return
+        if error is not None:
+            self.log_message(f"Unexpected error in supplemental load: {str(error)}", "ERROR")
+            self._show_load_error(f"Unexpected error: {str(error)}.\n\nPlease try again or check the log file for details.")
+            return
+        self._record_load_report(case, 'supplement')
 
-        # Create progress dialog
-        total_rows = len(df)
-        progress = QProgressDialog("Processing messages...", "Cancel", 0, total_rows, self)
-        progress.setWindowTitle("Import Progress")
-        progress.setWindowModality(Qt.WindowModal)
-        progress.setMinimumDuration(0)  # Show immediately
-        progress.setValue(0)
-        QApplication.processEvents()  # Process events to show dialog
-
-        row_count = 0
-        for row in df.itertuples():
-            row_count += 1
-            if row_count % 100 == 0:  # Update progress every 100 rows
-                progress.setValue(row_count)
-                progress.setLabelText(f"Processing messages... ({row_count}/{total_rows})")
-                QApplication.processEvents()  # Keep UI responsive
-            
-            if progress.wasCanceled():
-                self.log_message("Conversation population cancelled by user")
-                return
-            
-            sender = getattr(row, 'sender_jid', '')
-            receiver = getattr(row, 'receiver_jid', '')
-            
-            # Skip invalid rows with missing sender or receiver
-            if pd.isna(sender) or pd.isna(receiver) or not sender or not receiver:
-                continue
-            
-            conv_id = tuple(sorted([sender, receiver]))
-            
-            if conv_id not in self.conversations:
-                self.conversations[conv_id] = []
-                self.media_counts[conv_id] = 0
-            
-            content_id_val = getattr(row, 'content_id', '') or ''
-            ip_val = getattr(row, 'ip', '') or ''
-            port_val = getattr(row, 'port', '') or ''
-            source_val = getattr(row, 'source', 'Unknown') or 'Unknown'
-            line_num_val = getattr(row, 'line_number', 0)
-            # Handle line_number - it may be a combined string like "10; 6" after merging duplicates
-            if pd.isna(line_num_val):
-                line_number = 0
-            else:
-                line_num_str = str(line_num_val).strip()
-                # If it contains ';', it's a combined value - just use the first one for display purposes
-                # or keep as string for the message dict
-                if ';' in line_num_str:
-                    # For combined line numbers, extract first value for numeric operations if needed
-                    first_line_num = line_num_str.split(';')[0].strip()
-                    try:
-                        line_number = int(first_line_num) if first_line_num else 0
-                    except (ValueError, TypeError):
-                        line_number = 0
-                else:
-                    try:
-                        line_number = int(line_num_str) if line_num_str else 0
-                    except (ValueError, TypeError):
-                        line_number = 0
-            
-            # Replace NaN values with empty strings for all message fields
-            msg_id_val = getattr(row, 'msg_id', '')
-            msg_text = getattr(row, 'msg', '')
-            if pd.isna(msg_id_val):
-                msg_id_val = ''
-            if pd.isna(msg_text):
-                msg_text = ''
-            if pd.isna(content_id_val):
-                content_id_val = ''
-            if pd.isna(ip_val):
-                ip_val = ''
-            if pd.isna(port_val):
-                port_val = ''
-            if pd.isna(source_val):
-                source_val = 'Unknown'
-            
-            # Enrich receiver with group name/code when source is group_send_msg_platform (receiver = GID)
-            if self.group_legend_by_gid and 'group_send_msg_platform' in str(source_val):
-                gid_key = str(receiver).replace('_g', '').strip()
-                rec = self.group_legend_by_gid.get(gid_key)
-                if rec:
-                    name = rec.get('name', '') or ''
-                    code = rec.get('code', '') or ''
-                    if name and code:
-                        receiver = f"GROUP CHAT: {name} ({code})"
-                    elif code:
-                        receiver = f"GROUP CHAT: ({code})"
-                    elif name:
-                        receiver = f"GROUP CHAT: {name}"
-                    else:
-                        receiver = f"GROUP CHAT: {receiver}"
-            elif 'group_send_msg_platform' in str(source_val):
-                receiver = f"GROUP CHAT: {receiver}"
-            
-            app_name_val = getattr(row, 'app_name', '') or ''
-            if pd.isna(app_name_val):
-                app_name_val = ''
-
-            message = {
-                'msg_id': msg_id_val,
-                'sender': sender,
-                'receiver': receiver,
-                'message': msg_text,
-                'sent_at': getattr(row, 'sent_at', None),
-                'tags': set(),
-                'content_id': content_id_val,
-                'ip': ip_val,
-                'port': port_val,
-                'source': source_val,
-                'line_number': str(line_num_val).strip() if pd.notna(line_num_val) else '0',
-                'app_name': str(app_name_val).strip(),
-            }
-            if 'group_send_msg_platform' in str(source_val):
-                gid_for_count = str(getattr(row, 'receiver_jid', '')).replace('_g', '').strip()
-                if gid_for_count:
-                    message['receiver_gid'] = gid_for_count
-            # Removed excessive logging - only log every 1000th message for performance
-            # self.log_message(f"Message port value for msg_id {message['msg_id']}: {message['port']}")
-            self.conversations[conv_id].append(message)
-            
-            if content_id_val and content_id_val in self.media_files and os.path.exists(self.media_files[content_id_val]):
-                self.media_counts[conv_id] += 1
-        
-        progress.setLabelText("Sorting conversations...")
-        progress.setValue(total_rows)
-        QApplication.processEvents()
-        
-        for conv_id in self.conversations:
-            self.conversations[conv_id].sort(key=lambda x: x['sent_at'])
-        
-        progress.setLabelText("Populating conversation list...")
-        QApplication.processEvents()
-        
+        if not added:
+            self.log_message(f"Supplemental load: no new messages in {case.folder}")
+            self.status_bar.showMessage("No new messages found (no new or changed files, or only rows already loaded)")
+            self._refresh_after_load()  # The sources of loaded messages may list new files
+            return
+        self.populate_conversations(case)
+        self.log_message(f"Supplemental load added {added} messages.")
+        self.status_bar.showMessage(f"Supplemental data loaded - {added:,} new messages added")
+        self._refresh_after_load()
+
+
+    def populate_conversations(self, case):
+        """Show a ParsedCase from the ingestion engine: store it and fill the conversation selector."""
+        self.parsed_case = case
+        self.conversations = case.conversations
+        self.media_counts = case.media_counts
+        self.media_files = case.media_files
+        self.group_legend_by_gid = case.group_legend_by_gid
+        self.group_legend_rows = case.group_legend_rows
+        self.group_counts = case.group_counts
+        self.message_store = case.messages
+        self.search_index = case.search_index
+        if case.search_index is None:
+            self._start_search_index(case)
+        if case.keyword_hits is None:
+            case.keyword_hits = KeywordHits(case.messages)
+        self.keyword_hits = case.keyword_hits
+        self._update_keyword_hits()
+        self.message_table.setColumnHidden(11, len(case.productions) < 2)
+        case.combined_df = None  # Everything the viewer reads is in the message store; the frame would be a second copy
         self.log_message(f"Found {len(self.conversations)} conversations.")
-        
+
         self.selector.clear()
         self.selector.addItem("All Conversations")
         for conv_id in sorted(self.conversations.keys(), key=lambda x: x[0]):
@@ -7241,38 +6399,65 @@ function sortTable(colIndex) {
             if conv_id in self.reviewed_conversations:
                 display_text += " [Reviewed]"
             self.selector.addItem(display_text)
-        
-        progress.setValue(total_rows)
-        progress.close()
         self.log_message("Dropdown populated.")
-        
+
         # Strategy 1: Pre-compute unfiltered state for instant display
         # This also sets the date filters to match the pre-computed dates
         self._precompute_unfiltered_state()
 
+    def _start_search_index(self, case):
+        """Build the search index of case in the background, unless that is already under way."""
+        worker = self.search_index_worker
+        if worker is not None and worker.isRunning() and worker.case is case:
+            return
+        self.search_index_worker = SearchIndexWorker(case, self)
+        self.search_index_worker.finished_index.connect(self._on_search_index_ready)
+        self.search_index_worker.start()
+
+    def _on_search_index_ready(self, case, index):
+        if index is None:
+            return
+        index.update()  # Messages a supplemental load added while it was being built
+        case.search_index = index
+        if case is self.parsed_case:
+            self.search_index = index
+            self.log_message(f"Search index ready ({len(index.words):,} words).")
+
+    def _update_keyword_hits(self):
+        """Evaluate in the background the keyword lists that keyword_hits does not have yet."""
+        hits = self.keyword_hits
+        worker = self.keyword_hits_worker
+        if worker is not None and worker.isRunning():
+            if worker.keyword_hits is not hits:
+                worker.cancel()  # A case that is no longer shown; _on_keyword_hits_ready starts the pass of this one
+            return
+        if hits is None:
+            return
+        lists = {
+            name: (keywords, self.keyword_whole_word.get(name, False))
+            for name, keywords in self.keyword_lists.items()
+            if hits.get(keywords, self.keyword_whole_word.get(name, False)) is None
+        }
+        if not lists:
+            return
+        self.keyword_hits_worker = KeywordHitsWorker(hits, lists, self)
+        self.keyword_hits_worker.finished_hits.connect(self._on_keyword_hits_ready)
+        self.keyword_hits_worker.start()
+
+    def _on_keyword_hits_ready(self, hits, added):
+        self.keyword_hits_worker.wait()  # finished_hits is emitted just before run() returns
+        if hits is not self.keyword_hits:
+            self._update_keyword_hits()  # The pass of the case loaded meanwhile
+        elif added:
+            self.log_message(f"Keyword hits ready for {len(self.keyword_lists)} keyword list(s).")
+            self._update_keyword_hits()  # Lists saved meanwhile
+
     def _precompute_unfiltered_state(self):
         """Strategy 1: Pre-compute the unfiltered state for instant display."""
         self.log_message("Pre-computing unfiltered state...")
-        earliest_date = None
-        latest_date = None
-        
-        # Find date range from all conversations
-        for conv_id, messages in self.conversations.items():
-            for msg in messages:
-                sent_at = msg.get('sent_at')
-                if sent_at and pd.notna(sent_at):
-                    # Handle timezone-aware timestamps
-                    if hasattr(sent_at, 'tz') and sent_at.tz is not None:
-                        sent_at = sent_at.tz_localize(None)
-                    
-                    if earliest_date is None or sent_at < earliest_date:
-                        earliest_date = sent_at
-                    if latest_date is None or sent_at > latest_date:
-                        latest_date = sent_at
-        
-        # Store date range for quick access
-        self.earliest_date = earliest_date
-        self.latest_date = latest_date
+        # Set the date filters to the first and last day with messages, so the cache key below
+        # matches them; switching back to "All Conversations" then finds the cached state
+        self._reset_date_range()
         
         # Build unfiltered messages list (all conversations, no filters)
         messages_to_display = []
@@ -7283,9 +6468,7 @@ function sortTable(colIndex) {
                 message_count += 1
         
         # Cache with special key for unfiltered state
-        earliest_str = earliest_date.strftime('%Y-%m-%d') if earliest_date else '2024-01-01'
-        latest_str = latest_date.strftime('%Y-%m-%d') if latest_date else QDate.currentDate().toString("yyyy-MM-dd")
-        
+        earliest_str, latest_str = self._date_range_key()
         unfiltered_key = (
             '',  # No search text
             False,  # search_whole_word unchecked
@@ -7301,17 +6484,6 @@ function sortTable(colIndex) {
         self.search_cache[unfiltered_key] = (messages_to_display, message_count)
         
         self.log_message(f"Pre-computed unfiltered state: {message_count} messages, date range: {earliest_str} to {latest_str}")
-        
-        # IMPORTANT: Set date filters to match pre-computed dates so cache keys will match
-        # This ensures that when switching back to "All Conversations", the cache will be found
-        if earliest_date:
-            from_date = QDate(earliest_date.year, earliest_date.month, earliest_date.day)
-            self.date_from.setDate(from_date)
-            logger.info(f"Set date_from to pre-computed earliest date: {earliest_str}")
-        if latest_date:
-            to_date = QDate(latest_date.year, latest_date.month, latest_date.day)
-            self.date_to.setDate(to_date)
-            logger.info(f"Set date_to to pre-computed latest date: {latest_str}")
 
     def handle_double_click(self, index):
         """Handle double-click on table view."""
@@ -7341,11 +6513,21 @@ function sortTable(colIndex) {
         self.log_message("Viewing keyword hits...")
         keyword_hits = []
         keywords, whole_word = self._get_keyword_state()
-        if keywords:
+        list_hits = self.keyword_hits.get(keywords, whole_word) if self.keyword_hits is not None else None
+        if keywords and list_hits is not None and list_hits.size == len(self.message_store):
+            mask = list_hits.mask()
+            for conv_id, conversation in self.conversations.items():
+                for row in conversation.rows[mask[conversation.rows]].tolist():
+                    matched = list_hits.term_ids(row)
+                    keyword_hits.append((MessageRow(self.message_store, row), conv_id, [keywords[i] for i in matched]))
+        elif keywords:
+            matcher = self.keyword_matcher(keywords, whole_word)
             for conv_id, messages in self.conversations.items():
                 for msg in messages:
-                    if self.is_keyword_match(msg['message'], keywords, whole_word):
-                        keyword_hits.append((msg, conv_id))
+                    text = msg['message']
+                    matched = matcher.find_all(text) if text else []
+                    if matched:
+                        keyword_hits.append((msg, conv_id, [keywords[i] for i in matched]))
         
         if not keyword_hits:
             msg = QMessageBox(self)
@@ -7376,20 +6558,13 @@ function sortTable(colIndex) {
         self.log_message("Updating stats...")
         stats_text = ""
         selection = self.selector.currentText()
-        if self.df is not None and selection == "All Conversations":
-            total_messages = len(self.df)
+        if self.message_store is not None and selection == "All Conversations":
+            store = self.message_store
+            total_messages = len(store)
             unique_conversations = len(self.conversations)
-            unique_users = len(set(self.df['sender_jid'].unique()) | set(self.df['receiver_jid'].unique()))
-            tagged_count = sum(1 for messages in self.conversations.values() for msg in messages if msg['tags'])
-            keywords, whole_word = self._get_keyword_state()
-            keyword_hits = (
-                sum(
-                    1
-                    for messages in self.conversations.values()
-                    for msg in messages
-                    if self.is_keyword_match(msg['message'], keywords, whole_word)
-                ) if keywords else 0
-            )
+            unique_users = len(set(store.categories['sender'].values) | set(store.categories['receiver_jid'].values))
+            tagged_count = int(store.tags.mask().sum())
+            keyword_hits = self.keyword_hit_count()
             total_media = sum(self.media_counts.values())
             stats_text = f"Total Messages: {total_messages}\nUnique Conversations: {unique_conversations}\nUnique Users: {unique_users}\nTagged Messages: {tagged_count}\nKeyword Hits: {keyword_hits}\nTotal Media: {total_media}"
         elif selection.startswith("Conversation: ") or selection.startswith("Group: "):
@@ -7402,14 +6577,7 @@ function sortTable(colIndex) {
                 receivers = set(msg['receiver'] for msg in messages)
                 unique_users = len(senders | receivers)
                 tagged_count = sum(1 for msg in messages if msg['tags'])
-                keywords, whole_word = self._get_keyword_state()
-                keyword_hits = (
-                    sum(
-                        1
-                        for msg in messages
-                        if self.is_keyword_match(msg['message'], keywords, whole_word)
-                    ) if keywords else 0
-                )
+                keyword_hits = self.keyword_hit_count(messages)
                 media_total = self.media_counts.get(conv_id, 0)
                 if len(conv_id) == 2:
                     sender1, sender2 = conv_id
@@ -8045,6 +7213,8 @@ function sortTable(colIndex) {
             self.status_bar.showMessage("Error loading progress")
 
 if __name__ == '__main__':
+    # Required for the ingestion process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = KikAnalyzerGUI()
     window.show()
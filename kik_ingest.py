@@ -0,0 +1,3779 @@
+"""
+Headless ingestion engine for Kik Analyzer.
+
+Turns an unzipped Kik data folder (legacy text-msg-data or the new
+data-text/data-media layout) into a ParsedCase: the combined message frame,
+the media index, the conversation index and the group legend. Nothing in this
+module imports Qt, so it can run on a worker thread, in a separate process or
+under a profiler. The GUI only prompts for the folder and displays the result.
+"""
+import bisect
+import csv
+import fnmatch
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import multiprocessing
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict, deque, namedtuple
+from collections.abc import Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+try:
+    import resource  # Unix only; without it the report has no process peak memory
+except ImportError:
+    resource = None
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    from pyarrow import feather as pa_feather
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    pa = pa_csv = pa_feather = None
+    CSV_ENGINE = 'c'
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+LOG_SAMPLE_LIMIT = 5  # Examples kept by a LogCounter and shown in summaries of long lists
+LOG_RATE_LIMIT = 20  # Records one call site may log per LOG_RATE_WINDOW before the rest are dropped
+LOG_RATE_WINDOW = 10.0  # Seconds
+
+
+class LogCounter:
+    """Counts a per-row event and logs it once, with the first LOG_SAMPLE_LIMIT samples.
+
+    Used in loops instead of one record per row. msg and args are a
+    %-style message for the logger; samples are usually line numbers.
+    When the level is disabled nothing but the count is kept.
+    """
+
+    def __init__(self, level, msg, *args):
+        self.level = level
+        self.msg = msg
+        self.args = args
+        self.enabled = logger.isEnabledFor(level)
+        self.count = 0
+        self.samples = []
+
+    def add(self, sample):
+        self.count += 1
+        if self.enabled and len(self.samples) < LOG_SAMPLE_LIMIT:
+            self.samples.append(sample)
+
+    def add_all(self, samples):
+        """Count a whole array of samples at once and log the summary."""
+        self.count += len(samples)
+        if self.enabled:
+            self.samples = list(samples[:LOG_SAMPLE_LIMIT])
+        self.emit()
+
+    def emit(self):
+        if self.count and self.enabled:
+            logger.log(self.level, self.msg + " (%d in total; first: %s)", *self.args, self.count,
+                       ", ".join(map(str, self.samples)))
+
+
+class RateLimitFilter(logging.Filter):
+    """Drops records from a call site that logs more than `limit` times within `window` seconds.
+
+    A call site is the (file, line) of the logging call, so f-string messages
+    are limited too. The first record let through after a quiet window says
+    how many were dropped; flush() logs what is still pending.
+    """
+
+    def __init__(self, limit=LOG_RATE_LIMIT, window=LOG_RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._sites = {}  # (pathname, lineno) -> [window start, records let through, records dropped]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or record.created - site[0] >= self.window:
+                dropped = site[2] if site is not None else 0
+                self._sites[key] = [record.created, 1, 0]
+            elif site[1] < self.limit:
+                site[1] += 1
+                return True
+            else:
+                site[2] += 1
+                return False
+        if dropped:
+            record.msg = "%s (%d similar message(s) suppressed)" % (record.getMessage(), dropped)
+            record.args = None
+        return True
+
+    def flush(self):
+        """Log one summary per call site with dropped records, and start counting afresh."""
+        with self._lock:
+            dropped = [(key, site[2]) for key, site in self._sites.items() if site[2]]
+            self._sites.clear()
+        for (pathname, lineno), count in dropped:
+            logger.warning("Suppressed %d similar log message(s) from %s line %d", count, os.path.basename(pathname), lineno)
+
+
+log_rate_limiter = RateLimitFilter()  # Shared with the GUI logger, which adds it to its own logger
+logger.addFilter(log_rate_limiter)
+
+MAX_PARSE_WORKERS = 4  # Upper bound on parser processes (each holds a whole file's frame in memory)
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024  # Below this total input size, process start-up costs more than it saves
+PROBE_CHUNK_ROWS = 10000  # First chunk of a streamed file; its size per row sets the size of the rest
+STREAM_CHUNK_SHARE = 8  # A raw chunk may use 1/8 of the memory limit (parsing and normalizing copy it a few times)
+INVENTORY_WORKERS = 8  # Threads listing directories (I/O bound, so more than the CPU count helps on network shares)
+CANCEL_CHUNK_BYTES = 16 * 1024 * 1024  # Without a memory limit files are still streamed in chunks this size, so cancel is seen mid-file
+CANCEL_POLL_SECONDS = 0.2  # How often the parent checks for cancel while parser processes are busy
+
+MEDIA_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.mp4', '.webm', '.ogg')
+
+# Columns of group-legend-*.csv, in the order of group_legend_rows
+GROUP_LEGEND_FIELDS = ('gid', 'name', 'code', 'public', 'deleted', 'last_join_ts', 'last_activity')
+
+REQUIRED_COLUMNS = [
+    'msg_id',
+    'sender_jid',
+    'receiver_jid',
+    'msg',
+    'sent_at',
+    'content_id',
+    'ip',
+    'group_jid',
+    'port',
+    'source',
+    'line_number',
+    'app_name',
+    'sent_at_ms',
+    'production',
+]
+
+# sent_at as int64 epoch milliseconds (UTC), with MISSING_EPOCH where sent_at is NaT.
+# Duplicate keys and date filtering compare this instead of Timestamps.
+EPOCH_COLUMN = 'sent_at_ms'
+MISSING_EPOCH = np.iinfo(np.int64).min
+LEGACY_LOG_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'  # DateTime field of the .txt logs
+EPOCH_KEY_OFFSET = 2 * 10 ** 11  # Added to epoch seconds in duplicate keys (see _epoch_second_strings)
+
+# Columns that are truly required (cannot be empty) - msg can be empty for media messages
+TRULY_REQUIRED_COLUMNS = ['msg_id', 'sender_jid', 'receiver_jid', 'sent_at']
+
+# data-text.csv / data-media.csv columns read by normalize_new_format_content_df (lower case).
+# Everything else in those files is never read. sent_at_ts is epoch milliseconds.
+NEW_CONTENT_STRING_COLUMNS = (
+    'id', 'message', 'sender_id', 'receiver_id', 'msg_id', 'msg', 'sender_jid', 'receiver_jid',
+    'content_id', 'ip', 'port', 'filename', 'parent_id', 'app_name', 'group_jid', 'sent_at',
+)
+NEW_CONTENT_EPOCH_COLUMN = 'sent_at_ts'
+
+# text-msg-data CSV columns that are always read as text (lower case)
+LEGACY_CSV_STRING_COLUMNS = (
+    'msg_id', 'sender_jid', 'receiver_jid', 'msg', 'content_id', 'ip', 'group_jid', 'port', 'app_name',
+)
+
+# ---- Legacy (.txt, tab separated) log file definitions ----
+# 'fields' maps each internal column to its index in 'headers'; None means the log has no such field.
+LOG_FILE_STRUCTURES = {
+    'chat_platform_sent.txt': {
+        'headers': ['Timestamp', 'User JID', 'Related User JID', 'App Name', 'ContentID', 'User IP', 'DateTime'],
+        'csv_headers': ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at',
+                        'content_id', 'ip', 'group_jid', 'line_number', 'app_name'],
+        'fields': {'msg_id': 4, 'sender_jid': 1, 'receiver_jid': 2, 'sent_at': 6,
+                   'content_id': 4, 'ip': 5, 'group_jid': None, 'app_name': 3},
+    },
+    'group_send_msg_platform.txt': {
+        'headers': ['Timestamp', 'User JID', 'Group JID', 'Related User JID', 'App Name', 'Content ID', 'User IP', 'DateTime'],
+        'csv_headers': ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at',
+                        'content_id', 'ip', 'group_jid', 'line_number', 'app_name'],
+        'fields': {'msg_id': 5, 'sender_jid': 1, 'receiver_jid': 3, 'sent_at': 7,
+                   'content_id': 5, 'ip': 6, 'group_jid': 2, 'app_name': 4},
+    },
+    'chat_platform_sent_received.txt': {
+        'headers': ['Timestamp', 'User JID', 'Related User JID', 'App Name', 'ContentID', 'User IP', 'DateTime'],
+        'csv_headers': ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at',
+                        'content_id', 'ip', 'group_jid', 'line_number', 'app_name'],
+        'fields': {'msg_id': 4, 'sender_jid': 1, 'receiver_jid': 2, 'sent_at': 6,
+                   'content_id': 4, 'ip': 5, 'group_jid': None, 'app_name': 3},
+    },
+    'group_receive_msg_platform.txt': {
+        'headers': ['Timestamp', 'Group JID', 'Related User JID', 'Group JID Copy', 'App Name', 'Content ID', 'User IP', 'DateTime'],
+        'csv_headers': ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at',
+                        'content_id', 'ip', 'group_jid', 'line_number', 'app_name'],
+        'fields': {'msg_id': 5, 'sender_jid': 1, 'receiver_jid': 2, 'sent_at': 7,
+                   'content_id': 5, 'ip': 6, 'group_jid': 1, 'app_name': 4},
+    }
+}
+
+# New-format log CSV column mapping: filename -> internal column names. These logs carry no message text.
+NEW_LOG_MAPPINGS = {
+    'chat_platform_sent.csv': {
+        'sender_jid': 'user_jid', 'receiver_jid': 'friend_user_jid', 'sent_at': 'ts',
+        'content_id': 'cid', 'ip': 'ip', 'group_jid': '', 'msg_id': 'cid',
+    },
+    'group_send_msg_platform.csv': {
+        'sender_jid': 'sender', 'receiver_jid': 'receiver', 'sent_at': 'ts',
+        'content_id': 'cid', 'ip': 'sender_ip', 'group_jid': 'group_jid', 'msg_id': 'cid',
+    },
+    'chat_platform_sent_received.csv': {
+        'sender_jid': 'user_jid', 'receiver_jid': 'friend_user_jid', 'sent_at': 'ts',
+        'content_id': 'cid', 'ip': 'ip', 'group_jid': '', 'msg_id': 'cid',
+    },
+    'group_receive.csv': {
+        'sender_jid': 'sender', 'receiver_jid': 'receiver', 'sent_at': 'ts',
+        'content_id': 'cid', 'ip': 'sender_ip', 'group_jid': 'group_jid', 'msg_id': 'cid',
+    },
+}
+NEW_LOG_MAPPINGS['group_receive_msg_platform.csv'] = NEW_LOG_MAPPINGS['group_receive.csv']
+
+
+class IngestError(Exception):
+    """Raised when a folder cannot be ingested. The message is meant for the user."""
+
+
+class IngestCancelled(Exception):
+    """Raised when the progress callback asks the engine to stop."""
+
+
+class ParsedCase:
+    """Everything the analyzer needs from one Kik data folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.production = os.path.basename(os.path.normpath(folder))  # Shown in the Production column
+        self.productions = []  # Multi-production session only: the ParsedCase of each return, in load order
+        self.content_folder = None
+        self.logs_folder = None
+        self.text_msg_dir = None
+        self.is_new_format = False
+        self.data_text_path = None
+        self.data_media_path = None
+        self.medias_folder = None
+        self.csv_files = []  # Legacy: CSV files found in (or selected from) text-msg-data
+        self.group_legend_by_gid = {}
+        self.group_legend_rows = []
+        self.media_files = {}  # content_id -> full path
+        self.combined_df = None  # Final deduplicated frame with REQUIRED_COLUMNS (None when loaded from the cache)
+        self.messages = None  # MessageStore with every message
+        self.conversations = {}  # conv_id (sorted sender/receiver tuple) -> Conversation (rows of messages)
+        self.media_counts = {}  # conv_id -> number of messages with a media file on disk
+        self.group_counts = {}  # gid -> (send count, receive count), see MessageStore.group_message_counts()
+        self.media_report = None  # New format: {'missing': [...], 'unreferenced': [...]} media file names
+        self.inventory = None  # FolderInventory of folder, listed once by discover()
+        self.fingerprint = None  # case_fingerprint() of the inputs, set by ingest() when caching
+        self.from_cache = False  # True when ingest() reused a cached result instead of parsing
+        self.dup_keys = None  # Duplicate key -> first message row with it, built by the first ingest_supplement()
+        self.search_index = None  # SearchIndex of messages, built by the viewer after loading
+        self.keyword_hits = None  # KeywordHits of messages, evaluated by the viewer after loading
+        self.timings = OrderedDict()  # stage name -> seconds
+        self.stage_stats = OrderedDict()  # stage name -> StageStats of the last discover/ingest/ingest_supplement
+        self.file_stats = []  # One dict per parsed file: file, parser, bytes, rows, seconds
+        self.parse_stats = {}  # files, rows, workers, seconds, files_per_sec, rows_per_sec
+
+    def total_time(self):
+        """Return the summed wall time of all stages that have run."""
+        return sum(self.timings.values())
+
+
+class StageStats:
+    """Wall time, rows in/out and memory of one ingest stage (summed when a stage runs twice).
+
+    peak_bytes is the most memory traced by tracemalloc while the stage ran,
+    over what was allocated when it started; it is only measured when the
+    engine profiles. max_rss_bytes is the process high-water mark after the
+    stage (None where the resource module is missing, i.e. on Windows).
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows_in = None
+        self.rows_out = None
+        self.peak_bytes = None
+        self.max_rss_bytes = None
+
+    def count(self, rows_in=None, rows_out=None):
+        """Add to the rows the stage read and produced."""
+        if rows_in is not None:
+            self.rows_in = (self.rows_in or 0) + rows_in
+        if rows_out is not None:
+            self.rows_out = (self.rows_out or 0) + rows_out
+
+    @property
+    def rows_per_sec(self):
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        if rows is None or self.seconds <= 0:
+            return None
+        return rows / self.seconds
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'calls': self.calls,
+            'seconds': self.seconds,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'rows_per_sec': self.rows_per_sec,
+            'peak_mb': None if self.peak_bytes is None else self.peak_bytes / (1024 * 1024),
+            'max_rss_mb': None if self.max_rss_bytes is None else self.max_rss_bytes / (1024 * 1024),
+        }
+
+
+def _max_rss_bytes():
+    """Peak resident set size of this process so far, or None without the resource module."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024  # bytes on macOS, KiB elsewhere
+
+
+def _format_timings(timings):
+    return ", ".join(f"{name}={seconds:.3f}s" for name, seconds in timings.items())
+
+
+def _relative_path(path, folder):
+    """path relative to folder, or path itself when it is on another drive (Windows)."""
+    try:
+        return os.path.relpath(path, folder)
+    except ValueError:
+        return path
+
+
+def build_load_report(case, kind='load'):
+    """Return a JSON-serialisable summary of the stages and files of case's last ingest.
+
+    kind names the call that produced it ('load' or 'supplement').
+    """
+    return {
+        'kind': kind,
+        'folder': case.folder,
+        'format': 'new' if case.is_new_format else 'legacy',
+        'from_cache': case.from_cache,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'total_seconds': sum(stats.seconds for stats in case.stage_stats.values()),
+        'messages': len(case.messages) if case.messages is not None else None,
+        'conversations': len(case.conversations),
+        'memory_traced': any(stats.peak_bytes is not None for stats in case.stage_stats.values()),
+        'stages': [stats.as_dict() for stats in case.stage_stats.values()],
+        'files': list(case.file_stats),
+        'parse': dict(case.parse_stats),
+    }
+
+
+# ---------------------------------------------------------------------- #
+# Folder inventory. discover() lists the selected folder once; format
+# detection, CSV/log discovery, media indexing and the group legend
+# lookup all query the inventory instead of walking the disk again.
+# ---------------------------------------------------------------------- #
+
+InventoryFile = namedtuple('InventoryFile', ['path', 'size', 'mtime', 'ext'])
+
+
+def _scan_dir(path):
+    """List one directory: (path, subdirectory paths, InventoryFile list) in scandir order."""
+    subdirs = []
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        # Like os.walk, symlinked directories are listed but not descended into
+                        subdirs.append((entry.path, not entry.is_symlink()))
+                    elif entry.is_file():
+                        st = entry.stat()
+                        files.append(InventoryFile(entry.path, st.st_size, st.st_mtime,
+                                                   os.path.splitext(entry.name)[1].lower()))
+                except OSError as e:
+                    logger.warning("Could not read %s: %s", entry.path, e)
+    except OSError as e:
+        logger.warning("Could not list %s: %s", path, e)
+    return path, subdirs, files
+
+
+class FolderInventory:
+    """Every directory and file under a folder, listed once with parallel scandir calls.
+
+    Paths are built the same way os.walk builds them, and walk() yields
+    directories in os.walk order, so lookups give the same answers as the
+    walks they replace.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._dirs = {}  # dir path -> [(subdir path, descended)]
+        self._files = {}  # dir path -> [InventoryFile]
+        self._file_paths = set()  # normcase'd paths of every file
+        self._dir_paths = set()  # normcase'd paths of every directory, descended or not
+
+    @classmethod
+    def build(cls, root, max_workers=INVENTORY_WORKERS):
+        """List root recursively. Directories are scanned concurrently as they are found."""
+        inventory = cls(root)
+        inventory._dir_paths.add(os.path.normcase(root))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {pool.submit(_scan_dir, root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, subdirs, files = future.result()
+                    inventory._dirs[path] = subdirs
+                    inventory._files[path] = files
+                    inventory._file_paths.update(os.path.normcase(f.path) for f in files)
+                    inventory._dir_paths.update(os.path.normcase(sub) for sub, _ in subdirs)
+                    pending.update(pool.submit(_scan_dir, sub) for sub, descend in subdirs if descend)
+        logger.info("Inventory of %s: %s folders, %s files.", root, len(inventory._dirs), len(inventory._file_paths))
+        return inventory
+
+    def __len__(self):
+        """Number of files listed."""
+        return len(self._file_paths)
+
+    def walk(self, top):
+        """Yield (dirpath, dirnames, InventoryFile list) top-down, like os.walk(top)."""
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            if path not in self._dirs:
+                continue
+            subdirs = self._dirs[path]
+            yield path, [os.path.basename(sub) for sub, _ in subdirs], self._files[path]
+            stack.extend(sub for sub, descend in reversed(subdirs) if descend)
+
+    def files(self, directory):
+        """Files directly in directory (empty if it was not listed)."""
+        return self._files.get(directory, [])
+
+    def glob(self, directory, pattern):
+        """Paths of the files directly in directory whose name matches pattern (fnmatch rules)."""
+        return [f.path for f in self.files(directory) if fnmatch.fnmatch(os.path.basename(f.path), pattern)]
+
+    def is_file(self, path):
+        return os.path.normcase(path) in self._file_paths
+
+    def is_dir(self, path):
+        return os.path.normcase(path) in self._dir_paths
+
+
+# ---------------------------------------------------------------------- #
+# Timestamps. Every parser turns sent_at into datetime64[ns, UTC] through
+# parse_timestamps() and adds EPOCH_COLUMN with add_epoch_column().
+# ---------------------------------------------------------------------- #
+
+_NAT_STRINGS = {'', 'nan', 'NaN', 'NAN', 'NaT', 'nat', 'NAT', 'None', 'none'}
+_timestamp_formats = {}  # source file -> sniffed strftime format, or None when it has no single format
+
+
+def clear_timestamp_formats():
+    """Forget the formats sniffed so far (files may have changed between loads)."""
+    _timestamp_formats.clear()
+
+
+def sniff_timestamp_format(values, source=None):
+    """Guess the strftime format of a column of date strings from its first value.
+
+    This is the guess pd.to_datetime makes on its own, but it is made once
+    per source file and cached, so every chunk of a streamed file is parsed
+    the same way.
+    """
+    if source is not None and source in _timestamp_formats:
+        return _timestamp_formats[source]
+    fmt = None
+    for value in values:
+        if isinstance(value, str) and value.strip() not in _NAT_STRINGS:
+            fmt = guess_datetime_format(value)
+            break
+    if fmt is None and source is not None:
+        logger.warning("Could not detect the date format of %s; parsing each value individually.", os.path.basename(str(source)))
+    if source is not None:
+        _timestamp_formats[source] = fmt
+    return fmt
+
+
+def parse_timestamps(values, source=None, unit=None, fmt=None):
+    """Parse a sent_at column into a datetime64[ns, UTC] Series. Unparseable values become NaT.
+
+    Args:
+        values: Series of date strings, or of epoch numbers when unit is given.
+        source: Source file the values come from; keys the sniffed-format cache.
+        unit: Epoch unit ('ms', 's') for numeric values.
+        fmt: Known strftime format; skips sniffing.
+    """
+    if unit is not None:
+        return pd.to_datetime(values, unit=unit, utc=True, errors='coerce')
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.dt.tz_convert('UTC')
+    if pd.api.types.is_datetime64_dtype(values.dtype):
+        return values.dt.tz_localize('UTC')
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return pd.to_datetime(values, utc=True, errors='coerce')
+    if fmt is None:
+        fmt = sniff_timestamp_format(values, source)
+    parsed = pd.to_datetime(values, format=fmt or 'mixed', errors='coerce')
+    if not pd.api.types.is_datetime64_any_dtype(parsed.dtype):
+        # Mixed UTC offsets: convert each value to UTC
+        parsed = pd.to_datetime(values, format=fmt or 'mixed', utc=True, errors='coerce')
+    if parsed.dt.tz is not None:
+        return parsed.dt.tz_convert('UTC')
+    return parsed.dt.tz_localize('UTC')
+
+
+def epoch_ms(sent_at):
+    """int64 epoch milliseconds of a datetime64 Series, MISSING_EPOCH where NaT."""
+    ns = sent_at.dt.tz_localize(None) if sent_at.dt.tz is not None else sent_at
+    ms = ns.to_numpy(dtype='datetime64[ns]').view(np.int64) // 1_000_000
+    ms[sent_at.isna().to_numpy()] = MISSING_EPOCH
+    return ms
+
+
+def add_epoch_column(df):
+    """Set EPOCH_COLUMN from the (UTC) sent_at column and return df."""
+    df[EPOCH_COLUMN] = epoch_ms(df['sent_at'])
+    return df
+
+
+# ---------------------------------------------------------------------- #
+# Single-read sources. Every CSV is read from disk exactly once, through
+# a SourceFile: the header is peeked from the first block, and the file
+# line of each record is tracked as the bytes pass to the CSV reader.
+# ---------------------------------------------------------------------- #
+
+class SourceFile(io.RawIOBase):
+    """Binary file-like view of a data file that is read once.
+
+    Pass it to pd.read_csv / pyarrow instead of the path. While the reader
+    pulls bytes, the physical line where each CSV record starts is recorded:
+    newlines inside quoted fields stay in their record, and blank or
+    whitespace-only lines are skipped the way read_csv skips them. Readers
+    add the number of rows they parsed to .rows so line_numbers() can check
+    the tracking against the parser.
+    """
+
+    BLOCK_SIZE = 1024 * 1024
+    _QUOTE = ord('"')
+    _WHITESPACE = b' \t\r\n'  # what read_csv treats as a blank line
+    _BLANK = np.zeros(256, dtype=bool)
+    _BLANK[list(_WHITESPACE)] = True
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.name = os.path.basename(path)
+        self._f = open(path, 'rb')
+        self.size = os.fstat(self._f.fileno()).st_size
+        self.rows = 0
+        self._reset()
+
+    def _reset(self):
+        self._buffer = b''  # block read from disk, handed out from _pos
+        self._pos = 0
+        self._bytes_read = 0
+        self._newlines = 0  # newlines read so far
+        self._in_quotes = False
+        self._has_content = False  # current record has a non-blank byte
+        self._start_line = 1  # file line where the current record started
+        self._starts = []  # arrays of record start lines
+        self._finished = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def _read_block(self, size=-1):
+        block = self._f.read(size)
+        self._track(block)
+        if size < 0:
+            self._track(b'')
+        return block
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._buffer[self._pos:] + self._read_block()
+            self._buffer, self._pos = b'', 0
+            return data
+        if self._pos >= len(self._buffer):
+            # Readers ask for small pieces; tracking works on whole blocks
+            self._buffer, self._pos = self._read_block(max(size, self.BLOCK_SIZE)), 0
+        data = self._buffer[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+    read1 = read
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+    def rewind(self):
+        """Start over for a second parse of the same file (error fallbacks only)."""
+        self._f.seek(0)
+        self.rows = 0
+        self._reset()
+
+    def header(self):
+        """Column names from the first non-blank line, without consuming any bytes."""
+        while True:
+            lines = self._buffer[self._pos:].split(b'\n')
+            for line in lines[:-1]:
+                if line.strip():
+                    return next(csv.reader([line.decode('utf-8-sig', errors='replace')]), [])
+            block = self._read_block(self.BLOCK_SIZE)
+            if not block:
+                last = lines[-1].decode('utf-8-sig', errors='replace')
+                return next(csv.reader([last]), []) if last.strip() else []
+            self._buffer += block
+
+    def estimate_rows(self):
+        """Rough data row count from the record density of the bytes read so far."""
+        records = sum(len(s) for s in self._starts)
+        if not self._bytes_read or records < 2:
+            return 0
+        return max(int(self.size * records / self._bytes_read) - 1, 0)
+
+    def _track(self, data):
+        if not data:
+            if not self._finished:
+                self._finished = True
+                if self._has_content:
+                    self._starts.append(np.array([self._start_line], dtype=np.int64))
+            return
+        self._bytes_read += len(data)
+        buf = np.frombuffer(data, dtype=np.uint8)
+        newline_pos = np.flatnonzero(buf == 10)
+        quote_pos = np.flatnonzero(buf == self._QUOTE)
+        # A newline ends a record when an even number of quotes precedes it in the record
+        quoted = (np.searchsorted(quote_pos, newline_pos) + self._in_quotes) % 2 == 1
+        ends = newline_pos[~quoted]
+        if len(ends):
+            # Records ending in this block start after the previous end (the first one earlier)
+            first_bytes = np.concatenate(([0], ends[:-1] + 1))
+            has_content = ~self._BLANK[buf[first_bytes]]
+            has_content[0] = self._has_content or bool(data[:ends[0]].strip(self._WHITESPACE))
+            for k in np.flatnonzero(~has_content[1:]) + 1:
+                # Starts with whitespace: look at the rest of the record
+                has_content[k] = bool(data[first_bytes[k]:ends[k]].strip(self._WHITESPACE))
+            newlines_before = np.searchsorted(newline_pos, ends) + 1
+            start_lines = np.concatenate(([self._start_line], self._newlines + newlines_before[:-1] + 1))
+            self._starts.append(start_lines[has_content])
+            self._start_line = self._newlines + int(newlines_before[-1]) + 1
+            self._has_content = bool(data[ends[-1] + 1:].strip(self._WHITESPACE))
+        elif not self._has_content:
+            self._has_content = bool(data.strip(self._WHITESPACE))
+        self._newlines += len(newline_pos)
+        self._in_quotes = (len(quote_pos) + self._in_quotes) % 2 == 1
+
+    def line_numbers(self):
+        """File line of each data row, indexed by row position; None if the tracking does not match the parser."""
+        if not self._finished:
+            while self.read(self.BLOCK_SIZE):
+                pass
+        starts = np.concatenate(self._starts) if self._starts else np.empty(0, dtype=np.int64)
+        if len(starts) != self.rows + 1:
+            logger.warning("%s: could not match %d rows to file lines; "
+                           "line numbers count rows instead of file lines.", self.name, self.rows)
+            return None
+        return starts[1:]
+
+    def set_line_numbers(self, df):
+        """Set df's line_number from the file lines (df's index is the row position in the file)."""
+        if df.empty:
+            return df
+        lines = self.line_numbers()
+        if lines is not None:
+            df['line_number'] = lines[df.index.to_numpy()]
+        return df
+
+
+# ---------------------------------------------------------------------- #
+# Per-file parsers. Module level so they can run in a worker process;
+# each one logs and returns None instead of raising. With a chunk_budget
+# (bytes) the file is streamed in chunks and each chunk is normalized
+# before the next one is read; on_chunk(done, total, label) reports
+# progress after every chunk.
+# ---------------------------------------------------------------------- #
+
+def iter_csv_chunks(source, chunk_budget, on_chunk=None, **read_csv_kwargs):
+    """Yield DataFrame chunks of a SourceFile sized so one raw chunk stays near chunk_budget bytes.
+
+    The first chunk (PROBE_CHUNK_ROWS rows) measures the in-memory size of a
+    row; later chunks are sized from it. Chunk indexes continue from one chunk
+    to the next, exactly as for a whole-file read.
+    """
+    rows = PROBE_CHUNK_ROWS
+    done = 0
+    with pd.read_csv(source, iterator=True, engine='c', **read_csv_kwargs) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(rows)
+            except StopIteration:
+                return
+            if done == 0 and len(chunk):
+                row_bytes = max(chunk.memory_usage(deep=True).sum() / len(chunk), 1)
+                rows = max(PROBE_CHUNK_ROWS, int(chunk_budget // row_bytes))
+            done += len(chunk)
+            source.rows = done
+            yield chunk
+            if on_chunk is not None:
+                on_chunk(done, max(source.estimate_rows(), done), f"Reading {source.name}... ({done:,} rows)")
+
+
+def _header_dtypes(source, string_columns, epoch_column=None):
+    """Return (usecols, dtype) for the header names of a SourceFile that we read.
+
+    Names are matched case-insensitively against string_columns (read as str)
+    and epoch_column (read as Int64 epoch milliseconds).
+    """
+    header = source.header()
+    usecols = []
+    dtype = {}
+    for name in dict.fromkeys(header):
+        key = name.lower()
+        if key in string_columns:
+            dtype[name] = str
+        elif epoch_column and key == epoch_column:
+            dtype[name] = 'Int64'
+        else:
+            continue
+        usecols.append(name)
+    return usecols, dtype
+
+
+def parse_legacy_csv(csv_file, folder, chunk_budget=None, on_chunk=None):
+    """Load one text-msg-data CSV. Returns None if the file is skipped."""
+    try:
+        logger.info("Loading CSV: %s", csv_file)
+        # Text columns are declared up front so that every chunk of a streamed file gets
+        # the same types (a chunk with a blank port would otherwise turn 443 into '443.0').
+        with SourceFile(csv_file) as source:
+            _, dtype = _header_dtypes(source, LEGACY_CSV_STRING_COLUMNS)
+            if chunk_budget:
+                parts = [normalize_legacy_csv_df(chunk, csv_file, folder)
+                         for chunk in iter_csv_chunks(source, chunk_budget, on_chunk, dtype=dtype)]
+                df = pd.concat(parts) if parts else pd.DataFrame()
+            else:
+                df = pd.read_csv(source, dtype=dtype, low_memory=False)
+                source.rows = len(df)
+                if not df.empty:
+                    df = normalize_legacy_csv_df(df, csv_file, folder)
+            df = source.set_line_numbers(df)
+        if df.empty:
+            logger.error("CSV file %s is empty, skipping.", csv_file)
+            return None
+
+        logger.info("CSV %s loaded, rows: %s", csv_file, len(df))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("CSV columns: %s", list(df.columns))
+            logger.debug("Port sample values in %s: %s", csv_file, df['port'].head().tolist())
+        if not (df['port'] != '').any():
+            logger.warning("No port column in %s", csv_file)
+
+        logger.info("Successfully processed %s with %s rows.", csv_file, len(df))
+        return df
+
+    except IngestCancelled:
+        raise
+    except pd.errors.EmptyDataError:
+        logger.error("CSV file %s is empty or invalid.", csv_file)
+    except Exception as e:
+        logger.error("Error loading CSV %s: %s", csv_file, e)
+    return None
+
+
+def normalize_legacy_csv_df(df, csv_file, folder):
+    """Normalize a text-msg-data frame (or chunk of one) to the internal schema."""
+    column_map = {col.lower(): col for col in df.columns}
+    required_columns = ['msg_id', 'sender_jid', 'receiver_jid', 'msg', 'sent_at']
+
+    # Normalize required columns
+    for req_col in required_columns:
+        if req_col == 'sent_at':
+            if 'sent_at' in column_map:
+                df.rename(columns={column_map['sent_at']: 'sent_at'}, inplace=True)
+            elif 'timestamp' in column_map:
+                df.rename(columns={column_map['timestamp']: 'sent_at'}, inplace=True)
+            else:
+                logger.error("No 'sent_at' or 'timestamp' column found in %s", csv_file)
+        elif req_col not in column_map:
+            logger.error("Missing required column %s in %s", req_col, csv_file)
+
+    # Convert optional columns to strings FIRST before dropna to preserve rows with empty msg but valid content_id
+    for col in ['msg', 'content_id', 'ip', 'group_jid', 'port']:
+        if col in df.columns:
+            df[col] = df[col].astype(str).fillna('')
+            if col == 'content_id':
+                df[col] = df[col].str.strip()
+                df[col] = df[col].replace('nan', '')
+        else:
+            df[col] = ''
+
+    df['sent_at'] = parse_timestamps(df['sent_at'], source=csv_file)
+    add_epoch_column(df)
+
+    invalid_count = int(df['sent_at'].isna().sum())
+    if invalid_count:
+        logger.info("Found %s invalid timestamps in %s.", invalid_count, csv_file)
+
+    # --- ADD SOURCE + LINE NUMBER FOR CSV ROWS ---
+    # pandas index represents row position in the file (0-indexed, continuous across chunks)
+    # CSV line 1 = header, CSV line 2 = DataFrame index 0
+    # So: DataFrame index n = CSV line n+2 (SourceFile.set_line_numbers() corrects this
+    # for blank lines and multi-line fields once the file is read)
+    df['source'] = os.path.relpath(csv_file, folder).replace('\\', '/')
+    df['line_number'] = df.index + 2
+
+    pre_clean_rows = len(df)
+    # Only drop rows where TRULY required columns are missing (not msg, since it can be empty for media)
+    df = df.dropna(subset=TRULY_REQUIRED_COLUMNS)
+    if pre_clean_rows != len(df):
+        logger.info("Dropped %s rows without msg_id/sender/receiver/valid sent_at from %s", pre_clean_rows - len(df), csv_file)
+    return df
+
+
+def normalize_new_format_content_df(df, source_label, first_line=2):
+    """Normalize new format columns to internal schema (msg_id, sender_jid, receiver_jid, msg, sent_at, ...).
+
+    first_line is the file line of the frame's first row (2 for a whole file).
+    """
+    col_lower = {str(c).lower(): c for c in df.columns}
+    renames = {}
+    if 'id' in col_lower:
+        renames[col_lower['id']] = 'msg_id'
+    if 'message' in col_lower:
+        renames[col_lower['message']] = 'msg'
+    if 'sender_id' in col_lower:
+        renames[col_lower['sender_id']] = 'sender_jid'
+    if 'receiver_id' in col_lower:
+        renames[col_lower['receiver_id']] = 'receiver_jid'
+    df = df.rename(columns=renames)
+    for c in ['msg', 'content_id', 'ip', 'port', 'filename', 'parent_id', 'app_name', 'group_jid']:
+        if c in df.columns:
+            df[c] = df[c].astype(str).fillna('')
+        else:
+            df[c] = ''
+    for c in ['msg_id', 'sender_jid', 'receiver_jid']:
+        if c not in df.columns:
+            df[c] = ''
+    if 'sent_at_ts' in df.columns:
+        df['sent_at'] = parse_timestamps(df['sent_at_ts'], unit='ms')
+    elif 'sent_at' in df.columns:
+        df['sent_at'] = parse_timestamps(df['sent_at'], source=source_label)
+    else:
+        df['sent_at'] = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns, UTC]')
+    add_epoch_column(df)
+    df['source'] = source_label
+    df['line_number'] = range(first_line, first_line + len(df))
+    return df
+
+
+def _c_engine_dtypes(dtype):
+    """Map declared dtypes to what the C engine reads before _finish_dtypes() converts them.
+
+    The C engine's nullable Int64 parser is about twice as slow as float64;
+    epoch milliseconds are exact in float64, so that is read and converted.
+    'numeric' columns are read as text and coerced.
+    """
+    return {c: 'float64' if t == 'Int64' else str if t == 'numeric' else t for c, t in dtype.items()}
+
+
+def _finish_dtypes(df, dtype):
+    for c, t in dtype.items():
+        if t == 'Int64':
+            df[c] = df[c].astype('Int64')
+        elif t == 'numeric':
+            df[c] = pd.to_numeric(df[c], errors='coerce')
+    return df
+
+
+def _read_csv_typed(source, usecols, dtype):
+    """read_csv restricted to usecols with dtype values of str, 'Int64' or 'numeric'.
+
+    pandas' own pyarrow engine infers types first and casts afterwards
+    (443 becomes '443.0'), so pyarrow is called directly with the declared
+    column types instead.
+    """
+    if CSV_ENGINE != 'pyarrow':
+        df = pd.read_csv(source, usecols=usecols, dtype=_c_engine_dtypes(dtype), engine='c')
+        source.rows = len(df)
+        return _finish_dtypes(df, dtype)
+    column_types = {c: pa.int64() if t == 'Int64' else pa.string() for c, t in dtype.items()}
+    table = pa_csv.read_csv(
+        source,
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=usecols, column_types=column_types, strings_can_be_null=True
+        ),
+    )
+    # self_destruct frees each Arrow column as it is converted, so the file is not held twice
+    df = table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get, split_blocks=True, self_destruct=True)
+    del table
+    source.rows = len(df)
+    for c, t in dtype.items():
+        if t is str:
+            # pyarrow gives None for nulls; match the C engine's NaN
+            df[c] = df[c].where(df[c].notna(), float('nan'))
+        elif t == 'numeric':
+            df[c] = pd.to_numeric(df[c], errors='coerce')
+    return df
+
+
+def read_new_content_csv(source, each_chunk=None, chunk_budget=None, on_chunk=None):
+    """Read data-text.csv / data-media.csv (a SourceFile) with declared dtypes and only the columns we use.
+
+    Text columns are read as str (missing values stay NaN) and sent_at_ts as
+    nullable Int64 epoch milliseconds. Uses the pyarrow engine when pyarrow is
+    installed, otherwise the C engine. each_chunk(df) is applied to the frame,
+    or with a chunk_budget to every streamed chunk before the next is read.
+    """
+    usecols, dtype = _header_dtypes(source, NEW_CONTENT_STRING_COLUMNS, NEW_CONTENT_EPOCH_COLUMN)
+    if not usecols:
+        return pd.DataFrame()
+
+    def read():
+        if not chunk_budget:
+            df = _read_csv_typed(source, usecols, dtype)
+            return each_chunk(df) if each_chunk and not df.empty else df
+        parts = []
+        for chunk in iter_csv_chunks(source, chunk_budget, on_chunk, usecols=usecols, dtype=_c_engine_dtypes(dtype)):
+            chunk = _finish_dtypes(chunk, dtype)
+            parts.append(each_chunk(chunk) if each_chunk else chunk)
+        return pd.concat(parts) if parts else pd.DataFrame()
+
+    try:
+        return read()
+    except (ValueError, TypeError) as e:
+        # Non-integer epoch values (e.g. '1.7e12' or junk): read them as text and coerce
+        epoch_cols = [c for c, t in dtype.items() if t == 'Int64']
+        if not epoch_cols:
+            raise
+        logger.warning("%s: epoch column is not plain integers (%s); coercing.", source.name, e)
+        for c in epoch_cols:
+            dtype[c] = 'numeric'
+        source.rewind()
+        return read()
+
+
+def parse_new_content_csv(path, source_label, chunk_budget=None, on_chunk=None):
+    """Load content/data-text.csv or content/data-media.csv. Returns None if the file is skipped."""
+    def normalize(df):
+        # Index is the row position in the file, also for a chunk
+        df = normalize_new_format_content_df(df, source_label, first_line=int(df.index[0]) + 2)
+        return df.dropna(subset=TRULY_REQUIRED_COLUMNS)
+
+    try:
+        with SourceFile(path) as source:
+            df = source.set_line_numbers(read_new_content_csv(source, normalize, chunk_budget, on_chunk))
+        if df.empty:
+            return None
+        logger.info("Loaded %s: %s rows.", source_label, len(df))
+        return df
+    except IngestCancelled:
+        raise
+    except Exception as e:
+        logger.error("Error loading %s: %s", os.path.basename(path), e)
+        return None
+
+
+def parse_new_log(log_path, folder, chunk_budget=None, on_chunk=None):
+    """Read a new-format .csv log and map its columns. Returns None if skipped."""
+    log_file = os.path.basename(log_path)
+    mapping = NEW_LOG_MAPPINGS.get(log_file)
+    if not mapping:
+        logger.warning("New-format log %s has no column mapping, skipping.", log_file)
+        return None
+    try:
+        logger.info("Reading new-format log %s...", log_file)
+        with SourceFile(log_path) as source:
+            if chunk_budget:
+                parts = []
+                for chunk in iter_csv_chunks(source, chunk_budget, on_chunk, encoding='utf-8'):
+                    part = _map_new_log_df(chunk, mapping, log_path, folder)
+                    if part is None:
+                        return None
+                    parts.append(part)
+                df = pd.concat(parts) if parts else pd.DataFrame()
+            else:
+                df = pd.read_csv(source, encoding='utf-8', low_memory=False)
+                source.rows = len(df)
+                if df.empty:
+                    return None
+                df = _map_new_log_df(df, mapping, log_path, folder)
+                if df is None:
+                    return None
+                # Keep full df (including epoch) for group_send so media pairing can match by epoch
+                df = df.copy()
+            if df.empty:
+                return None
+            # The index is still the row position in the file
+            df['line_number'] = df.index + 2
+            df = source.set_line_numbers(df)
+        logger.info("Loaded new-format log %s: %s rows.", log_file, len(df))
+        return df
+    except IngestCancelled:
+        raise
+    except Exception as e:
+        logger.error("Error processing new-format log %s: %s", log_file, e)
+        return None
+
+
+def _map_new_log_df(df, mapping, log_path, folder):
+    """Map a new-format log frame (or chunk of one) to internal columns and keep rows with a msg or content_id.
+
+    Returns None if the file has no timestamp column.
+    """
+    col_lower = {str(c).lower(): c for c in df.columns}
+
+    def _orig(name):
+        return col_lower.get(str(name).lower())
+    renames = {}
+    for internal, source in [('sender_jid', mapping['sender_jid']), ('receiver_jid', mapping['receiver_jid']),
+                             ('content_id', mapping['content_id']), ('ip', mapping['ip'])]:
+        o = _orig(source)
+        if o:
+            renames[o] = internal
+    if mapping.get('group_jid'):
+        o = _orig(mapping['group_jid'])
+        if o:
+            renames[o] = 'group_jid'
+    df = df.rename(columns=renames)
+    if 'group_jid' not in df.columns:
+        df['group_jid'] = ''
+    ts_col = _orig(mapping['sent_at']) or _orig('ts') or _orig('dt') or _orig('epoch')
+    if not ts_col:
+        return None
+    df['sent_at'] = df[ts_col]
+    if 'content_id' in df.columns:
+        df['msg_id'] = df['content_id'].astype(str)
+    else:
+        df['msg_id'] = ''
+    df['msg'] = ''
+    for c in ['msg', 'content_id', 'ip', 'group_jid', 'port', 'app_name']:
+        if c not in df.columns:
+            df[c] = ''
+        else:
+            df[c] = df[c].astype(str).fillna('')
+    if pd.api.types.is_numeric_dtype(df['sent_at']):
+        df['sent_at'] = parse_timestamps(df['sent_at'], unit='ms')
+    else:
+        df['sent_at'] = parse_timestamps(df['sent_at'], source=log_path)
+    add_epoch_column(df)
+    df['source'] = os.path.relpath(log_path, folder).replace('\\', '/')
+    has_msg = df['msg'].notna() & (df['msg'] != '')
+    has_content_id = df['content_id'].notna() & (df['content_id'] != '')
+    return df[has_msg | has_content_id]
+
+
+def parse_legacy_log(log_path, folder):
+    """Parse a tab separated .txt log in memory. Returns None if skipped.
+
+    line_number is the line of the file, starting at 1; blank lines are skipped.
+    """
+    log_file = os.path.basename(log_path)
+    structure = LOG_FILE_STRUCTURES[log_file]
+    try:
+        logger.info("Reading %s...", log_file)
+        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+            lines = [line.strip() for line in f.read().split('\n')]
+
+        if not any(lines):
+            logger.info("Log file %s is empty or contains only whitespace. Skipping processing.", log_file)
+            return None
+
+        expected_columns = len(structure['headers'])
+        expected_tabs = expected_columns - 1
+        good_lines = []
+        line_numbers = []
+        bad_lines = LogCounter(logging.ERROR, "%s: skipped lines without %d columns", log_file, expected_columns)
+        for line_num, line in enumerate(lines, start=1):
+            if not line:
+                continue
+            tabs = line.count('\t')
+            if tabs != expected_tabs:
+                bad_lines.add(line_num)
+                continue
+            good_lines.append(line)
+            line_numbers.append(line_num)
+        bad_lines.emit()
+        del lines
+        if not good_lines:
+            logger.info("No valid data in %s after processing. Skipping.", log_file)
+            return None
+
+        # Every remaining line has exactly expected_columns fields, so the C parser can
+        # split them in one pass. No quoting, fields stay text and only empty fields are
+        # missing values (as they were when the rows went through a temp CSV file)
+        fields = pd.read_csv(
+            io.StringIO('\n'.join(good_lines)), sep='\t', header=None, names=range(expected_columns),
+            dtype=str, quoting=csv.QUOTE_NONE, keep_default_na=False, na_values=[''],
+            skip_blank_lines=False, engine='c'
+        )
+        del good_lines
+
+        df = pd.DataFrame(index=fields.index)
+        for col in structure['csv_headers']:
+            idx = structure['fields'].get(col)
+            df[col] = fields[idx] if idx is not None else np.nan
+        df['line_number'] = np.asarray(line_numbers, dtype='int64')
+
+        invalid_rows = df[['msg_id', 'sender_jid', 'receiver_jid']].isna().any(axis=1)
+        if invalid_rows.any():
+            LogCounter(logging.ERROR, "%s: skipped rows without msg_id, sender or receiver", log_file).add_all(
+                df.loc[invalid_rows, 'line_number'].to_numpy())
+        df = df[~invalid_rows].reset_index(drop=True)
+        if df.empty:
+            logger.info("No valid data in %s after processing. Skipping.", log_file)
+            return None
+        logger.info("Parsed %s, rows: %s", log_file, len(df))
+
+        df['sent_at'] = parse_timestamps(df['sent_at'], fmt=LEGACY_LOG_TIME_FORMAT)
+        add_epoch_column(df)
+
+        invalid_count = int(df['sent_at'].isna().sum())
+        if invalid_count:
+            logger.info("Found %s invalid timestamps in %s.", invalid_count, log_file)
+
+        for col in ['msg', 'content_id', 'ip', 'group_jid', 'port']:
+            if col in df.columns:
+                df[col] = df[col].astype(str).fillna('')
+            else:
+                df[col] = ''
+
+        df = df[df['msg'].notna() & (df['msg'] != '')]
+        if df.empty:
+            logger.info("No valid messages in %s after filtering. Skipping DataFrame.", log_file)
+            return None
+
+        # --- ADD SOURCE FOR LOG ROWS ---
+        df['source'] = os.path.relpath(log_path, folder).replace('\\', '/')
+        logger.info("Successfully processed %s with %s rows.", log_file, len(df))
+        return df
+
+    except Exception as e:
+        logger.error("Error processing %s: %s", log_file, e)
+        try:
+            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+                first_lines = [next(f, '') for _ in range(5)]
+                logger.error("First 5 lines of %s: %s", log_file, ''.join(first_lines))
+        except Exception as e2:
+            logger.error("Could not read %s for debugging: %s", log_file, e2)
+        return None
+
+
+# Parsers that accept chunk_budget / on_chunk
+STREAMING_PARSERS = (parse_legacy_csv, parse_new_content_csv, parse_new_log)
+
+
+class _RecordCollector(logging.Handler):
+    """Keeps log records emitted inside a worker process so the parent can replay them."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+_worker_cancel = None  # multiprocessing.Event shared with the parent, set by _init_worker
+
+
+def _init_worker(cancel_event, log_level):
+    """Process-pool initializer: keep the parent's cancel event and log level.
+
+    The collector in _parse_in_worker is the worker's only log sink: the parent replays its
+    records through its own handlers and filters, so none may also write from the worker.
+    """
+    global _worker_cancel
+    _worker_cancel = cancel_event
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    for log_filter in list(logger.filters):
+        logger.removeFilter(log_filter)
+    logger.propagate = False
+    logger.setLevel(log_level)  # Records the parent would not log are not even created
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()  # The worker's memory is not part of the parent's report
+
+
+def _check_worker_cancel(done, total, label):
+    """on_chunk callback in a parser process: stop the file once the parent has cancelled."""
+    if _worker_cancel is not None and _worker_cancel.is_set():
+        raise IngestCancelled(label)
+
+
+def _parse_in_worker(func, args, chunk_budget=None):
+    """Process-pool entry point: run one file parser and return (frame, log records, seconds)."""
+    collector = _RecordCollector()
+    logger.addHandler(collector)
+    start = time.perf_counter()
+    try:
+        if chunk_budget and func in STREAMING_PARSERS:
+            df = func(*args, chunk_budget=chunk_budget, on_chunk=_check_worker_cancel)
+        else:
+            df = func(*args)
+        return df, collector.records, time.perf_counter() - start
+    finally:
+        logger.removeHandler(collector)
+
+
+def _join_per_code(codes, values):
+    """'; '.join the values of each code in row order. Returns a Series indexed by code.
+
+    A plain dict pass; groupby().agg(join) builds a Series per group and is
+    far slower for many small groups.
+    """
+    joined = {}
+    for code, value in zip(codes.tolist(), values.tolist()):
+        joined.setdefault(code, []).append(value)
+    return pd.Series({code: '; '.join(parts) for code, parts in joined.items()}, dtype=object)
+
+
+# ---------------------------------------------------------------------- #
+# Message store. Every message of a case lives in one MessageStore, column
+# by column: repeated text (JIDs, sources, IPs, ports, app names, content
+# ids) once per distinct value plus an int32 code per message; message
+# text, msg_id and line_number packed into one UTF-8 buffer each; times as
+# int64; tags as one bitmap per tag name. The GUI reads messages through
+# MessageRow, a dict-like view of one row, and conversations through
+# Conversation, a sequence of row views sorted by sent_at.
+# ---------------------------------------------------------------------- #
+
+# Keys of a message (MessageRow), plus 'receiver_gid' on group_send_msg_platform messages
+MESSAGE_FIELDS = ('msg_id', 'sender', 'receiver', 'message', 'sent_at', 'sent_at_ms', 'tags',
+                  'content_id', 'ip', 'port', 'source', 'line_number', 'app_name', 'production')
+# receiver_jid is the raw receiver (a GID for group sends); it is kept for duplicate keys and stats only
+CATEGORY_FIELDS = ('sender', 'receiver', 'receiver_jid', 'receiver_gid', 'content_id', 'ip', 'port', 'source',
+                   'app_name', 'production')
+TEXT_FIELDS = ('msg_id', 'message', 'line_number')
+SEARCH_FIELDS = ('sender', 'receiver', 'message', 'sent_at', 'content_id')  # What the search bar matches
+SEARCH_SEPARATOR = '\x00'  # Between the fields of a search haystack; never part of a field
+
+
+class _Categories:
+    """Values stored once each, with an int32 code per row (-1 is None)."""
+
+    __slots__ = ('codes', 'values', '_code_of')
+
+    def __init__(self, codes, values):
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.values = list(values)
+        self._code_of = None
+
+    @classmethod
+    def from_values(cls, values):
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        return cls(codes, uniques)
+
+    def __getitem__(self, row):
+        code = self.codes[row]
+        return self.values[code] if code >= 0 else None
+
+    def _encode(self, values):
+        """int32 codes of values, adding the values that are not stored yet."""
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        if self._code_of is None:
+            self._code_of = {v: i for i, v in enumerate(self.values)}
+        mapping = np.empty(len(uniques) + 1, dtype=np.int32)
+        mapping[-1] = -1  # codes of -1 (None) index the last slot
+        for i, v in enumerate(uniques):
+            code = self._code_of.get(v)
+            if code is None:
+                code = self._code_of[v] = len(self.values)
+                self.values.append(v)
+            mapping[i] = code
+        return mapping[codes]
+
+    def append(self, values):
+        self.codes = np.concatenate([self.codes, self._encode(values)])
+
+    def set(self, rows, values):
+        # Codes read from the cache are a read-only memory map
+        codes = self.codes if self.codes.flags.writeable else self.codes.copy()
+        codes[rows] = self._encode(values)
+        self.codes = codes
+
+    def to_pandas(self, rows=None):
+        codes = self.codes if rows is None else self.codes[rows]
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.values, dtype=object))
+
+    def nbytes(self):
+        return self.codes.nbytes + sum(sys.getsizeof(v) for v in self.values) + 8 * len(self.values)
+
+
+class _Texts:
+    """Strings packed into one UTF-8 buffer with int64 offsets.
+
+    The buffer is bytes, or a memoryview of a memory-mapped cache file.
+    """
+
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_values(cls, values):
+        return cls.from_encoded([str(v).encode('utf-8', 'surrogatepass') for v in values])
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        return cls(b''.join(encoded), offsets)
+
+    def __getitem__(self, row):
+        return str(self.data[self.offsets[row]:self.offsets[row + 1]], 'utf-8', 'surrogatepass')
+
+    def append(self, values):
+        other = self.from_values(values)
+        self.offsets = np.concatenate([self.offsets, other.offsets[1:] + self.offsets[-1]])
+        self.data = b''.join((self.data, other.data))
+
+    def set(self, rows, values):
+        """Replace the strings of rows (distinct); the buffer is rebuilt around them."""
+        data = self.data
+        bounds = self.offsets.tolist()
+        sizes = np.diff(self.offsets)
+        parts, pos = [], 0
+        for row, value in sorted(zip(rows, values)):
+            encoded = str(value).encode('utf-8', 'surrogatepass')
+            parts += (data[pos:bounds[row]], encoded)
+            sizes[row] = len(encoded)
+            pos = bounds[row + 1]
+        parts.append(data[pos:])
+        self.data = b''.join(parts)
+        self.offsets = np.concatenate([np.zeros(1, dtype=np.int64), np.cumsum(sizes)])
+
+    def take(self, rows):
+        """The strings of rows, in that order, as a new _Texts."""
+        data = self.data
+        bounds = self.offsets.tolist()
+        return self.from_encoded([data[bounds[i]:bounds[i + 1]] for i in rows])
+
+    def tolist(self, rows=None):
+        data = self.data
+        bounds = self.offsets.tolist()
+        if rows is None:
+            rows = range(len(bounds) - 1)
+        return [str(data[bounds[i]:bounds[i + 1]], 'utf-8', 'surrogatepass') for i in rows]
+
+    def nbytes(self):
+        return len(self.data) + self.offsets.nbytes
+
+
+class _TagBitmaps:
+    """One bitmap (bytearray, bit per row) per tag name."""
+
+    __slots__ = ('bits', 'size')
+
+    def __init__(self, size):
+        self.bits = {}
+        self.size = size
+
+    def __getitem__(self, row):
+        byte, bit = row >> 3, row & 7
+        return {tag for tag, bits in self.bits.items() if bits[byte] >> bit & 1}
+
+    def set(self, row, tags):
+        byte, mask = row >> 3, 1 << (row & 7)
+        for tag in tags:
+            if tag not in self.bits:
+                self.bits[tag] = bytearray((self.size + 7) // 8)
+        for tag, bits in self.bits.items():
+            if tag in tags:
+                bits[byte] |= mask
+            else:
+                bits[byte] &= ~mask
+
+    def grow(self, size):
+        for bits in self.bits.values():
+            bits.extend(bytes((size + 7) // 8 - len(bits)))
+        self.size = size
+
+    def mask(self, tag=None):
+        """Bool array: rows with tag, or with any tag when tag is None."""
+        packed = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        for name, bits in self.bits.items():
+            if tag is None or name == tag:
+                packed |= np.frombuffer(bits, dtype=np.uint8)
+        return np.unpackbits(packed, bitorder='little', count=self.size).astype(bool)
+
+    def nbytes(self):
+        return sum(len(bits) for bits in self.bits.values())
+
+
+def _wall_clock(sent_at_ns, tz):
+    """datetime64[ns] wall-clock times in tz of int64 UTC nanoseconds (MISSING_EPOCH stays NaT)."""
+    wall = pd.DatetimeIndex(sent_at_ns.view('M8[ns]'))
+    if tz is not None:
+        wall = wall.tz_localize('UTC').tz_convert(tz).tz_localize(None)
+    return wall.to_numpy()
+
+
+def _sent_at_text(sent_at_ns, tz):
+    """Fixed-width 'YYYY-MM-DD HH:MM:SS' bytes (b'' for NaT) of int64 UTC nanoseconds."""
+    text = np.datetime_as_string(_wall_clock(sent_at_ns, tz).astype('M8[s]'), unit='s').astype('S19')
+    chars = text.view(np.uint8).reshape(len(text), 19)
+    chars[:, 10] = ord(' ')  # The ISO 'T'
+    text[sent_at_ns == MISSING_EPOCH] = b''
+    return text
+
+
+class MessageStore:
+    """Every message of a case, stored by column. Rows are only ever appended.
+
+    set_values() can change fields of existing rows that the search does
+    not read (source and line_number, for example).
+
+    Besides the columns, the store keeps what the search bar matches: the
+    sent_at text of each row (sent_at_text, as the table shows it) and a
+    haystack per row, the lowercased SEARCH_FIELDS joined by SEARCH_SEPARATOR.
+    search_mask() runs a query over all haystacks in one vectorized call.
+
+    Args:
+        columns: field -> values for every name in CATEGORY_FIELDS and
+            TEXT_FIELDS, plus 'sent_at' (int64 UTC nanoseconds, NaT as
+            MISSING_EPOCH) and 'sent_at_ms' (int64).
+        tz: Time zone of the sent_at Timestamps handed out (None for naive).
+    """
+
+    def __init__(self, columns, tz='UTC'):
+        self.tz = tz
+        self.sent_at_ns = np.asarray(columns['sent_at'], dtype=np.int64)
+        self.sent_at_ms = np.asarray(columns['sent_at_ms'], dtype=np.int64)
+        self.categories = {f: v if isinstance(v, _Categories) else _Categories.from_values(v)
+                           for f, v in ((f, columns[f]) for f in CATEGORY_FIELDS)}
+        self.texts = {f: v if isinstance(v, _Texts) else _Texts.from_values(v)
+                      for f, v in ((f, columns[f]) for f in TEXT_FIELDS)}
+        self.tags = _TagBitmaps(len(self.sent_at_ms))
+        self.sent_at_text = _sent_at_text(self.sent_at_ns, tz)
+        self.haystack = self._haystack(0, len(self))
+        self._by_time = None  # (rows sorted by sent_at_ms, their sent_at_ms), built by rows_between()
+        self._getters = {f: self._getter(f) for f in MESSAGE_FIELDS + ('receiver_gid', 'sent_at_text')}
+
+    def _getter(self, field):
+        if field in self.categories:
+            return self.categories[field].__getitem__
+        if field in self.texts:
+            return self.texts[field].__getitem__
+        if field == 'sent_at':
+            return self.sent_at
+        if field == 'sent_at_ms':
+            return lambda row: int(self.sent_at_ms[row])
+        if field == 'sent_at_text':
+            return lambda row: self.sent_at_text[row].decode('ascii')
+        return self.tags.__getitem__
+
+    def _haystack(self, start, stop):
+        """Search haystacks of rows start to stop, as a string Series (Arrow-backed when pyarrow is installed)."""
+        def lowered(field):
+            column = self.categories[field]
+            # Lowercase each distinct value once; the extra last slot is for code -1 (None)
+            return np.array([str(v).lower() for v in column.values] + [''], dtype=object)[column.codes[start:stop]]
+
+        fields = (
+            lowered('sender'),
+            lowered('receiver'),
+            [m.lower() for m in self.texts['message'].tolist(range(start, stop))],
+            np.char.decode(self.sent_at_text[start:stop], 'ascii').tolist(),
+            lowered('content_id'),
+        )
+        return pd.Series([SEARCH_SEPARATOR.join(parts) for parts in zip(*fields)],
+                         dtype='string[pyarrow]' if pa is not None else object)
+
+    def search_rows(self, text, whole_word=False, rows=None):
+        """Sorted rows (int64) with text in the lowercased text of a search field, as a whole word with whole_word.
+
+        Only rows are looked at when given (a sorted int array).
+        """
+        text = text.lower()
+        haystack = self.haystack if rows is None else self.haystack.iloc[rows]
+        if not text:
+            hits = np.arange(len(haystack))
+        elif SEARCH_SEPARATOR in text:
+            hits = np.zeros(0, dtype=np.int64)
+        else:
+            found = haystack.str.contains(text, regex=False)
+            hits = np.flatnonzero(found.to_numpy(dtype=bool, na_value=False))
+            if whole_word and len(hits):
+                # A whole-word match is a substring match first; only those hits need the regex
+                pattern = re.compile(r'\b' + re.escape(text) + r'\b')
+                values = haystack.iloc[hits].tolist()
+                hits = hits[np.fromiter((pattern.search(v) is not None for v in values), dtype=bool, count=len(values))]
+        return hits if rows is None else np.asarray(rows, dtype=np.int64)[hits]
+
+    def search_mask(self, text, whole_word=False):
+        """Bool array over all rows, True where search_rows() matches."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.search_rows(text, whole_word)] = True
+        return mask
+
+    def __len__(self):
+        return len(self.sent_at_ms)
+
+    def _time_order(self):
+        by_time = self._by_time
+        if by_time is None or len(by_time[0]) != len(self):
+            order = np.argsort(self.sent_at_ms, kind='stable')
+            by_time = self._by_time = (order, self.sent_at_ms[order])
+        return by_time
+
+    def rows_between(self, from_ms, to_ms):
+        """Rows sent from from_ms to to_ms (epoch ms, both included), in sent_at order."""
+        order, sent_at_ms = self._time_order()
+        return order[np.searchsorted(sent_at_ms, from_ms, side='left'):np.searchsorted(sent_at_ms, to_ms, side='right')]
+
+    def sent_at_bounds(self):
+        """(earliest, latest) sent_at_ms of the messages that have one, or None."""
+        _, sent_at_ms = self._time_order()
+        # MISSING_EPOCH is the smallest int64, so messages without a timestamp sort first
+        start = np.searchsorted(sent_at_ms, MISSING_EPOCH, side='right')
+        if start == len(sent_at_ms):
+            return None
+        return int(sent_at_ms[start]), int(sent_at_ms[-1])
+
+    def sent_at(self, row):
+        ns = self.sent_at_ns[row]
+        return pd.NaT if ns == MISSING_EPOCH else pd.Timestamp(int(ns), tz=self.tz)
+
+    def value(self, field, row):
+        return self._getters[field](row)
+
+    def __getitem__(self, row):
+        return MessageRow(self, row)
+
+    def append(self, columns):
+        """Append rows given like the constructor's columns; returns the range of new row numbers."""
+        start = len(self)
+        self.sent_at_ns = np.concatenate([self.sent_at_ns, np.asarray(columns['sent_at'], dtype=np.int64)])
+        self.sent_at_ms = np.concatenate([self.sent_at_ms, np.asarray(columns['sent_at_ms'], dtype=np.int64)])
+        for f in CATEGORY_FIELDS:
+            self.categories[f].append(columns[f])
+        for f in TEXT_FIELDS:
+            self.texts[f].append(columns[f])
+        self.tags.grow(len(self))
+        self.sent_at_text = np.concatenate([self.sent_at_text, _sent_at_text(self.sent_at_ns[start:], self.tz)])
+        self.haystack = pd.concat([self.haystack, self._haystack(start, len(self))], ignore_index=True)
+        self._by_time = None
+        self._getters = {f: self._getter(f) for f in self._getters}
+        return range(start, len(self))
+
+    def set_values(self, rows, columns):
+        """Replace field values of rows (distinct); columns maps category or text fields outside SEARCH_FIELDS to values."""
+        for f, values in columns.items():
+            if f in SEARCH_FIELDS or f not in self.categories and f not in self.texts:
+                raise ValueError(f"Field '{f}' cannot be changed")
+            (self.categories[f] if f in self.categories else self.texts[f]).set(rows, values)
+
+    def to_arrow(self, rows):
+        """(messages, category values) Arrow tables of rows, in that order, for from_arrow(). Needs pyarrow.
+
+        Timestamps are int64 and category fields their codes; the values of
+        each field are rows of the second table, in code order. Text fields
+        are large_binary UTF-8, built from the packed buffers.
+        """
+        columns = {'sent_at': pa.array(self.sent_at_ns[rows]), 'sent_at_ms': pa.array(self.sent_at_ms[rows])}
+        fields, values = [], []
+        for f, column in self.categories.items():
+            columns[f] = pa.array(column.codes[rows])
+            fields.extend([f] * len(column.values))
+            values.extend(column.values)
+        for f, texts in self.texts.items():
+            taken = texts.take(rows.tolist())
+            columns[f] = pa.LargeBinaryArray.from_buffers(
+                pa.large_binary(), len(rows), [None, pa.py_buffer(taken.offsets), pa.py_buffer(taken.data)])
+        return pa.table(columns), pa.table({'field': pa.array(fields, pa.string()), 'value': pa.array(values, pa.string())})
+
+    @classmethod
+    def from_arrow(cls, messages, categories, tz):
+        """Rebuild a store from to_arrow() output without copying its columns.
+
+        Timestamps and codes are numpy views of the Arrow buffers and text
+        fields keep them too, so a store read from a memory-mapped file reads
+        its columns from the file. Only the derived search columns are built.
+        """
+        def array(name):
+            column = messages.column(name)
+            return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+        values = {}
+        for f, value in zip(categories.column('field').to_pylist(), categories.column('value').to_pylist()):
+            values.setdefault(f, []).append(value)
+        columns = {'sent_at': array('sent_at').to_numpy(), 'sent_at_ms': array('sent_at_ms').to_numpy()}
+        for f in CATEGORY_FIELDS:
+            columns[f] = _Categories(array(f).to_numpy(), values.get(f, ()))
+        for f in TEXT_FIELDS:
+            texts = array(f)
+            if not len(texts):
+                columns[f] = _Texts(b'', np.zeros(1, dtype=np.int64))
+                continue
+            _, offsets, data = texts.buffers()
+            offsets = np.frombuffer(offsets, dtype=np.int64)[texts.offset:texts.offset + len(texts) + 1]
+            columns[f] = _Texts(memoryview(data)[:offsets[-1]], offsets)
+        return cls(columns, tz)
+
+    def group_message_counts(self, rows=None):
+        """Count group messages per GID: {gid: (send count, receive count)}.
+
+        Sends are group_send_msg_platform messages, counted by receiver_gid;
+        receives are group_receive messages, counted by receiver without '_g'.
+        A merged message whose source names both files counts as both. Only
+        rows are counted when given.
+        """
+        def per_row(field, func):
+            column = self.categories[field]
+            codes = column.codes if rows is None else column.codes[rows]
+            # Evaluate once per distinct value; the extra last slot is for code -1 (None)
+            return np.array([func(v) for v in column.values] + [func(None)])[codes]
+
+        is_send = per_row('source', lambda v: 'group_send_msg_platform' in str(v))
+        is_receive = per_row('source', lambda v: 'group_receive' in str(v))
+        receiver_gid = per_row('receiver', lambda v: str(v).replace('_g', '').strip() if v is not None else '')
+        send_gid = per_row('receiver_gid', lambda v: v or '')[is_send]
+        send_gid = np.where(send_gid != '', send_gid, receiver_gid[is_send])
+        counts = pd.concat({'send': pd.Series(send_gid, dtype=object).value_counts(),
+                            'receive': pd.Series(receiver_gid[is_receive], dtype=object).value_counts()},
+                           axis=1).fillna(0).astype(np.int64).drop(index='', errors='ignore')
+        return dict(zip(counts.index, zip(counts['send'].tolist(), counts['receive'].tolist())))
+
+    def nbytes(self):
+        """Approximate memory held by the store, in bytes."""
+        return (self.sent_at_ns.nbytes + self.sent_at_ms.nbytes + self.tags.nbytes() + self.sent_at_text.nbytes +
+                int(self.haystack.memory_usage(index=False, deep=True)) +
+                sum(c.nbytes() for c in self.categories.values()) + sum(t.nbytes() for t in self.texts.values()))
+
+
+class MessageRow(Mapping):
+    """Read-only dict-like view of one message in a MessageStore. Only 'tags' can be assigned."""
+
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, key):
+        value = self.store._getters[key](self.row)
+        if value is None and key == 'receiver_gid':
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key != 'tags':
+            raise TypeError(f"Message field '{key}' is read-only")
+        self.store.tags.set(self.row, set(value))
+
+    def __iter__(self):
+        yield from MESSAGE_FIELDS
+        if self.store.categories['receiver_gid'][self.row] is not None:
+            yield 'receiver_gid'
+
+    def __len__(self):
+        return len(MESSAGE_FIELDS) + (self.store.categories['receiver_gid'][self.row] is not None)
+
+    def __repr__(self):
+        return f"MessageRow({dict(self)!r})"
+
+
+def _time_order_key(epoch):
+    """int64 epochs (ms or ns) with MISSING_EPOCH as the largest int64, so untimed messages sort last."""
+    return np.where(epoch == MISSING_EPOCH, np.iinfo(np.int64).max, epoch)
+
+
+class Conversation(Sequence):
+    """The messages of one conversation: row numbers into a MessageStore, sorted by sent_at.
+
+    Messages without a timestamp come last, where the conversation lists
+    have always had them.
+    """
+
+    __slots__ = ('store', 'rows', '_sent_at_ms')
+
+    def __init__(self, store, rows):
+        self.store = store
+        self.rows = rows
+        self._sent_at_ms = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [MessageRow(self.store, row) for row in self.rows[index].tolist()]
+        return MessageRow(self.store, int(self.rows[index]))
+
+    def __iter__(self):
+        store = self.store
+        return (MessageRow(store, row) for row in self.rows.tolist())
+
+    @property
+    def sent_at_ms(self):
+        """sent_at_ms of the messages in order, sorted; missing times are the largest int64, not MISSING_EPOCH."""
+        if self._sent_at_ms is None:
+            self._sent_at_ms = _time_order_key(self.store.sent_at_ms[self.rows])
+        return self._sent_at_ms
+
+    def between(self, from_ms, to_ms):
+        """(start, stop) positions of the messages sent from from_ms to to_ms (epoch ms, both included)."""
+        sent_at_ms = self.sent_at_ms
+        return (int(np.searchsorted(sent_at_ms, from_ms, side='left')),
+                int(np.searchsorted(sent_at_ms, to_ms, side='right')))
+
+    def insert(self, rows, tie_keys=None):
+        """Add store rows, keeping sent_at order.
+
+        Rows at the same time go after the existing ones, or with tie_keys (a
+        function of an array of rows returning a sort key per row) in key
+        order among them; the existing rows at each time must be in that order.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        keys = _time_order_key(self.store.sent_at_ns[rows])
+        if tie_keys is None:
+            order = np.argsort(keys, kind='stable')
+        else:
+            ties = tie_keys(rows)
+            order = np.array(sorted(range(len(rows)), key=lambda i: (keys[i], ties[i])), dtype=np.int64)
+            ties = [ties[i] for i in order]
+        rows, keys = rows[order], keys[order]
+        times = _time_order_key(self.store.sent_at_ns[self.rows])
+        positions = np.searchsorted(times, keys, side='right')
+        if tie_keys is not None:
+            starts = np.searchsorted(times, keys, side='left')
+            for i in np.flatnonzero(starts < positions).tolist():
+                same_time = tie_keys(self.rows[starts[i]:positions[i]])
+                positions[i] = starts[i] + bisect.bisect_right(same_time, ties[i])
+        self.rows = np.insert(self.rows, positions, rows)
+        self._sent_at_ms = None
+
+# ---------------------------------------------------------------------- #
+# Search index. The search bar matches a query against each message's
+# SEARCH_FIELDS, lowercased (see MessageStore.search_rows()). SearchIndex keeps, for every word (\w+ run) of
+# that text, the sorted rows it occurs in (one CSR array pair for the whole
+# store), and indexes the word vocabulary by trigrams. A query is answered
+# by intersecting the rows of its words, so no message is looked at unless
+# the query has characters other than word characters.
+# ---------------------------------------------------------------------- #
+
+_WORD = re.compile(r'\w+')
+
+
+def _csr_gather(offsets, values, ids):
+    """values[offsets[i]:offsets[i + 1]] for each i in ids, concatenated, and the length of each slice."""
+    starts = offsets[ids]
+    lengths = offsets[ids + 1] - starts
+    shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return values[shift + np.arange(len(shift))], lengths
+
+
+class SearchIndex:
+    """Word postings of a MessageStore for the search bar.
+
+    search() returns the same rows as MessageStore.search_rows(). Words of
+    the query are looked up in the postings (for substring mode, every
+    vocabulary word that contains them, found through the trigram index);
+    only queries with other characters, such as spaces or punctuation, check
+    the haystacks of the rows that have all their words.
+
+    update() indexes rows appended to the store since the index was built.
+    Searches may run on another thread while it does; they see the rows
+    indexed before the update started.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.vocab = {}  # word -> word id
+        self.words = []  # word id -> word
+        # (offsets by word id, rows, rows of store indexed), replaced as a whole by update()
+        self._postings = (np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), 0)
+        self._lock = threading.Lock()  # One update() at a time
+        self._value_words = {}  # category field -> (offsets by value code, word ids) of the values seen so far
+        self._grams = None  # (words covered, trigram keys, offsets, word ids), rebuilt when the vocabulary grows
+        self._word_series = None
+        self.update()
+
+    def _word_ids(self, tokens):
+        """Word id of every token, adding new words to the vocabulary."""
+        if not len(tokens):
+            return np.zeros(0, dtype=np.int64)
+        codes, uniques = pd.factorize(np.asarray(tokens, dtype=object))
+        ids = np.empty(len(uniques), dtype=np.int64)
+        for i, word in enumerate(uniques):
+            word_id = self.vocab.get(word)
+            if word_id is None:
+                word_id = self.vocab[word] = len(self.words)
+                self.words.append(word)
+            ids[i] = word_id
+        return ids[codes]
+
+    def _tokenize(self, texts):
+        """(word ids, number of words) of each text, lowercased."""
+        words = [_WORD.findall(text.lower()) for text in texts]
+        counts = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+        return self._word_ids([w for text_words in words for w in text_words]), counts
+
+    def _category_pairs(self, field, start, stop):
+        column = self.store.categories[field]
+        offsets, ids = self._value_words.get(field, (np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)))
+        if len(offsets) - 1 < len(column.values):
+            # Tokenize each distinct value once; rows share their value's words
+            new_ids, counts = self._tokenize([str(v) for v in column.values[len(offsets) - 1:]])
+            offsets = np.concatenate([offsets, offsets[-1] + np.cumsum(counts)])
+            ids = np.concatenate([ids, new_ids])
+            self._value_words[field] = (offsets, ids)
+        codes = column.codes[start:stop]
+        has_value = codes >= 0
+        word_ids, counts = _csr_gather(offsets, ids, codes[has_value])
+        return word_ids, np.repeat(np.arange(start, stop)[has_value], counts)
+
+    def _time_pairs(self, start, stop):
+        ns = self.store.sent_at_ns[start:stop]
+        present = ns != MISSING_EPOCH
+        rows = np.arange(start, stop)[present]
+        wall = pd.DatetimeIndex(_wall_clock(ns[present], self.store.tz))
+        # The words of 'YYYY-MM-DD HH:MM:SS' are its six numbers
+        numbers = np.stack([wall.year, wall.month, wall.day, wall.hour, wall.minute, wall.second], axis=1)
+        two_digit = self._word_ids([f'{n:02d}' for n in range(60)])
+        word_ids = np.empty(numbers.shape, dtype=np.int64)
+        years, year_codes = np.unique(numbers[:, 0], return_inverse=True)
+        word_ids[:, 0] = self._word_ids([f'{y:04d}' for y in years])[year_codes]
+        word_ids[:, 1:] = two_digit[numbers[:, 1:]]
+        return word_ids.ravel(), np.repeat(rows, 6)
+
+    @property
+    def size(self):
+        """Number of rows of the store indexed."""
+        return self._postings[2]
+
+    def update(self):
+        """Index the rows appended to the store since the last update."""
+        with self._lock:
+            self._update()
+
+    def _update(self):
+        start, stop = self.size, len(self.store)
+        if stop <= start:
+            return
+        parts = [self._category_pairs(field, start, stop) for field in ('sender', 'receiver', 'content_id')]
+        texts = self.store.texts['message'].tolist(range(start, stop))
+        ids, counts = self._tokenize(texts)
+        parts.append((ids, np.repeat(np.arange(start, stop), counts)))
+        parts.append(self._time_pairs(start, stop))
+
+        offsets, rows, _ = self._postings
+        old_words = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        new_words = np.concatenate([p[0] for p in parts])
+        new_rows = np.concatenate([p[1] for p in parts])
+        order = np.lexsort((new_rows, new_words))
+        new_words, new_rows = new_words[order], new_rows[order]
+        distinct = np.ones(len(new_words), dtype=bool)
+        distinct[1:] = (new_words[1:] != new_words[:-1]) | (new_rows[1:] != new_rows[:-1])
+        # Old rows all come before the new ones, so a stable sort by word keeps each word's rows sorted
+        words = np.concatenate([old_words, new_words[distinct]])
+        order = np.argsort(words, kind='stable')
+        rows = np.concatenate([rows, new_rows[distinct].astype(np.int32)])[order]
+        offsets = np.zeros(len(self.words) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(words, minlength=len(self.words)), out=offsets[1:])
+        self._postings = (offsets, rows, stop)
+
+    def _gram_index(self):
+        grams = self._grams
+        if grams is not None and grams[0] == len(self.words):
+            return grams
+        words = self.words[:]
+        codepoints = np.frombuffer(('\x00'.join(words) + '\x00').encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        owner = np.repeat(np.arange(len(words)), np.fromiter(map(len, words), dtype=np.int64, count=len(words)) + 1)
+        keys = (codepoints[:-2] << 42) | (codepoints[1:-1] << 21) | codepoints[2:]
+        valid = (codepoints[:-2] != 0) & (codepoints[1:-1] != 0) & (codepoints[2:] != 0)
+        keys, owner = keys[valid], owner[:-2][valid]
+        order = np.lexsort((owner, keys))
+        keys, owner = keys[order], owner[order]
+        distinct = np.ones(len(keys), dtype=bool)
+        distinct[1:] = (keys[1:] != keys[:-1]) | (owner[1:] != owner[:-1])
+        keys, owner = keys[distinct], owner[distinct]
+        unique_keys, starts = np.unique(keys, return_index=True)
+        self._grams = grams = (len(words), unique_keys, np.append(starts, len(keys)), owner)
+        return grams
+
+    def _words_containing(self, part):
+        """Ids of the vocabulary words that contain part."""
+        if len(part) < 3:
+            series = self._word_series
+            if series is None or len(series) != len(self.words):
+                series = self._word_series = pd.Series(self.words[:], dtype=object)
+            return np.flatnonzero(series.str.contains(part, regex=False).to_numpy())
+        _, keys, offsets, owner = self._gram_index()
+        codepoints = np.frombuffer(part.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        part_keys = np.unique((codepoints[:-2] << 42) | (codepoints[1:-1] << 21) | codepoints[2:])
+        positions = np.searchsorted(keys, part_keys)
+        if (positions >= len(keys)).any() or (keys[np.minimum(positions, len(keys) - 1)] != part_keys).any():
+            return np.zeros(0, dtype=np.int64)
+        candidates = None
+        for pos in positions[np.argsort(offsets[positions + 1] - offsets[positions])]:
+            ids = owner[offsets[pos]:offsets[pos + 1]]
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+        words = self.words
+        return np.array([i for i in candidates.tolist() if part in words[i]], dtype=np.int64)
+
+    def search(self, text, whole_word=False):
+        """Sorted rows (int64) whose searchable text contains text, as a whole word with whole_word."""
+        return self._search(text, whole_word)[0]
+
+    def _search(self, text, whole_word):
+        """search() and the number of rows it looked at."""
+        text = text.lower()
+        offsets, rows, size = self._postings
+        if not text:
+            return np.arange(size), size
+        posted = len(offsets) - 1  # Words added by an update in progress have no rows yet
+        parts = _WORD.findall(text)
+        candidates = None
+        for part in dict.fromkeys(parts):
+            if whole_word:
+                word_id = self.vocab.get(part)
+                ids = np.array([word_id] if word_id is not None and word_id < posted else [], dtype=np.int64)
+            else:
+                ids = self._words_containing(part)
+                ids = ids[ids < posted]
+            found, _ = _csr_gather(offsets, rows, ids)
+            found = found.astype(np.int64) if len(ids) == 1 else np.unique(found).astype(np.int64)
+            candidates = found if candidates is None else np.intersect1d(candidates, found, assume_unique=True)
+            if not len(candidates):
+                return candidates, size
+        if candidates is None:
+            candidates = np.arange(size)  # No word characters in the query: every row is a candidate
+        if len(parts) == 1 and parts[0] == text:
+            return candidates, size
+        if len(candidates) > size // 4:
+            rows = self.store.search_rows(text, whole_word)  # Taking most of the haystacks costs more than a full scan
+            return rows[rows < size], size
+        return self.store.search_rows(text, whole_word, candidates), size
+
+    def search_mask(self, text, whole_word=False):
+        """Bool array over all rows of the store, True where search() would match."""
+        mask = np.zeros(len(self.store), dtype=bool)
+        rows, size = self._search(text, whole_word)
+        mask[rows] = True
+        # Rows appended since the last update are not in the postings yet
+        mask[self.store.search_rows(text, whole_word, np.arange(size, len(mask)))] = True
+        return mask
+
+
+# ---------------------------------------------------------------------- #
+# Keyword matching. A keyword list hits a message when one of its keywords
+# is in the lowercased message, or with whole_word, when \b<keyword>\b
+# matches it. KeywordMatcher compiles a list into an Aho-Corasick automaton,
+# so a message is read once however many keywords the list has, and
+# KeywordHits keeps the hits of every list as bitmaps over a MessageStore.
+# ---------------------------------------------------------------------- #
+
+def _is_word_char(char):
+    """Whether re's \\w matches char."""
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """A keyword list compiled for matching messages.
+
+    find() returns the index in keywords of a keyword that hits the text,
+    find_all() all of them. Texts are lowercased and keywords too, like the
+    keyword features always did. Lists of up to SMALL_LIST keywords are
+    checked with 'in', which costs less in Python than stepping the
+    automaton through every character. whole_word may also be one flag per
+    keyword, which lets KeywordHits match several lists in one pass.
+    """
+
+    SMALL_LIST = 32
+
+    def __init__(self, keywords, whole_word=False):
+        self.keywords = list(keywords)
+        self.whole_word = whole_word
+        self._terms = [kw.lower() for kw in self.keywords]
+        if isinstance(whole_word, (bool, int)):
+            self._whole = [bool(whole_word)] * len(self._terms)
+        else:
+            self._whole = [bool(flag) for flag in whole_word]
+        self._empty = [i for i, term in enumerate(self._terms) if not term]
+        self._small = len(self._terms) <= self.SMALL_LIST
+        self._goto, self._fail, self._out = self._build([(i, t) for i, t in enumerate(self._terms) if t])
+
+    @staticmethod
+    def _build(terms):
+        goto = [{}]  # node -> {char: node}
+        out = [()]  # node -> indexes of the terms ending at node, including through fail links
+        for index, term in terms:
+            node = 0
+            for char in term:
+                child = goto[node].get(char)
+                if child is None:
+                    child = goto[node][char] = len(goto)
+                    goto.append({})
+                    out.append(())
+                node = child
+            out[node] += (index,)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                out[child] += out[fail[child]]
+        return goto, fail, out
+
+    def _hits(self, text):
+        """(keyword index, end position) of every occurrence of a keyword in text, by end position."""
+        for index in self._empty:
+            yield index, -1
+        if self._small:
+            for index, term in enumerate(self._terms):
+                start = text.find(term) if term else -1
+                while start >= 0:
+                    yield index, start + len(term) - 1
+                    start = text.find(term, start + 1)
+            return
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                yield index, end
+
+    def _bounded(self, text, index, end):
+        """Whether the occurrence of keyword index ending at end has a \\b on both sides."""
+        term = self._terms[index]
+        if not term:
+            return any(map(_is_word_char, text))  # \b\b: any boundary at all
+        start = end - len(term) + 1
+        before = start > 0 and _is_word_char(text[start - 1])
+        after = end + 1 < len(text) and _is_word_char(text[end + 1])
+        return before != _is_word_char(term[0]) and after != _is_word_char(term[-1])
+
+    def find(self, text):
+        """Index in keywords of a keyword that hits text, or None."""
+        text = text.lower()
+        for index, end in self._hits(text):
+            if not self._whole[index] or self._bounded(text, index, end):
+                return index
+        return None
+
+    def find_all(self, text):
+        """Sorted indexes in keywords of every keyword that hits text."""
+        text = text.lower()
+        return sorted({index for index, end in self._hits(text)
+                       if not self._whole[index] or self._bounded(text, index, end)})
+
+
+class _ListHits:
+    """Hits of one keyword list over the first size rows of a store.
+
+    bits has a bit per row (packed like _TagBitmaps) set where the list hits
+    the message; terms[offsets[row]:offsets[row + 1]] are the sorted indexes
+    in keywords of the keywords that row matched.
+    """
+
+    __slots__ = ('keywords', 'whole_word', 'bits', 'offsets', 'terms')
+
+    def __init__(self, keywords, whole_word, bits, offsets, terms):
+        self.keywords = keywords
+        self.whole_word = whole_word
+        self.bits = bits
+        self.offsets = offsets
+        self.terms = terms
+
+    @property
+    def size(self):
+        return len(self.offsets) - 1
+
+    def hit(self, row):
+        return bool(self.bits[row >> 3] >> (row & 7) & 1)
+
+    def term_ids(self, row):
+        return self.terms[self.offsets[row]:self.offsets[row + 1]].tolist()
+
+    def mask(self):
+        return np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8), bitorder='little', count=self.size).astype(bool)
+
+    def extended(self, tail):
+        """These hits followed by the hits of the rows after them."""
+        bits = np.packbits(np.concatenate([self.mask(), tail.mask()]), bitorder='little').tobytes()
+        offsets = np.concatenate([self.offsets, tail.offsets[1:] + self.offsets[-1]])
+        return _ListHits(self.keywords, self.whole_word, bits, offsets, np.concatenate([self.terms, tail.terms]))
+
+    def nbytes(self):
+        return len(self.bits) + self.offsets.nbytes + self.terms.nbytes
+
+
+class KeywordHits:
+    """Keyword-hit bitmaps of a MessageStore, one per keyword list, by list name.
+
+    add() evaluates any number of lists in one pass over the messages, with
+    one KeywordMatcher over the keywords of all of them. update() extends
+    every list over the rows appended to the store since. A list is found
+    by identity, like the viewer's matcher cache, so lookups of a list that
+    was replaced by an edit return None until it is added again.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lists = {}  # name -> _ListHits, replaced as a whole by add() and update()
+        self._lock = threading.Lock()  # One scan at a time
+
+    def __contains__(self, name):
+        return name in self._lists
+
+    def get(self, keywords, whole_word):
+        """_ListHits of the keyword list keywords, or None when it has not been evaluated."""
+        for hits in tuple(self._lists.values()):
+            if hits.keywords is keywords and hits.whole_word == bool(whole_word):
+                return hits
+        return None
+
+    def hit(self, keywords, whole_word, row):
+        """Whether the list hits the message of row, or None when that is not known yet."""
+        hits = self.get(keywords, whole_word)
+        if hits is None or row >= hits.size:
+            return None
+        return hits.hit(row)
+
+    def mask(self, keywords, whole_word):
+        """Bool array of the rows of the store the list hits, or None when it does not cover them all."""
+        hits = self.get(keywords, whole_word)
+        if hits is None or hits.size < len(self.store):
+            return None
+        return hits.mask()
+
+    def discard(self, name):
+        self._lists.pop(name, None)
+
+    def add(self, lists, cancelled=None):
+        """Evaluate lists (name -> (keywords, whole_word)) over every row of the store.
+
+        cancelled is polled every few thousand messages; when it returns
+        True the scan raises IngestCancelled and no list is added.
+        """
+        with self._lock:
+            lists = {name: (keywords, bool(whole_word)) for name, (keywords, whole_word) in lists.items()}
+            self._lists.update(self._scan(lists, 0, len(self.store), cancelled))
+
+    def update(self):
+        """Extend every list over the rows appended to the store since it was evaluated."""
+        with self._lock:
+            stop = len(self.store)
+            by_start = {}
+            for name, hits in self._lists.items():
+                if hits.size < stop:
+                    by_start.setdefault(hits.size, {})[name] = hits
+            for start, group in by_start.items():
+                tails = self._scan({name: (h.keywords, h.whole_word) for name, h in group.items()}, start, stop)
+                for name, tail in tails.items():
+                    if self._lists.get(name) is group[name]:  # Not discarded meanwhile
+                        self._lists[name] = group[name].extended(tail)
+
+    def _scan(self, lists, start, stop, cancelled=None):
+        """name -> _ListHits of rows start..stop for each of lists, from one pass over their messages."""
+        names = list(lists)
+        terms, whole, owner, local = [], [], [], []
+        for n, name in enumerate(names):
+            keywords, whole_word = lists[name]
+            terms.extend(keywords)
+            whole.extend([whole_word] * len(keywords))
+            owner.extend([n] * len(keywords))
+            local.extend(range(len(keywords)))
+        found = [([], []) for _ in names]  # per list: (rows, term ids)
+        if terms:
+            matcher = KeywordMatcher(terms, whole)
+            texts = self.store.texts['message'].tolist(range(start, stop))
+            for row, text in enumerate(texts):
+                if cancelled is not None and not row & 0xfff and cancelled():
+                    raise IngestCancelled('keyword hits')
+                if not text:
+                    continue
+                for term in matcher.find_all(text):
+                    rows, term_ids = found[owner[term]]
+                    rows.append(row)
+                    term_ids.append(local[term])
+        result = {}
+        for name, (rows, term_ids) in zip(names, found):
+            counts = np.bincount(np.asarray(rows, dtype=np.int64), minlength=stop - start)
+            offsets = np.zeros(stop - start + 1, dtype=np.int32)
+            np.cumsum(counts, out=offsets[1:])
+            bits = np.packbits(counts > 0, bitorder='little').tobytes()
+            keywords, whole_word = lists[name]
+            result[name] = _ListHits(keywords, whole_word, bits, offsets, np.asarray(term_ids, dtype=np.int32))
+        return result
+
+    def nbytes(self):
+        return sum(hits.nbytes() for hits in tuple(self._lists.values()))
+
+
+# ---------------------------------------------------------------------- #
+# Case cache. After a full ingest the message store, media index and
+# conversation index are written as uncompressed Arrow (Feather) files
+# under cache_dir, one directory per case folder. They are reused while
+# the fingerprint of the inputs (path, size and mtime of every file under
+# content/, logs/ and medias/, plus the group legend) is unchanged. A store
+# read back keeps its columns in the memory-mapped files (see
+# MessageStore.from_arrow()). Needs pyarrow; without it every load parses.
+# ---------------------------------------------------------------------- #
+
+CACHE_VERSION = 5  # Bump when the parsed output changes so old caches are ignored
+
+
+def case_input_files(case, inventory=None):
+    """Return path -> InventoryFile for every file an ingest of case can read.
+
+    That is everything under content/, logs/ and the root medias/ folder, plus
+    the group legend. Uses case.inventory unless another inventory is given.
+    """
+    inventory = inventory or case.inventory
+    inputs = {}
+    for top in (case.content_folder, case.logs_folder, os.path.join(case.folder, 'medias')):
+        for _, _, files in inventory.walk(top):
+            inputs.update((f.path, f) for f in files)
+    for f in inventory.files(case.folder):
+        if fnmatch.fnmatch(os.path.basename(f.path), 'group-legend-*.csv'):
+            inputs[f.path] = f
+    return inputs
+
+
+def case_fingerprint(case):
+    """Hash of everything an ingest of this case reads, taken from the folder inventory."""
+    inputs = case_input_files(case)
+    digest = hashlib.sha256(f"{CACHE_VERSION}\n{case.is_new_format}\n".encode())
+    for path in sorted(case.csv_files):
+        digest.update(f"csv\t{os.path.relpath(path, case.folder)}\n".encode())
+    for path in sorted(inputs):
+        f = inputs[path]
+        digest.update(f"{os.path.relpath(path, case.folder)}\t{f.size}\t{f.mtime!r}\n".encode())
+    return digest.hexdigest()
+
+
+def _case_cache_path(case, cache_dir):
+    """Directory of the cached case folder's caches, and of the one for its current fingerprint in it.
+
+    A store read from a cache maps its files, and Windows cannot delete
+    mapped files, so a new cache never replaces the directory of an older
+    one; older ones are deleted once nothing maps them any more.
+    """
+    folder_key = hashlib.sha256(os.path.normcase(os.path.abspath(case.folder)).encode()).hexdigest()[:16]
+    folder_dir = os.path.join(cache_dir, folder_key)
+    return folder_dir, os.path.join(folder_dir, case.fingerprint[:16])
+
+
+def _write_feather(df, path):
+    # Object columns must hold one type for Arrow; mixed ones (line_number is int or '12; 15') are stored as text
+    for c in df.columns:
+        if df[c].dtype == object and pd.api.types.infer_dtype(df[c], skipna=True) not in ('string', 'empty'):
+            df[c] = df[c].astype(str)
+    pa_feather.write_feather(df, path, compression='uncompressed')
+
+
+def _write_table(table, path):
+    # One record batch, so every column reads back as a single array over the mapped file
+    pa_feather.write_feather(table, path, compression='uncompressed', chunksize=max(table.num_rows, 1))
+
+
+def save_case_cache(case, cache_dir):
+    """Write the ingest result of case to cache_dir. Returns True if it was written."""
+    if pa_feather is None or case.fingerprint is None:
+        return False
+    folder_dir, target = _case_cache_path(case, cache_dir)
+    tmp = target + '.tmp'
+    try:
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        # Messages are written conversation by conversation, so each one reads back as a contiguous run of rows
+        conv_ids = list(case.conversations)
+        rows = [case.conversations[conv_id].rows for conv_id in conv_ids]
+        order = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        messages, categories = case.messages.to_arrow(order)
+        _write_table(messages, os.path.join(tmp, 'messages.feather'))
+        _write_table(categories, os.path.join(tmp, 'categories.feather'))
+        _write_feather(pd.DataFrame({
+            'user_a': [c[0] for c in conv_ids],
+            'user_b': [c[1] for c in conv_ids],
+            'messages': [len(r) for r in rows],
+            'media_count': [case.media_counts.get(c, 0) for c in conv_ids],
+        }), os.path.join(tmp, 'conversations.feather'))
+        _write_feather(pd.DataFrame({'content_id': list(case.media_files), 'path': list(case.media_files.values())}),
+                       os.path.join(tmp, 'media_files.feather'))
+        # The manifest is written last: a cache directory without one is never read
+        with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': CACHE_VERSION,
+                'fingerprint': case.fingerprint,
+                'folder': case.folder,
+                'medias_folder': case.medias_folder,
+                'media_report': case.media_report,
+                'messages': len(order),
+                'tz': None if case.messages.tz is None else str(case.messages.tz),
+            }, f)
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp, target)
+        for entry in os.scandir(folder_dir):
+            if entry.name == os.path.basename(target):
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)  # Still mapped ones go next time
+            else:
+                try:
+                    os.remove(entry.path)  # Files of the single-directory layout of older versions
+                except OSError:
+                    pass
+        logger.info("Saved case cache for %s to %s.", case.folder, target)
+        return True
+    except Exception as e:
+        logger.warning("Could not save case cache for %s: %s", case.folder, e)
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+
+
+def load_case_cache(case, cache_dir):
+    """Fill case from cache_dir if its fingerprint matches. Returns True on a hit.
+
+    The combined frame is not cached; case.combined_df stays None.
+    """
+    if pa_feather is None or case.fingerprint is None:
+        return False
+    folder_dir, path = _case_cache_path(case, cache_dir)
+    try:
+        with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        if os.path.isdir(folder_dir):
+            logger.info("Case cache for %s is out of date; parsing.", case.folder)
+        return False
+    if manifest.get('version') != CACHE_VERSION or manifest.get('fingerprint') != case.fingerprint:
+        logger.info("Case cache for %s is out of date; parsing.", case.folder)
+        return False
+    try:
+        def read(name):
+            return pa_feather.read_table(os.path.join(path, name), memory_map=True)
+        # The store keeps the mapped buffers of its columns; the small indexes are read into pandas
+        store = MessageStore.from_arrow(read('messages.feather'), read('categories.feather'), manifest.get('tz'))
+        conv_df = read('conversations.feather').to_pandas()
+        media_df = read('media_files.feather').to_pandas()
+    except Exception as e:
+        logger.warning("Could not read case cache for %s: %s", case.folder, e)
+        return False
+
+    rows = np.arange(len(store))
+    stops = conv_df['messages'].cumsum().tolist()
+    starts = [0] + stops[:-1]
+    conversations = {}
+    media_counts = {}
+    for user_a, user_b, start, stop, media_count in zip(conv_df['user_a'], conv_df['user_b'], starts, stops,
+                                                        conv_df['media_count'].tolist()):
+        conversations[(user_a, user_b)] = Conversation(store, rows[start:stop])
+        media_counts[(user_a, user_b)] = media_count
+
+    case.combined_df = None
+    case.messages = store
+    case.conversations = conversations
+    case.media_counts = media_counts
+    case.group_counts = store.group_message_counts()
+    case.media_files = dict(zip(media_df['content_id'], media_df['path']))
+    case.medias_folder = manifest.get('medias_folder')
+    case.media_report = manifest.get('media_report')
+    case.from_cache = True
+    logger.info("Loaded case from cache: %s messages, %s conversations.", manifest.get('messages'), len(conversations))
+    return True
+
+
+def clear_case_cache(cache_dir):
+    """Delete every cached case under cache_dir."""
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+class KikIngestEngine:
+    """Runs the ingestion stages for a Kik data folder without any GUI.
+
+    Args:
+        progress_callback: Optional callable ``(done, total, label)``. A total of 0
+            means the stage has no measurable length. Returning False cancels the
+            ingest with IngestCancelled. It is called on the thread running the
+            ingest; cancel() can be called from any other thread.
+        max_workers: Upper bound on parser processes. Defaults to the CPU count,
+            capped at MAX_PARSE_WORKERS; 1 parses every file in-process.
+        memory_limit_mb: Optional memory ceiling for reading files. When set,
+            content and log CSVs are streamed in chunks of about
+            1/STREAM_CHUNK_SHARE of the limit, one file at a time. None
+            streams CANCEL_CHUNK_BYTES chunks, in parallel when worthwhile.
+            Progress and cancel are checked after every chunk either way.
+        cache_dir: Optional directory for the case cache. When set, ingest()
+            reuses a cached result whose input fingerprint still matches and
+            saves a new one after parsing.
+        profile: Also trace memory with tracemalloc for case.stage_stats.
+            Wall time and rows are always recorded; tracing slows the stages
+            down, so it is off by default.
+    """
+
+    def __init__(self, progress_callback=None, max_workers=None, memory_limit_mb=None, cache_dir=None,
+                 profile=False):
+        self.progress_callback = progress_callback
+        if max_workers is None:
+            max_workers = min(MAX_PARSE_WORKERS, os.cpu_count() or 1)
+        self.max_workers = max(1, max_workers)
+        self.memory_limit_mb = memory_limit_mb or None
+        self.chunk_budget = memory_limit_mb * 1024 * 1024 // STREAM_CHUNK_SHARE if memory_limit_mb else None
+        self.cache_dir = cache_dir
+        self.profile = profile
+        self._cancel_event = threading.Event()
+        self._worker_cancel = None  # multiprocessing.Event of the running parser pool
+
+    def cancel(self):
+        """Ask a running ingest to stop. Thread-safe; the ingest raises IngestCancelled.
+
+        Files are read in chunks and the flag is checked after every chunk and
+        between stages, so the ingest stops within about one chunk of work.
+        Parser processes see the request through a shared event.
+        """
+        self._cancel_event.set()
+        worker_cancel = self._worker_cancel
+        if worker_cancel is not None:
+            worker_cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _report(self, done, total, label):
+        if self._cancel_event.is_set():
+            raise IngestCancelled(label)
+        if self.progress_callback is None:
+            return
+        if self.progress_callback(done, total, label) is False:
+            raise IngestCancelled(label)
+
+    @contextmanager
+    def _stage(self, case, name):
+        """Time a stage into case.timings and case.stage_stats; yields its StageStats for row counts."""
+        stats = case.stage_stats.get(name)
+        if stats is None:
+            stats = case.stage_stats[name] = StageStats(name)
+        started_tracing = False
+        if self.profile:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            elapsed = time.perf_counter() - start
+            case.timings[name] = case.timings.get(name, 0.0) + elapsed
+            stats.calls += 1
+            stats.seconds += elapsed
+            if self.profile:
+                peak = tracemalloc.get_traced_memory()[1] - traced_before
+                stats.peak_bytes = max(stats.peak_bytes or 0, peak)
+                if started_tracing:
+                    tracemalloc.stop()
+            stats.max_rss_bytes = _max_rss_bytes()
+
+    # ------------------------------------------------------------------ #
+    # Public entry points
+    # ------------------------------------------------------------------ #
+    def discover(self, folder):
+        """Locate content/logs, load the group legend and detect the record format.
+
+        Raises IngestError if the folder layout cannot be used.
+        """
+        case = ParsedCase(folder)
+        self._report(0, 0, "Locating content and logs...")
+        with self._stage(case, 'inventory') as stage:
+            case.inventory = FolderInventory.build(folder)
+            stage.count(rows_out=len(case.inventory))
+        with self._stage(case, 'discover'):
+            self._locate_folders(case)
+        with self._stage(case, 'group_legend') as stage:
+            self.load_group_legend(case)
+            stage.count(rows_out=len(case.group_legend_rows))
+        with self._stage(case, 'discover'):
+            self._detect_format(case)
+        return case
+
+    def ingest(self, case, csv_files=None):
+        """Run every parsing stage on a discovered case and return it.
+
+        Args:
+            case: ParsedCase returned by discover().
+            csv_files: Legacy format only - the text-msg-data CSVs to load.
+                Defaults to every CSV found during discovery.
+        """
+        if not case.is_new_format:
+            if csv_files is not None:
+                case.csv_files = list(csv_files)
+            if not case.csv_files:
+                logger.error("No CSV files selected.")
+                raise IngestError("No CSV files selected.\n\nPlease select one or more CSV files from the 'text-msg-data' folder.")
+        clear_timestamp_formats()
+        if self.cache_dir:
+            self._report(0, 0, "Checking case cache...")
+            with self._stage(case, 'cache_load') as stage:
+                case.fingerprint = case_fingerprint(case)
+                cached = load_case_cache(case, self.cache_dir)
+                if cached:
+                    stage.count(rows_out=len(case.messages))
+            if cached:
+                logger.info("Ingest timings: %s", _format_timings(case.timings))
+                log_rate_limiter.flush()
+                return case
+        with self._stage(case, 'index_media') as stage:
+            self.index_media(case)
+            stage.count(rows_out=len(case.media_files))
+        with self._stage(case, 'parse_files') as stage:
+            dfs, log_dfs = self.parse_files(case)
+            parsed_rows = sum(len(df) for df in dfs + log_dfs)
+            stage.count(rows_out=parsed_rows)
+        self._report(0, 0, "Combining content and log data...")
+        with self._stage(case, 'pair_media') as stage:
+            self._set_production(dfs + log_dfs, case.production)
+            all_dfs = self.pair_media(case, dfs, log_dfs)
+            stage.count(parsed_rows, sum(len(df) for df in all_dfs))
+        with self._stage(case, 'merge_duplicates') as stage:
+            case.combined_df = self.merge_duplicates(all_dfs)
+            stage.count(sum(len(df) for df in all_dfs), len(case.combined_df))
+        del dfs, log_dfs, all_dfs
+        with self._stage(case, 'build_conversations') as stage:
+            self.build_conversations(case)
+            stage.count(len(case.combined_df), len(case.messages))
+        if self.cache_dir:
+            self._report(0, 0, "Saving case cache...")
+            with self._stage(case, 'cache_save') as stage:
+                save_case_cache(case, self.cache_dir)
+                stage.count(rows_in=len(case.messages))
+        logger.info("Ingest timings: %s", _format_timings(case.timings))
+        log_rate_limiter.flush()
+        return case
+
+    def ingest_productions(self, folders):
+        """Discover and ingest several Kik returns (productions) into one session case.
+
+        Every file of every production is parsed in the same process pool, so
+        the returns are read in parallel. Media is paired within each
+        production, then duplicates are merged across all of them by the usual
+        duplicate key, so a conversation between two targets is one
+        conversation with the messages of both returns. Each message's
+        'production' names the return(s) it came from (the folder name, made
+        unique). Legacy returns load every text-msg-data CSV. Sessions are not
+        cached and cannot take supplemental data.
+
+        Returns the session ParsedCase, whose folder is the first folder; its
+        productions are the discovered ParsedCase of each folder. Raises IngestError naming the folder that
+        cannot be loaded.
+        """
+        folders = [os.path.abspath(folder) for folder in folders]
+        # The productions may be on different drives, so there is no common folder to name the session by
+        session = ParsedCase(folders[0])
+        base_names = [os.path.basename(os.path.normpath(folder)) for folder in folders]
+        names = [f"{name} ({base_names[:i].count(name) + 1})" if base_names.count(name) > 1 else name
+                 for i, name in enumerate(base_names)]
+        for folder, name in zip(folders, names):
+            # One 'discover' stage per production: inventory, discovery and group legend together
+            with self._stage(session, 'discover') as stage:
+                try:
+                    case = self.discover(folder)
+                except IngestError as e:
+                    raise IngestError(f"{folder}:\n\n{e}") from e
+                stage.count(rows_out=len(case.inventory))
+            case.production = name
+            session.productions.append(case)
+            for rec in case.group_legend_rows:
+                if rec['gid'] not in session.group_legend_by_gid:
+                    session.group_legend_by_gid[rec['gid']] = case.group_legend_by_gid[rec['gid']]
+                    session.group_legend_rows.append(rec)
+        session.is_new_format = all(case.is_new_format for case in session.productions)
+
+        clear_timestamp_formats()
+        with self._stage(session, 'index_media') as stage:
+            for case in session.productions:
+                self.index_media(case)
+            stage.count(rows_out=sum(len(case.media_files) for case in session.productions))
+        tasks, spans = [], []
+        for case in session.productions:
+            if not case.is_new_format and not case.csv_files:
+                raise IngestError(f"No CSV files found in the 'text-msg-data' folder of {case.folder}.")
+            content_tasks, log_tasks = self._content_tasks(case), self._log_tasks(case)
+            spans.append((len(tasks), len(content_tasks), len(log_tasks)))
+            tasks.extend(content_tasks + log_tasks)
+        with self._stage(session, 'parse_files') as stage:
+            results = self._run_parsers(session, tasks)
+            parsed_rows = sum(len(df) for df in results if df is not None)
+            stage.count(rows_out=parsed_rows)
+
+        self._report(0, 0, "Combining content and log data...")
+        all_dfs = []
+        with self._stage(session, 'pair_media') as stage:
+            for case, (start, n_content, n_log) in zip(session.productions, spans):
+                content_results = results[start:start + n_content]
+                if case.is_new_format:
+                    for (func, args), df in zip(tasks[start:start + n_content], content_results):
+                        if df is not None and args[1] == 'content/data-media.csv':
+                            self._index_new_format_media(case, df)
+                dfs = [df for df in content_results if df is not None]
+                log_dfs = [df for df in results[start + n_content:start + n_content + n_log] if df is not None]
+                if not dfs:
+                    raise IngestError(f"No valid CSV files loaded from {case.folder}.\n\nPlease check its 'content' folder.")
+                self._set_production(dfs + log_dfs, case.production)
+                all_dfs.extend(self.pair_media(case, dfs, log_dfs))
+                session.media_files.update(case.media_files)
+                if case.media_report:
+                    session.media_report = session.media_report or {'missing': [], 'unreferenced': []}
+                    for kind in ('missing', 'unreferenced'):
+                        session.media_report[kind].extend(case.media_report[kind])
+            stage.count(parsed_rows, sum(len(df) for df in all_dfs))
+        del results
+        with self._stage(session, 'merge_duplicates') as stage:
+            session.combined_df = self.merge_duplicates(all_dfs)
+            stage.count(sum(len(df) for df in all_dfs), len(session.combined_df))
+        del all_dfs
+        with self._stage(session, 'build_conversations') as stage:
+            self.build_conversations(session)
+            stage.count(len(session.combined_df), len(session.messages))
+        logger.info("Loaded %d productions: %s. Ingest timings: %s", len(names), ', '.join(names),
+                    _format_timings(session.timings))
+        log_rate_limiter.flush()
+        return session
+
+    def ingest_supplement(self, case):
+        """Add the files that are new or changed since case was ingested, in place.
+
+        The folder is listed again and compared with case.inventory by path,
+        size and modification time. Only new or changed content and log files
+        are parsed (for the legacy format, new text-msg-data CSVs are added to
+        the selection). A row whose duplicate key is already in the case adds
+        its file and line number to the source of that message; the rest are
+        appended to combined_df and inserted into the existing conversation
+        lists in sent_at order. Existing message dicts are
+        kept, so their tags stay, and conversation ids do not change. Rows that
+        disappeared from a changed file are not removed.
+
+        Returns the number of messages added. Raises IngestError if the folder
+        no longer matches the case, or if case is a multi-production session.
+        """
+        if case.productions:
+            raise IngestError("Supplemental data cannot be added to a session of several productions.\n\n"
+                              "Please load the productions again instead.")
+        case.timings = OrderedDict()
+        case.stage_stats = OrderedDict()
+        case.file_stats = []
+        self._report(0, 0, "Looking for new files...")
+        with self._stage(case, 'inventory') as stage:
+            inventory = FolderInventory.build(case.folder)
+            stage.count(rows_out=len(inventory))
+        with self._stage(case, 'discover'):
+            before = case_input_files(case)
+            after = case_input_files(case, inventory)
+            changed = {path for path, f in after.items()
+                       if path not in before or (before[path].size, before[path].mtime) != (f.size, f.mtime)}
+            if not inventory.is_dir(case.content_folder) or not inventory.is_dir(case.logs_folder):
+                raise IngestError("The 'content' and 'logs' folders of this case are no longer in the selected folder.\n\nPlease load the folder as a new case.")
+            if not case.is_new_format and (inventory.is_file(case.data_text_path) or inventory.is_file(case.data_media_path)):
+                raise IngestError("The folder now holds new-format records (data-text.csv/data-media.csv).\n\nPlease load it as a new case.")
+            logger.info("Supplemental load: %s new or changed file(s) in %s", len(changed), case.folder)
+            if not changed:
+                return 0
+
+        # Nothing in case changes for good until the new messages are merged; a
+        # cancelled or failed load leaves it as it was, so the same files count as new next time
+        saved = (case.inventory, list(case.csv_files), dict(case.media_files), case.media_report)
+        try:
+            case.inventory = inventory
+            if not case.is_new_format:
+                case.csv_files.extend(f.path for _, _, files in inventory.walk(case.text_msg_dir)
+                                      for f in files if f.ext == '.csv' and f.path not in before)
+                content_prefix = os.path.join(case.content_folder, '')
+                for path in changed:
+                    if path.startswith(content_prefix) and os.path.splitext(path)[1].lower() in MEDIA_EXTENSIONS:
+                        case.media_files[os.path.splitext(os.path.basename(path))[0]] = path
+            content_tasks, log_tasks = self._content_tasks(case), self._log_tasks(case)
+            # Position of every input file in a full load, which lists the sources of a merged message in that order
+            file_order = {os.path.basename(args[0]): i for i, (_, args) in enumerate(content_tasks + log_tasks)}
+            content_tasks = [t for t in content_tasks if t[1][0] in changed]
+            log_tasks = [t for t in log_tasks if t[1][0] in changed]
+
+            added = 0
+            if content_tasks or log_tasks:
+                clear_timestamp_formats()
+                with self._stage(case, 'parse_files') as stage:
+                    results = self._run_parsers(case, content_tasks + log_tasks)
+                    dfs = [df for df in results[:len(content_tasks)] if df is not None]
+                    log_dfs = [df for df in results[len(content_tasks):] if df is not None]
+                    parsed_rows = sum(len(df) for df in dfs + log_dfs)
+                    stage.count(rows_out=parsed_rows)
+                    if case.is_new_format:
+                        for (func, args), df in zip(content_tasks, results):
+                            if df is not None and args[1] == 'content/data-media.csv':
+                                self._index_new_format_media(case, df)
+                if dfs or log_dfs:
+                    self._report(0, 0, "Combining new data...")
+                    with self._stage(case, 'pair_media') as stage:
+                        self._set_production(dfs + log_dfs, case.production)
+                        all_dfs = self.pair_media(case, dfs, log_dfs)
+                        stage.count(parsed_rows, sum(len(df) for df in all_dfs))
+                    with self._stage(case, 'merge_duplicates') as stage:
+                        added = self._merge_supplement(case, [df for df in all_dfs if not df.empty], file_order)
+                        stage.count(sum(len(df) for df in all_dfs), added)
+        except BaseException:
+            case.inventory, case.csv_files, case.media_files, case.media_report = saved
+            raise
+        if self.cache_dir:
+            self._report(0, 0, "Saving case cache...")
+            with self._stage(case, 'cache_save') as stage:
+                case.fingerprint = case_fingerprint(case)
+                save_case_cache(case, self.cache_dir)
+                stage.count(rows_in=len(case.messages))
+        logger.info("Supplemental load added %d message(s). Timings: %s", added, _format_timings(case.timings))
+        log_rate_limiter.flush()
+        return added
+
+    @classmethod
+    def _store_dup_keys(cls, store, rows):
+        """Duplicate keys of the given rows of store, as _dup_keys() gives them for parsed rows."""
+        def part(field, empty=''):
+            column = store.categories[field]
+            # Every distinct value once; the extra last slot is for code -1 (None, NaN in a frame)
+            return cls._key_part(np.array(column.values + [np.nan], dtype=object), empty)[column.codes[rows]]
+
+        return pd.Series(part('sender') + '|' + part('receiver_jid') + '|' +
+                         cls._epoch_second_strings(store.sent_at_ms[rows]) + '|' +
+                         part('ip') + '|' + part('content_id', 'NO_CONTENT_ID'), dtype=object)
+
+    def _merge_supplement(self, case, all_dfs, file_order):
+        """Insert the messages of all_dfs that are not in case yet, as a full load would keep them.
+
+        When the case has both content CSV and log rows, duplicates merge as in
+        merge_duplicates(): a row whose key is in case adds its file to that
+        message's source instead, in file_order (file name -> position).
+        Otherwise only rows of a changed file that
+        the message with their key already lists (parsed again) are left out.
+        """
+        if not all_dfs:
+            return 0
+        delta = self.merge_duplicates(all_dfs)
+        store = case.messages
+        if case.dup_keys is None:
+            keys = self._store_dup_keys(store, np.arange(len(store))).tolist()
+            # Reversed, so the first row of a key is the one kept
+            case.dup_keys = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+        sources = {name for value in store.categories['source'].values if value for name in value.split('; ')}
+        sources.update(delta['source'].unique())
+        merging = len({self.identify_source_type(source) for source in sources}) > 1
+        # Probe the dict per delta row; Series.isin would copy the whole key set every time
+        existing = [case.dup_keys.get(k) for k in self._dup_keys(delta).tolist()]
+        if merging:
+            is_new = np.fromiter((row is None for row in existing), dtype=bool, count=len(existing))
+            parsed = pd.concat([df[REQUIRED_COLUMNS] for df in all_dfs], ignore_index=True)
+            parsed_keys = self._dup_keys(parsed).tolist()
+            repeated = [case.dup_keys.get(k) for k in parsed_keys]
+        else:
+            is_new = np.fromiter((row is None or not self._lists_file(store, row, source)
+                                  for row, source in zip(existing, delta['source'])), dtype=bool, count=len(existing))
+        logger.info("Supplemental rows: %s parsed, %s already in the case", len(delta), len(delta) - is_new.sum())
+        delta = delta[is_new].reset_index(drop=True)
+        if not delta.empty:
+            # Reports progress, so may be cancelled; nothing in case has changed yet
+            conv_ids, conv_codes, columns, tz, has_media = self._message_columns(case, delta)
+
+        if merging:
+            self._add_sources(case, repeated, parsed_keys, parsed, file_order)
+        if delta.empty:
+            return 0
+        if case.combined_df is not None:
+            case.combined_df = pd.concat([case.combined_df, delta], ignore_index=True)
+        new_rows = store.append(columns)
+        rows = np.arange(new_rows.start, new_rows.stop)
+        for key, row in zip(self._store_dup_keys(store, rows).tolist(), rows.tolist()):
+            case.dup_keys.setdefault(key, row)
+        tie_keys = None
+        if merging:
+            # A full load orders merged messages by key before sorting them by time
+            key_of = {row: key for key, row in case.dup_keys.items()}
+
+            def tie_keys(tie_rows):
+                tie_rows = tie_rows.tolist()
+                missing = [row for row in tie_rows if row not in key_of]  # Not the first row of their key
+                if missing:
+                    key_of.update(zip(missing, self._store_dup_keys(store, missing).tolist()))
+                return [key_of[row] for row in tie_rows]
+        stops = np.cumsum(np.bincount(conv_codes, minlength=len(conv_ids))).tolist()
+        media_per_conv = np.bincount(conv_codes[has_media], minlength=len(conv_ids)).tolist()
+        for conv_id, start, stop, media_count in zip(conv_ids, [0] + stops[:-1], stops, media_per_conv):
+            conversation = case.conversations.get(conv_id)
+            if conversation is None:
+                case.conversations[conv_id] = Conversation(case.messages, rows[start:stop])
+            else:
+                conversation.insert(rows[start:stop], tie_keys)
+            case.media_counts[conv_id] = case.media_counts.get(conv_id, 0) + media_count
+        for gid, (send, receive) in case.messages.group_message_counts(rows).items():
+            old_send, old_receive = case.group_counts.get(gid, (0, 0))
+            case.group_counts[gid] = (old_send + send, old_receive + receive)
+        if case.search_index is not None:
+            case.search_index.update()
+        if case.keyword_hits is not None:
+            case.keyword_hits.update()
+        added = len(rows)
+        logger.info("Inserted %s message(s) into %s conversation(s).", added, len(conv_ids))
+        return added
+
+    @staticmethod
+    def _lists_file(store, row, source):
+        """True if the source of message row names the file of source (a path or file name)."""
+        return os.path.basename(source) in [os.path.basename(name) for name in store.value('source', row).split('; ')]
+
+    def _add_sources(self, case, rows, keys, parsed, file_order):
+        """List the files of parsed rows in the source of the messages they repeat.
+
+        rows and keys give the store row (or None) and duplicate key of each parsed row.
+
+        As _merge_duplicate_groups() would for a full load, source lists every
+        file name once, in file_order, line_number the lines of each file in
+        the same order and production every return; an empty msg_id is filled
+        in. Files a message already lists are changed files parsed again, and
+        add nothing.
+        """
+        def rank(group):
+            return file_order.get(group[0], len(file_order))
+
+        store = case.messages
+        files = {}  # store row -> {file name: [line numbers]}, files in order of appearance
+        extra = {}  # store row -> (first msg_id, productions)
+        key_of = {}
+        for row, key, source, line, msg_id, production in zip(rows, keys, parsed['source'], parsed['line_number'],
+                                                              parsed['msg_id'], parsed['production']):
+            if row is None:
+                continue
+            key_of[row] = key
+            lines = files.setdefault(row, {}).setdefault(os.path.basename(str(source).strip()), [])
+            line = str(line).strip()
+            if line.lower() not in ('nan', 'none', '') and line not in lines:
+                lines.append(line)
+            first_id, productions = extra.setdefault(row, (msg_id if isinstance(msg_id, str) else '', []))
+            if not first_id and isinstance(msg_id, str) and msg_id:
+                extra[row] = (msg_id, productions)
+            if production and production not in productions:
+                productions.append(production)
+
+        changed, columns = [], {'source': [], 'line_number': [], 'msg_id': [], 'production': []}
+        for row, row_files in files.items():
+            names = [os.path.basename(name) for name in store.value('source', row).split('; ')]
+            new = [name for name in row_files if name not in names]
+            if not new:
+                continue
+            lines = [line for line in store.value('line_number', row).split('; ') if line not in ('', '0')]  # '0': none
+            groups = sorted(((name, row_files[name]) for name in new), key=rank)
+            if len(lines) == len(names):
+                groups = sorted([(name, [line]) for name, line in zip(names, lines)] + groups, key=rank)
+            else:
+                # Which file each line is from is not known, so the listed ones stay first
+                groups = [(names[0], lines)] + [(name, []) for name in names[1:]] + groups
+            msg_id, productions = extra[row]
+            listed = [p for p in (store.value('production', row) or '').split('; ') if p]
+            changed.append(row)
+            columns['source'].append('; '.join(name for name, _ in groups))
+            columns['line_number'].append('; '.join(line for _, group_lines in groups for line in group_lines))
+            columns['msg_id'].append(store.value('msg_id', row) or msg_id)
+            columns['production'].append('; '.join(listed + [p for p in productions if p not in listed]) or None)
+        if not changed:
+            return
+        store.set_values(changed, columns)
+        if case.combined_df is not None:
+            # The first frame row of each changed message's key, as its store row is the first of the key
+            df = case.combined_df
+            first = pd.Series(np.arange(len(df))).groupby(self._dup_keys(df).to_numpy()).first()
+            positions = first.reindex([key_of[row] for row in changed]).to_numpy()
+            found = ~np.isnan(positions)
+            positions = positions[found].astype(np.int64)
+            df['line_number'] = df['line_number'].astype(object)
+            for f, values in columns.items():
+                df.iloc[positions, df.columns.get_loc(f)] = np.asarray(values, dtype=object)[found]
+        logger.info("Added the sources of %s repeated message(s).", len(changed))
+
+    # ------------------------------------------------------------------ #
+    # Discovery
+    # ------------------------------------------------------------------ #
+    def _locate_folders(self, case):
+        for root, dirs, _ in case.inventory.walk(case.folder):
+            if 'content' in dirs and not case.content_folder:
+                case.content_folder = os.path.join(root, 'content')
+                logger.info("Found content folder: %s", case.content_folder)
+            if 'logs' in dirs and not case.logs_folder:
+                case.logs_folder = os.path.join(root, 'logs')
+                logger.info("Found logs folder: %s", case.logs_folder)
+            if case.content_folder and case.logs_folder:
+                break
+
+    def load_group_legend(self, case):
+        """Load the optional group-legend CSV from the selected folder."""
+        case.group_legend_by_gid = {}
+        case.group_legend_rows = []
+        group_legend_files = case.inventory.glob(case.folder, 'group-legend-*.csv')
+        if not group_legend_files:
+            return
+        try:
+            path = group_legend_files[0]
+            # Every field is text; reading as str keeps numeric-looking GIDs and codes as written
+            df_gl = pd.read_csv(path, encoding='utf-8', dtype=str)
+            df_gl.columns = [str(c).strip().lower() for c in df_gl.columns]
+            df_gl = df_gl.loc[:, ~df_gl.columns.duplicated()]
+            legend = pd.DataFrame({col: df_gl[col].fillna('').str.strip() if col in df_gl.columns else ''
+                                   for col in GROUP_LEGEND_FIELDS}, index=df_gl.index)
+            legend = legend[legend['gid'] != '']
+            case.group_legend_rows = legend.to_dict('records')
+            case.group_legend_by_gid = (legend.drop_duplicates('gid', keep='last').set_index('gid')
+                                        .to_dict('index'))
+            logger.info("Loaded group legend: %s groups from %s.", len(case.group_legend_rows), os.path.basename(path))
+        except Exception as e:
+            logger.warning("Could not load group-legend CSV: %s", e)
+            case.group_legend_by_gid = {}
+            case.group_legend_rows = []
+
+    def _detect_format(self, case):
+        # Detect format: new = content/data-text.csv or content/data-media.csv; old = content/text-msg-data
+        case.data_text_path = os.path.join(case.content_folder, 'data-text.csv') if case.content_folder else None
+        case.data_media_path = os.path.join(case.content_folder, 'data-media.csv') if case.content_folder else None
+        case.is_new_format = bool(
+            (case.data_text_path and case.inventory.is_file(case.data_text_path)) or
+            (case.data_media_path and case.inventory.is_file(case.data_media_path))
+        )
+
+        # Locate text-msg-data under content (old format only)
+        if case.content_folder and not case.is_new_format:
+            for root, dirs, _ in case.inventory.walk(case.content_folder):
+                if 'text-msg-data' in dirs:
+                    case.text_msg_dir = os.path.join(root, 'text-msg-data')
+                    logger.info("Found text-msg-data folder: %s", case.text_msg_dir)
+                    break
+
+        # Validate folder structure for chosen format
+        if not case.content_folder or not case.logs_folder:
+            missing = []
+            if not case.content_folder:
+                missing.append("'content'")
+            if not case.logs_folder:
+                missing.append("'logs'")
+            logger.error("Invalid folder structure: missing %s.", ', '.join(missing))
+            raise IngestError(f"The selected folder must contain {', '.join(missing)} subfolders.\n\nPlease unzip the Kik data and select the correct folder.")
+
+        if case.is_new_format:
+            logger.info("Detected new Kik record format (data-text/data-media).")
+        elif not case.text_msg_dir:
+            logger.error("Invalid folder structure: missing 'content/text-msg-data' for legacy format.")
+            raise IngestError("The selected folder must contain 'content/text-msg-data' for the legacy format.\n\nAlternatively, use a folder with 'content/data-text.csv' and/or 'content/data-media.csv' for the new format.")
+
+        # Permission checks
+        paths_to_check = [case.content_folder, case.logs_folder]
+        if case.text_msg_dir:
+            paths_to_check.append(case.text_msg_dir)
+        if any(not os.access(p, os.R_OK) for p in paths_to_check):
+            logger.error("Permission denied for selected folder or subfolders.")
+            raise IngestError("Permission denied for the selected folder or its subfolders.\n\nPlease ensure you have read permissions for the folder and try again.")
+
+        if not case.is_new_format:
+            case.csv_files = []
+            for _, _, files in case.inventory.walk(case.text_msg_dir):
+                case.csv_files.extend(f.path for f in files if f.ext == '.csv')
+            logger.info("Found %d CSV files in text-msg-data", len(case.csv_files))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("text-msg-data CSV files: %s", case.csv_files)
+
+    # ------------------------------------------------------------------ #
+    # Source files
+    # ------------------------------------------------------------------ #
+    def index_media(self, case):
+        """Build the content_id -> media path index for the legacy format.
+
+        New-format media paths come from data-media.csv and are filled in by
+        parse_files().
+        """
+        case.media_files = {}
+        if case.is_new_format:
+            for candidate in [os.path.join(case.content_folder, 'medias'), os.path.join(case.folder, 'medias')]:
+                if case.inventory.is_dir(candidate):
+                    case.medias_folder = candidate
+                    logger.info("Using medias folder: %s", case.medias_folder)
+                    break
+            if not case.medias_folder:
+                logger.warning("No 'medias' folder found under content or root; media paths may be missing.")
+            return
+        for _, _, files in case.inventory.walk(case.content_folder):
+            for f in files:
+                if f.ext in MEDIA_EXTENSIONS:
+                    content_id = os.path.splitext(os.path.basename(f.path))[0]
+                    full_path = f.path
+                    case.media_files[content_id] = full_path
+        logger.info("Found %s media files in content folder", len(case.media_files))
+
+    def parse_files(self, case):
+        """Parse every content and log file and return (content frames, log frames).
+
+        Files are independent, so they are read concurrently in a bounded
+        process pool when there is enough data to be worth it. Results keep
+        the serial load order whatever order the workers finish in. With a
+        memory limit, files are streamed one at a time instead. Either way
+        each file is read in chunks so cancel() takes effect mid-file.
+        """
+        content_tasks = self._content_tasks(case)
+        log_tasks = self._log_tasks(case)
+        results = self._run_parsers(case, content_tasks + log_tasks)
+        content_results = results[:len(content_tasks)]
+        log_dfs = [df for df in results[len(content_tasks):] if df is not None]
+
+        if case.is_new_format:
+            for (func, args), df in zip(content_tasks, content_results):
+                if df is not None and args[1] == 'content/data-media.csv':
+                    self._index_new_format_media(case, df)
+        dfs = [df for df in content_results if df is not None]
+
+        if not dfs:
+            logger.error("No valid CSV files loaded.")
+            raise IngestError("No valid CSV files loaded.\n\nPlease select valid CSV files from the 'text-msg-data' folder (legacy) or ensure 'data-text.csv' and/or 'data-media.csv' exist in content (new format).")
+
+        logger.info("Loaded %s CSV files, total rows: %s", len(dfs), sum(len(df) for df in dfs))
+        if self.memory_limit_mb:
+            parsed_mb = sum(df.memory_usage(deep=True).sum() for df in dfs + log_dfs) / (1024 * 1024)
+            if parsed_mb > self.memory_limit_mb:
+                logger.warning(
+                    "Parsed data uses %.0f MB, more than the %s MB loading limit; "
+                    "only the reading of each file was bounded.", parsed_mb, self.memory_limit_mb
+                )
+        if not log_dfs:
+            logger.info("No valid log data loaded; using only CSV data.")
+        return dfs, log_dfs
+
+    def _content_tasks(self, case):
+        if not case.is_new_format:
+            return [(parse_legacy_csv, (csv_file, case.folder)) for csv_file in case.csv_files]
+        tasks = []
+        if case.data_text_path and case.inventory.is_file(case.data_text_path):
+            tasks.append((parse_new_content_csv, (case.data_text_path, 'content/data-text.csv')))
+        if case.data_media_path and case.inventory.is_file(case.data_media_path):
+            tasks.append((parse_new_content_csv, (case.data_media_path, 'content/data-media.csv')))
+        return tasks
+
+    def _log_tasks(self, case):
+        """Tasks for every recognised log file in the top level of the logs folder.
+
+        Log files are only read; nothing is ever written into the logs folder.
+        """
+        tasks = []
+        for f in case.inventory.files(case.logs_folder):
+            file = os.path.basename(f.path)
+            if file in NEW_LOG_MAPPINGS:
+                tasks.append((parse_new_log, (f.path, case.folder)))
+            elif file in LOG_FILE_STRUCTURES:
+                tasks.append((parse_legacy_log, (f.path, case.folder)))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Found %d log files: %s", len(tasks), [os.path.basename(args[0]) for _, args in tasks])
+        return tasks
+
+    def _run_parsers(self, case, tasks):
+        """Run (func, args) parser tasks and return their frames in task order."""
+        total = len(tasks)
+        results = [None] * total
+        seconds = [None] * total  # Parse time of each file, measured where it was parsed
+        sizes = [None] * total
+        finished = set()
+        for i, (_, args) in enumerate(tasks):
+            try:
+                sizes[i] = os.path.getsize(args[0])
+            except OSError:
+                pass
+        total_bytes = sum(size or 0 for size in sizes)
+        # Streaming keeps one file's chunk in memory at a time, so it runs in-process
+        workers = 1 if self.chunk_budget else min(self.max_workers, total)
+        chunk_budget = self.chunk_budget or CANCEL_CHUNK_BYTES
+        start = time.perf_counter()
+        self._report(0, total, f"Reading files... (0/{total})")
+
+        if workers > 1 and total_bytes >= PARALLEL_MIN_BYTES:
+            # Spawned, not forked: a fork from the GUI's loader thread can inherit a held lock,
+            # and the workers would share the parent's open log file
+            context = multiprocessing.get_context('spawn')
+            self._worker_cancel = context.Event()
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                       initargs=(self._worker_cancel, logger.getEffectiveLevel()))
+            cancelled = False
+            try:
+                futures = {pool.submit(_parse_in_worker, func, args, chunk_budget): i
+                           for i, (func, args) in enumerate(tasks)}
+                pending = set(futures)
+                while pending:
+                    # Wake up regularly so a cancel is noticed while every worker is mid-file
+                    done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    self._report(len(finished), total, f"Reading files... ({len(finished)}/{total})")
+                    for future in done:
+                        i = futures[future]
+                        try:
+                            results[i], records, seconds[i] = future.result()
+                            for record in records:
+                                logger.handle(record)
+                        except (BrokenProcessPool, IngestCancelled):
+                            raise
+                        except Exception as e:
+                            # A file that cannot even be returned from its worker is skipped like any other bad file
+                            logger.error("Error parsing %s: %s", os.path.basename(tasks[i][1][0]), e)
+                        finished.add(i)
+                    if done:
+                        self._report(len(finished), total, f"Reading files... ({len(finished)}/{total})")
+            except BrokenProcessPool as e:
+                logger.error("Parser process pool failed (%s); reading the remaining files in-process.", e)
+            except IngestCancelled:
+                cancelled = True
+                self._worker_cancel.set()
+                raise
+            finally:
+                # After a cancel the workers stop at their next chunk; nothing waits for them
+                pool.shutdown(wait=not cancelled, cancel_futures=True)
+                self._worker_cancel = None
+        else:
+            workers = 1
+
+        for i, (func, args) in enumerate(tasks):
+            if i in finished:
+                continue
+            file_start = time.perf_counter()
+            if func in STREAMING_PARSERS:
+                results[i] = func(*args, chunk_budget=chunk_budget, on_chunk=self._report)
+            else:
+                results[i] = func(*args)
+            seconds[i] = time.perf_counter() - file_start
+            finished.add(i)
+            self._report(len(finished), total, f"Reading files... ({len(finished)}/{total})")
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        rows = sum(len(df) for df in results if df is not None)
+        case.file_stats.extend(
+            {
+                'file': _relative_path(args[0], case.folder),
+                'parser': func.__name__,
+                'bytes': sizes[i],
+                'rows': None if results[i] is None else len(results[i]),
+                'seconds': seconds[i],
+            }
+            for i, (func, args) in enumerate(tasks)
+        )
+        case.parse_stats = {
+            'files': total,
+            'rows': rows,
+            'workers': workers,
+            'seconds': elapsed,
+            'files_per_sec': total / elapsed,
+            'rows_per_sec': rows / elapsed,
+        }
+        logger.info(
+            "Parsed %d files (%d rows) in %.2fs with %d worker(s): %.1f files/sec, %.0f rows/sec",
+            total, rows, elapsed, workers, total / elapsed, rows / elapsed
+        )
+        return results
+
+    @staticmethod
+    def _index_new_format_media(case, df_media):
+        """Map content_id -> file in the medias folder for rows of data-media.csv.
+
+        The folder is listed once and filenames are looked up in that listing.
+        Also sets case.media_report: files referenced by data-media.csv that are
+        not in the folder, and files in the folder that no row references.
+        """
+        if not case.medias_folder or 'filename' not in df_media.columns or 'content_id' not in df_media.columns:
+            return
+        on_disk = {os.path.normcase(os.path.basename(f.path)): os.path.basename(f.path)
+                   for f in case.inventory.files(case.medias_folder)}
+        fn = df_media['filename'].str.strip()
+        fn = fn.where(fn != 'nan', '')
+        cid = df_media['content_id'].str.strip()
+        keys = fn.map(os.path.normcase)
+        present = keys.isin(on_disk.keys()).to_numpy()
+        # Names with a directory part are not in the listing; check those one by one
+        nested = fn.str.contains(r'[\\/]').to_numpy()
+        if nested.any():
+            present[nested] = [os.path.isfile(os.path.join(case.medias_folder, f)) for f in fn[nested]]
+        paths = os.path.join(case.medias_folder, '') + fn
+        if nested.any():
+            paths[nested] = [os.path.join(case.medias_folder, f) for f in fn[nested]]
+        usable = present & (fn != '').to_numpy() & (cid != '').to_numpy()
+        case.media_files.update(zip(cid[usable], paths[usable]))
+        logger.info("Built media_files from data-media.csv: %s entries.", len(case.media_files))
+
+        referenced = (fn != '').to_numpy()
+        missing = list(dict.fromkeys(fn[referenced & ~present]))
+        referenced_keys = set(keys[referenced])
+        unreferenced = sorted(name for key, name in on_disk.items() if key not in referenced_keys)
+        case.media_report = {'missing': missing, 'unreferenced': unreferenced}
+        if missing:
+            logger.warning("%d media file(s) referenced by data-media.csv are not in %s, e.g. %s",
+                           len(missing), case.medias_folder, missing[:LOG_SAMPLE_LIMIT])
+        if unreferenced:
+            logger.info("%d file(s) in %s are not referenced by data-media.csv, e.g. %s",
+                        len(unreferenced), case.medias_folder, unreferenced[:LOG_SAMPLE_LIMIT])
+
+    # ------------------------------------------------------------------ #
+    # Combine
+    # ------------------------------------------------------------------ #
+    def pair_media(self, case, dfs, log_dfs):
+        """Merge data-media rows into their group_send_msg_platform rows.
+
+        Rows are paired when content_id and the epoch second match. data-media
+        rows are used as metadata only and never reach the output. Returns the
+        list of frames to concatenate.
+        """
+        all_dfs = dfs + log_dfs
+        if not all_dfs:
+            logger.error("No valid data loaded.")
+            raise IngestError("No valid CSV or log files loaded.\n\nPlease ensure the folder structure and files are correct.")
+
+        for df in all_dfs:
+            # Make sure all required columns exist and have sensible defaults
+            for col in REQUIRED_COLUMNS:
+                if col not in df.columns and col != EPOCH_COLUMN:
+                    df[col] = 0 if col == 'line_number' else ''
+
+            # Parsers already give UTC sent_at and its epoch column
+            if not isinstance(df['sent_at'].dtype, pd.DatetimeTZDtype):
+                df['sent_at'] = parse_timestamps(df['sent_at'])
+                add_epoch_column(df)
+            elif EPOCH_COLUMN not in df.columns:
+                add_epoch_column(df)
+
+            for col in ['msg', 'content_id', 'ip', 'group_jid', 'port', 'source']:
+                df[col] = df[col].astype(str).fillna('')
+                if col == 'content_id':
+                    df[col] = df[col].str.strip()
+                    df[col] = df[col].replace('nan', '')
+
+        # --- Media cross-file combine BEFORE concat: match by content_id + epoch (sec) ---
+        # Hash join on the parsed frames: group_send rows are bucketed by key in file
+        # order and each data-media row (in file order) claims the next unclaimed one.
+        # As the pairing always did, every pair of a key is built from the first
+        # data-media and first group_send row of that key and only those two rows are
+        # replaced; a claimed row only gives the pair its line number and otherwise
+        # stays in the output. With unique keys this is a plain one-to-one join.
+        dm_df = None
+        gs_df = None
+        dm_pos = gs_pos = -1
+        for i, df in enumerate(all_dfs):
+            if df.empty or 'source' not in df.columns:
+                continue
+            src = str(df['source'].iloc[0]).lower()
+            if 'data-media' in src and 'content' in src:
+                dm_df = df
+                dm_pos = i
+            if 'group_send_msg_platform' in src:
+                gs_df = df
+                gs_pos = i
+        if dm_df is not None and gs_df is not None:
+            dm_keys = self._pairing_keys(dm_df, NEW_CONTENT_EPOCH_COLUMN)
+            gs_keys = self._pairing_keys(gs_df, 'epoch')
+            gs_by_key = {}
+            for row, key in gs_keys:
+                gs_by_key.setdefault(key, []).append(row)
+            claimed = {}  # key -> group_send rows of the key claimed so far
+            first_dm = {}  # key -> first data-media row of the key
+            pairs = []  # (dm row position, gs row position, gs row position of the line number)
+            for row, key in dm_keys:
+                bucket = gs_by_key.get(key)
+                if bucket is None:
+                    continue
+                n = claimed.get(key, 0)
+                if n < len(bucket):
+                    claimed[key] = n + 1
+                    pairs.append((first_dm.setdefault(key, row), bucket[0], bucket[n]))
+            if pairs:
+                dm_rows = np.fromiter((p[0] for p in pairs), dtype=np.intp, count=len(pairs))
+                gs_rows = np.fromiter((p[1] for p in pairs), dtype=np.intp, count=len(pairs))
+                line_rows = np.fromiter((p[2] for p in pairs), dtype=np.intp, count=len(pairs))
+                merged = self._merge_media_rows(dm_df.iloc[dm_rows], gs_df.iloc[gs_rows])
+                merged['line_number'] = gs_df['line_number'].iloc[line_rows].astype(str).to_numpy()
+                dm_keep = np.ones(len(dm_df), dtype=bool)
+                dm_keep[dm_rows] = False
+                gs_keep = np.ones(len(gs_df), dtype=bool)
+                gs_keep[gs_rows] = False
+                new_all_dfs = []
+                for i, df in enumerate(all_dfs):
+                    if i == dm_pos:
+                        new_all_dfs.append(df[dm_keep])
+                    elif i == gs_pos:
+                        new_all_dfs.append(df[gs_keep])
+                    else:
+                        new_all_dfs.append(df)
+                new_all_dfs.append(merged)
+                all_dfs = new_all_dfs
+                logger.info("Media cross-file combine: merged %s row(s) where data-media and group_send_msg_platform have same content_id and same date/time.", len(pairs))
+
+        # Hide ALL data-media.csv rows from final output (used only as metadata source)
+        if dm_pos >= 0:
+            if not all_dfs[dm_pos].empty:
+                logger.info("Hiding %s remaining data-media.csv row(s) from output (metadata only).", len(all_dfs[dm_pos]))
+            all_dfs = [df for i, df in enumerate(all_dfs) if i != dm_pos]
+        return all_dfs
+
+    @staticmethod
+    def _pairing_keys(df, epoch_header):
+        """Return (row position, (content_id, epoch_sec)) for every row of df that can be paired.
+
+        epoch_sec comes from the file's own epoch-ms column; a frame without that
+        column is never paired, and rows with an empty content_id or no epoch are skipped.
+        """
+        col = next((c for c in df.columns if str(c).strip().lower() == epoch_header), None)
+        if col is None:
+            return []
+        cid = df['content_id'].to_numpy(dtype=object)
+        epoch_sec = pd.to_numeric(df[col], errors='coerce').astype('float64').to_numpy() // 1000
+        usable = np.flatnonzero((cid != '') & ~np.isnan(epoch_sec))
+        return zip(usable.tolist(), zip(cid[usable].tolist(), epoch_sec[usable].astype(np.int64).tolist()))
+
+    @staticmethod
+    def _merge_media_rows(dm_rows, gs_rows):
+        """Build the combined rows for paired data-media / group_send rows (aligned by position).
+
+        The group_send row is the base; data-media supplies port, and app_name when
+        the group_send row has none.
+        """
+        merged = gs_rows.reset_index(drop=True)
+        merged['source'] = merged['source'].str.strip().map(os.path.basename)
+        merged['line_number'] = merged['line_number'].astype(str)
+        dm_port = dm_rows['port'].astype(str).str.strip().to_numpy()
+        has_port = ~np.isin(dm_port, ('', 'nan', 'None'))
+        merged.loc[has_port, 'port'] = dm_port[has_port]
+        dm_app = dm_rows['app_name'].astype(str).str.strip().to_numpy()
+        gs_app = merged['app_name'].astype(str).str.strip().to_numpy()
+        take_app = ~np.isin(dm_app, ('', 'nan', 'None')) & np.isin(gs_app, ('', 'nan', 'None'))
+        merged.loc[take_app, 'app_name'] = dm_app[take_app]
+        merged = merged.reindex(columns=REQUIRED_COLUMNS)
+        for c in REQUIRED_COLUMNS:
+            if c not in gs_rows.columns or merged[c].dtype == object:
+                merged[c] = merged[c].fillna('')
+        return merged
+
+    @staticmethod
+    def _set_production(frames, production):
+        """Set the production column of every parsed frame (before pair_media slices them)."""
+        for df in frames:
+            df['production'] = production
+
+    @staticmethod
+    def identify_source_type(source_str):
+        """Classify a source path as 'csv' (content) or 'log'."""
+        source_lower = str(source_str).lower()
+        if ('text-msg-data' in source_lower or source_lower.endswith('.csv') or
+                '/text-msg-data/' in source_lower or 'content/data-text.csv' in source_lower or
+                'content/data-media.csv' in source_lower):
+            return 'csv'
+        return 'log'
+
+    def merge_duplicates(self, all_dfs):
+        """Concatenate all frames and merge rows that appear in both content CSVs and logs.
+
+        Rows are duplicates when sender, receiver, sent_at (to the second), ip
+        and content_id all match. CSV rows win for every field; source and
+        line_number list every contributing file in order. With frames from
+        more than one production, duplicates are merged across productions
+        too, and production lists every return the message came from.
+        """
+        try:
+            combined_df = pd.concat(
+                [df[REQUIRED_COLUMNS] for df in all_dfs if not df.empty],
+                ignore_index=True
+            )
+            # Fill all NaN values with empty strings to prevent "nan" from displaying
+            combined_df = combined_df.fillna('')
+            logger.info("Checking for duplicate messages from CSV and log files...")
+
+            # Mark source type for prioritization (CSV sources take priority for content_id)
+            source_types = {s: self.identify_source_type(s) for s in combined_df['source'].unique()}
+            combined_df['_source_type'] = combined_df['source'].map(source_types)
+            csv_count = int((combined_df['_source_type'] == 'csv').sum())
+            log_count = int((combined_df['_source_type'] == 'log').sum())
+            logger.info("Source type distribution: %s CSV rows, %s log rows", csv_count, log_count)
+
+            if combined_df['production'].nunique() > 1:
+                self._separate_production_rows(combined_df)
+                combined_df = self._merge_duplicate_groups(combined_df)
+            # Only deduplicate if we have both CSV and log data
+            elif csv_count > 0 and log_count > 0:
+                combined_df = self._merge_duplicate_groups(combined_df)
+            else:
+                logger.info("Only one source type found, skipping deduplication")
+
+            # Remove temporary columns
+            combined_df = combined_df.drop(columns=[c for c in ('_source_type', '_dup_key') if c in combined_df.columns])
+            logger.info("Combined dataframe rows: %d", len(combined_df))
+            return combined_df
+        except IngestCancelled:
+            raise
+        except Exception as e:
+            logger.error("Error combining DataFrames: %s", e)
+            raise IngestError(f"Error combining data: {str(e)}.\n\nPlease ensure all files are valid and try again.")
+
+    @staticmethod
+    def _epoch_second_strings(epoch):
+        """Fixed-width strings of the epoch second of EPOCH_COLUMN values ('' when missing), for the duplicate key.
+
+        The offset keeps every datetime64 second positive and 12 digits wide, so
+        keys sort by time exactly as 'YYYY-MM-DD HH:MM:SS' strings would.
+        """
+        epoch = np.asarray(epoch, dtype=np.int64)
+        seconds = (epoch // 1000 + EPOCH_KEY_OFFSET).astype(str).astype(object)
+        seconds[epoch == MISSING_EPOCH] = ''
+        return seconds
+
+    @staticmethod
+    def _key_part(values, empty=''):
+        """values as stripped strings for a duplicate key, with '' and 'nan' as empty.
+
+        Each distinct value is converted once; a case repeats the same JIDs and IPs on many rows.
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        parts = np.array([str(v).strip() for v in uniques], dtype=object)
+        parts[(parts == '') | (parts == 'nan')] = empty
+        return parts[codes]
+
+    @classmethod
+    def _dup_keys(cls, df):
+        """Duplicate key of every row of df: 'sender|receiver|epoch second|ip|content_id'."""
+        # Port is NOT included in the key since it may differ between sources;
+        # content_id IS included to prevent merging different media messages with same metadata.
+        # Empty/nan content_id is 'NO_CONTENT_ID' so rows without media can still match
+        return pd.Series(
+            cls._key_part(df['sender_jid']) + '|' +
+            cls._key_part(df['receiver_jid']) + '|' +
+            cls._epoch_second_strings(df[EPOCH_COLUMN]) + '|' +  # Seconds precision in UTC
+            cls._key_part(df['ip']) + '|' +
+            cls._key_part(df['content_id'], 'NO_CONTENT_ID'),
+            index=df.index, dtype=object,
+        )
+
+    @classmethod
+    def _separate_production_rows(cls, combined_df):
+        """Set _dup_key for rows from several productions so only the right groups merge.
+
+        Within a production that has both CSV and log rows, rows with the same
+        key merge, as a load of that production alone would merge them. A
+        production with one source type merges none of its own rows: the n-th
+        row of a key in it only merges with the n-th row of that key in the
+        other such productions, and its first row also with the merged group
+        of the other productions.
+        """
+        keys = cls._dup_keys(combined_df)
+        production = combined_df['production']
+        types = combined_df.groupby('production', sort=False)['_source_type'].nunique()
+        merges_own = production.isin(types.index[types > 1]).to_numpy()
+        occurrence = keys.groupby([production.to_numpy(), keys.to_numpy()], sort=False).cumcount().to_numpy()
+        occurrence[merges_own] = 0
+        later = occurrence > 0
+        if later.any():
+            keys = keys.where(~later, keys + '|' + occurrence.astype(str))
+        combined_df['_dup_key'] = keys
+
+    @staticmethod
+    def _first_per_group(codes, rank, candidates):
+        """Row position of the best candidate per group code: lowest rank, then earliest row.
+
+        Returns a Series indexed by code (ascending); groups without a candidate are absent.
+        """
+        positions = np.flatnonzero(candidates)
+        order = np.lexsort((positions, rank[positions], codes[positions]))
+        picked = positions[order]
+        picked_codes = codes[picked]
+        first = np.ones(len(picked), dtype=bool)
+        first[1:] = picked_codes[1:] != picked_codes[:-1]
+        return pd.Series(picked[first], index=picked_codes[first])
+
+    def _merge_duplicate_groups(self, combined_df):
+        """Collapse rows with the same _dup_key into one, in sorted key order.
+
+        For a group of duplicates the first CSV row (else the first log row) is
+        kept; content_id and msg_id are the first non-empty value from CSV rows,
+        then from log rows; source and line_number list every contributing file
+        and its line numbers in order of appearance; production lists every
+        return the group came from.
+        """
+        stripped_content_id = combined_df['content_id'].astype(str).str.strip()
+        if '_dup_key' not in combined_df.columns:
+            combined_df['_dup_key'] = self._dup_keys(combined_df)
+        if combined_df.empty:
+            return pd.DataFrame(columns=REQUIRED_COLUMNS)
+
+        self._report(0, 0, "Merging duplicate messages...")
+        codes, keys = pd.factorize(combined_df['_dup_key'], sort=True)
+        sizes = np.bincount(codes, minlength=len(keys))
+        in_dup_group = sizes[codes] > 1
+        duplicates_found = int(len(combined_df) - len(keys))
+        rank = (combined_df['_source_type'] != 'csv').to_numpy().astype(np.int8)  # CSV rows first
+
+        # Row kept for each group: the first CSV row, otherwise the first row
+        kept = self._first_per_group(codes, rank, np.ones(len(codes), dtype=bool))
+        result = combined_df.take(kept.to_numpy()).reset_index(drop=True)
+
+        if duplicates_found:
+            dup_codes = np.flatnonzero(sizes > 1)
+            dup_rows = sizes > 1  # result rows are in code order
+
+            for col, values in (('content_id', stripped_content_id), ('msg_id', combined_df['msg_id'])):
+                best = self._first_per_group(codes, rank, in_dup_group & (values != '').to_numpy())
+                best = best.reindex(dup_codes)
+                merged = np.full(len(dup_codes), '', dtype=object)
+                found = best.notna().to_numpy()
+                merged[found] = values.to_numpy()[best[found].to_numpy(dtype=np.int64)]
+                result.loc[dup_rows, col] = merged
+
+            self._report(0, 0, "Merging duplicate messages...")
+            sources, line_numbers = self._merge_sources(combined_df.loc[in_dup_group], codes[in_dup_group])
+            result['line_number'] = result['line_number'].astype(object)
+            result.loc[dup_rows, 'source'] = sources.reindex(dup_codes).to_numpy()
+            result.loc[dup_rows, 'line_number'] = line_numbers.reindex(dup_codes).to_numpy()
+            if combined_df['production'].nunique() > 1:
+                productions = combined_df.loc[in_dup_group, ['production']].assign(code=codes[in_dup_group])
+                productions = productions.drop_duplicates(['code', 'production'])
+                result.loc[dup_rows, 'production'] = _join_per_code(
+                    productions['code'], productions['production']).reindex(dup_codes).to_numpy()
+
+        # Every group's content_id ends up stripped, with 'nan' treated as empty
+        result['content_id'] = result['content_id'].astype(str).str.strip()
+        result['content_id'] = result['content_id'].replace('nan', '')
+        logger.info("After merging duplicates: %d rows (removed %d duplicate entries)", len(result), duplicates_found)
+        return result
+
+    @staticmethod
+    def _merge_sources(dup_df, codes):
+        """Return (source, line_number) strings per group code for groups of duplicate rows.
+
+        A group from one source file keeps that file's name and its first row's
+        line number. Otherwise every file name is listed once in order of
+        appearance, followed by the distinct line numbers of each file in the
+        same order, both joined with '; '. When the rows come from more than
+        one production, file names are given as '<production>/<file name>'.
+        """
+        source_names = dup_df['source'].astype(str).str.strip()
+        basename = {s: os.path.basename(s) for s in source_names.unique()}
+        raw = dup_df['source'].to_numpy()
+        names = source_names.map(basename).to_numpy()
+        if dup_df['production'].nunique() > 1:
+            raw = (dup_df['production'] + '/' + dup_df['source'].astype(str)).to_numpy()
+            names = (dup_df['production'] + '/' + names).to_numpy()
+        frame = pd.DataFrame({
+            'code': codes,
+            'raw': raw,
+            'name': names,
+            'line': [str(ln).strip() for ln in dup_df['line_number']],
+        })
+        first = frame.drop_duplicates('code').set_index('code')
+        sources = first['name'].copy()
+        line_numbers = first['line'].copy()
+
+        one_source = frame.groupby('code', sort=False)['raw'].nunique() == 1
+        multi = frame[~frame['code'].map(one_source).to_numpy()]
+        if not multi.empty:
+            names = multi.drop_duplicates(['code', 'name'])
+            multi_codes = names['code'].unique()
+            sources.loc[multi_codes] = _join_per_code(names['code'], names['name']).reindex(multi_codes).to_numpy()
+            # Line numbers are grouped by file, files in order of first appearance
+            name_rank = pd.Series(np.arange(len(names)), index=pd.MultiIndex.from_frame(names[['code', 'name']]))
+            lines = multi[~multi['line'].str.lower().isin(('nan', 'none', ''))].drop_duplicates(['code', 'name', 'line'])
+            lines = lines.assign(rank=name_rank.reindex(pd.MultiIndex.from_frame(lines[['code', 'name']])).to_numpy())
+            lines = lines.sort_values('rank', kind='stable')
+            joined = _join_per_code(lines['code'], lines['line'])
+            line_numbers.loc[multi_codes] = joined.reindex(multi_codes).fillna('').to_numpy()
+        return sources, line_numbers
+
+    # ------------------------------------------------------------------ #
+    # Conversations
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def group_receiver_label(receiver, group_legend_by_gid):
+        """Return the 'GROUP CHAT: ...' label for a group_send_msg_platform receiver.
+
+        With a legend loaded, GIDs that are not in it keep their raw receiver.
+        """
+        if not group_legend_by_gid:
+            return f"GROUP CHAT: {receiver}"
+        rec = group_legend_by_gid.get(str(receiver).replace('_g', '').strip())
+        if not rec:
+            return receiver
+        name = rec.get('name', '') or ''
+        code = rec.get('code', '') or ''
+        if name and code:
+            return f"GROUP CHAT: {name} ({code})"
+        elif code:
+            return f"GROUP CHAT: ({code})"
+        elif name:
+            return f"GROUP CHAT: {name}"
+        return f"GROUP CHAT: {receiver}"
+
+    @classmethod
+    def _media_on_disk(cls, case):
+        """Content ids in case.media_files whose file exists, checked once per media file."""
+        if case.productions:
+            return set().union(*(cls._media_on_disk(production) for production in case.productions))
+        if case.inventory is not None:
+            exists = case.inventory.is_file  # media_files only lists files under the case folder
+        else:
+            exists = os.path.exists
+        return {content_id for content_id, path in case.media_files.items() if exists(path)}
+
+    @staticmethod
+    def _text_values(series, default='', falsy=False):
+        """series as an object array with missing values (and with falsy=True, empty strings) set to default."""
+        values = series.to_numpy(dtype=object, copy=True)
+        blank = pd.isna(values)
+        if falsy:
+            blank |= values == ''
+        values[blank] = default
+        return values
+
+    @staticmethod
+    def _map_unique(values, func):
+        """Apply func once per distinct value of the object array values and return the results per row."""
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        results = np.empty(len(uniques), dtype=object)
+        results[:] = [func(v) for v in uniques]
+        return results[codes]
+
+    def _message_columns(self, case, df):
+        """MessageStore columns for the rows of df that have a sender and a receiver.
+
+        Rows are ordered by conversation, then sent_at. Returns (conv_ids,
+        conv_codes, columns, tz, has_media): conv_ids are the sorted
+        (sender, receiver) tuples in order of each conversation's first row,
+        conv_codes give each output row's position in conv_ids, and has_media
+        marks rows whose media file is on disk.
+        """
+        total_rows = len(df)
+        self._report(0, total_rows, f"Processing messages... (0/{total_rows})")
+        sender = df['sender_jid'].to_numpy(dtype=object)
+        receiver = df['receiver_jid'].to_numpy(dtype=object)
+        valid = ~(pd.isna(sender) | pd.isna(receiver) | (sender == '') | (receiver == ''))
+        rows = np.flatnonzero(valid)
+        sender = sender[rows]
+        receiver = receiver[rows]
+
+        # conv_id is the sorted (sender, receiver) pair; codes number the pairs by first appearance
+        swap = receiver < sender
+        low = np.where(swap, receiver, sender)
+        high = np.where(swap, sender, receiver)
+        low_codes, low_values = pd.factorize(low)
+        high_codes, high_values = pd.factorize(high)
+        pair_codes = low_codes.astype(np.int64) * max(len(high_values), 1) + high_codes
+        conv_codes, pairs = pd.factorize(pair_codes)
+        conv_ids = list(zip(low_values[pairs // max(len(high_values), 1)].tolist(),
+                            high_values[pairs % max(len(high_values), 1)].tolist()))
+
+        # One stable sort by conversation, then time (untimed last), replaces sorting every conversation list
+        sent_at = df['sent_at'].iloc[rows]
+        if not pd.api.types.is_datetime64_any_dtype(sent_at.dtype):
+            sent_at = parse_timestamps(sent_at)
+        tz = sent_at.dt.tz
+        sent_at_ns = sent_at.array.as_unit('ns').asi8
+        order = np.lexsort((_time_order_key(sent_at_ns), conv_codes))
+        rows = rows[order]
+        conv_codes = conv_codes[order]
+        sorted_df = df.take(rows)
+
+        source = self._text_values(sorted_df['source'], 'Unknown', falsy=True)
+        source_is_group_send = {s: 'group_send_msg_platform' in str(s) for s in pd.unique(source)}
+        is_group_send = np.fromiter((source_is_group_send[s] for s in source), dtype=bool, count=len(source))
+        receiver_jid = sorted_df['receiver_jid'].to_numpy(dtype=object)
+        receiver = receiver_jid.copy()
+        receiver_gid = np.full(len(rows), None, dtype=object)
+        if is_group_send.any():
+            # Enrich receiver with group name/code when source is group_send_msg_platform (receiver = GID)
+            gids = pd.Series(receiver[is_group_send])
+            labels = {r: self.group_receiver_label(r, case.group_legend_by_gid) for r in gids.unique()}
+            receiver[is_group_send] = gids.map(labels).to_numpy(dtype=object)
+            gid = self._map_unique(receiver_jid[is_group_send], lambda v: str(v).replace('_g', '').strip() or None)
+            receiver_gid[is_group_send] = gid
+        content_id = self._text_values(sorted_df['content_id'], falsy=True)
+        line_number = sorted_df['line_number'].to_numpy(dtype=object)
+        line_number = ['0' if missing else str(ln).strip() for ln, missing in zip(line_number, pd.isna(line_number))]
+
+        columns = {
+            'msg_id': self._text_values(sorted_df['msg_id']),
+            'sender': sorted_df['sender_jid'].to_numpy(dtype=object),
+            'receiver': receiver,
+            'receiver_jid': receiver_jid,
+            'receiver_gid': receiver_gid,
+            'message': self._text_values(sorted_df['msg']),
+            'sent_at': sent_at_ns[order],
+            'sent_at_ms': sorted_df[EPOCH_COLUMN].to_numpy(dtype=np.int64),
+            'content_id': content_id,
+            'ip': self._text_values(sorted_df['ip'], falsy=True),
+            'port': self._text_values(sorted_df['port'], falsy=True),
+            'source': source,
+            'line_number': line_number,
+            'app_name': self._map_unique(self._text_values(sorted_df['app_name'], falsy=True), lambda v: str(v).strip()),
+            'production': self._text_values(sorted_df['production']),
+        }
+        media_on_disk = self._media_on_disk(case)
+        has_media = (content_id != '') & pd.Series(content_id).isin(media_on_disk).to_numpy()
+        self._report(total_rows, total_rows, f"Processing messages... ({total_rows}/{total_rows})")
+        return conv_ids, conv_codes, columns, tz, has_media
+
+    def build_conversations(self, case):
+        """Store every message of combined_df in case.messages and index them by conversation.
+
+        case.conversations maps conv_id (sorted sender/receiver tuple) to a
+        Conversation sorted by sent_at; case.media_counts counts the messages
+        per conversation whose media file is on disk.
+        """
+        logger.info("Grouping conversations...")
+        conv_ids, conv_codes, columns, tz, has_media = self._message_columns(case, case.combined_df)
+        store = MessageStore(columns, tz)
+        rows = np.arange(len(store))
+        stops = np.cumsum(np.bincount(conv_codes, minlength=len(conv_ids))).tolist()
+        starts = [0] + stops[:-1]
+        case.messages = store
+        case.conversations = {conv_id: Conversation(store, rows[start:stop])
+                              for conv_id, start, stop in zip(conv_ids, starts, stops)}
+        case.media_counts = dict(zip(conv_ids, np.bincount(conv_codes[has_media], minlength=len(conv_ids)).tolist()))
+        case.group_counts = store.group_message_counts()
+        if logger.isEnabledFor(logging.INFO):
+            nbytes = store.nbytes()
+            logger.info("Found %d conversations; message store holds %d messages in %.1f MB (%.0f bytes/message).",
+                        len(case.conversations), len(store), nbytes / (1024 * 1024), nbytes / max(len(store), 1))
+        return case.conversations
+
+
+def ingest_folder(folder, csv_files=None, progress_callback=None, max_workers=None, memory_limit_mb=None,
+                  cache_dir=None, profile=False):
+    """Discover and fully ingest a Kik data folder in one call.
+
+    Args:
+        folder: The unzipped Kik data folder.
+        csv_files: Legacy format only - the text-msg-data CSVs to load (default: all).
+        progress_callback, max_workers, memory_limit_mb, cache_dir, profile: See KikIngestEngine.
+
+    Returns:
+        ParsedCase
+    """
+    engine = KikIngestEngine(progress_callback, max_workers, memory_limit_mb, cache_dir, profile)
+    case = engine.discover(folder)
+    return engine.ingest(case, csv_files)
@@ -0,0 +1,111 @@
+"""The case cache gives back what a full load of the folder gives."""
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kik_ingest
+from kik_ingest import KikIngestEngine
+
+pytestmark = pytest.mark.skipif(kik_ingest.pa is None, reason="the case cache needs pyarrow")
+
+DATA_TEXT = (
+    'id,sender_id,receiver_id,message,sent_at_ts,content_id,ip,port,app_name\n'
+    't0,user0@talk.kik.com,user1@talk.kik.com,hello,1700849790000,c0,10.0.0.1,80,kik\n'
+    't1,user1@talk.kik.com,user0@talk.kik.com,héllo again,1700849800000,c1,10.0.0.2,80,kik\n'
+    't2,user0@talk.kik.com,user2@talk.kik.com,later,1700849900000,,10.0.0.1,80,kik\n'
+    't3,user0@talk.kik.com,user1@talk.kik.com,no time,,c3,10.0.0.1,80,kik\n'
+)
+CHAT_SENT = (
+    'ts,user_jid,friend_user_jid,cid,ip\n'
+    '1700849790400,user0@talk.kik.com,user1@talk.kik.com,c0,10.0.0.1\n'
+)
+CHAT_SENT_RECEIVED = (
+    'ts,user_jid,friend_user_jid,cid,ip\n'
+    '1700849850000,user0@talk.kik.com,user1@talk.kik.com,c4,10.0.0.1\n'
+)
+
+LEGACY_CSV = (
+    'msg_id,sender_jid,receiver_jid,msg,sent_at,content_id,ip\n'
+    'c0,user0@talk.kik.com,user1@talk.kik.com,hello,2023-11-24 18:16:30,c0,10.0.0.1\n'
+    'c1,user1@talk.kik.com,user0@talk.kik.com,reply,2023-11-24 18:16:40,c1,10.0.0.2\n'
+)
+LEGACY_SENT = '1700849790000\tuser0@talk.kik.com\tuser1@talk.kik.com\tkik\tc0\t10.0.0.1\t2023-11-24 18:16:30\n'
+LEGACY_SENT_RECEIVED = (
+    '1700849800000\tuser1@talk.kik.com\tuser0@talk.kik.com\tkik\tc1\t10.0.0.2\t2023-11-24 18:16:40\n'
+    '1700849850000\tuser0@talk.kik.com\tuser1@talk.kik.com\tkik\tc3\t10.0.0.1\t2023-11-24 18:17:30\n'
+)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    case_folder = tmp_path / 'case'
+    (case_folder / 'content').mkdir(parents=True)
+    (case_folder / 'logs').mkdir()
+    (case_folder / 'content' / 'data-text.csv').write_text(DATA_TEXT, encoding='utf-8')
+    (case_folder / 'logs' / 'chat_platform_sent.csv').write_text(CHAT_SENT, encoding='utf-8')
+    return case_folder
+
+
+def load(folder, cache_dir=None):
+    engine = KikIngestEngine(max_workers=1, cache_dir=None if cache_dir is None else str(cache_dir))
+    return engine.ingest(engine.discover(str(folder)))
+
+
+def conversation_rows(case):
+    """Every field of every message, per conversation in display order."""
+    return {
+        conv_id: [{field: str(value) for field, value in message.items()} for message in conversation]
+        for conv_id, conversation in case.conversations.items()
+    }
+
+
+def test_cache_round_trip_matches_full_load(folder, tmp_path):
+    fresh = load(folder, tmp_path / 'cache')
+    cached = load(folder, tmp_path / 'cache')
+    assert not fresh.from_cache and cached.from_cache
+    assert cached.fingerprint == fresh.fingerprint
+    # Text columns are read straight from the memory-mapped cache file
+    assert isinstance(cached.messages.texts['message'].data, memoryview)
+    assert conversation_rows(cached) == conversation_rows(fresh)
+    assert cached.media_counts == fresh.media_counts
+    assert cached.group_counts == fresh.group_counts
+    assert len(cached.messages) == len(fresh.messages)
+
+
+def test_changed_input_is_parsed_again(folder, tmp_path):
+    first = load(folder, tmp_path / 'cache')
+    (folder / 'logs' / 'chat_platform_sent_received.csv').write_text(CHAT_SENT_RECEIVED, encoding='utf-8')
+    second = load(folder, tmp_path / 'cache')
+    assert not second.from_cache
+    assert second.fingerprint != first.fingerprint
+    assert len(second.messages) == len(first.messages) + 1
+
+
+def test_supplement_of_cached_case_matches_full_load(tmp_path):
+    folder = tmp_path / 'case'
+    (folder / 'content' / 'text-msg-data').mkdir(parents=True)
+    (folder / 'logs').mkdir()
+    (folder / 'content' / 'text-msg-data' / 'msgs.csv').write_text(LEGACY_CSV, encoding='utf-8')
+    (folder / 'logs' / 'chat_platform_sent.txt').write_text(LEGACY_SENT, encoding='utf-8')
+    load(folder, tmp_path / 'cache')
+    case = load(folder, tmp_path / 'cache')
+    assert case.from_cache
+
+    (folder / 'logs' / 'chat_platform_sent_received.txt').write_text(LEGACY_SENT_RECEIVED, encoding='utf-8')
+    # Changes the source and line of a message whose columns are memory-mapped
+    assert KikIngestEngine(max_workers=1, cache_dir=str(tmp_path / 'cache')).ingest_supplement(case) == 1
+    assert conversation_rows(case) == conversation_rows(load(folder))
+    assert load(folder, tmp_path / 'cache').from_cache
+
+
+def test_cache_hit_logs_timings(folder, tmp_path, caplog):
+    load(folder, tmp_path / 'cache')
+    with caplog.at_level(logging.INFO, logger=kik_ingest.logger.name):
+        case = load(folder, tmp_path / 'cache')
+    assert case.from_cache
+    assert any(r.getMessage().startswith('Ingest timings: ') and 'cache_load=' in r.getMessage()
+               for r in caplog.records)
@@ -0,0 +1,89 @@
+"""Appending to a MessageStore keeps its search index and keyword hits as a rebuild would."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kik_ingest import CATEGORY_FIELDS, MISSING_EPOCH, KeywordHits, MessageStore, SearchIndex
+
+MESSAGES = [
+    ('user0@talk.kik.com', 'user1@talk.kik.com', 'Hello there', 1700849790000),
+    ('user1@talk.kik.com', 'user0@talk.kik.com', 'hello-world, again', 1700849800000),
+    ('user0@talk.kik.com', 'user2@talk.kik.com', 'othello', 1700849900000),
+    ('user2@talk.kik.com', 'user0@talk.kik.com', 'meet at the pier', None),
+    ('user0@talk.kik.com', 'user1@talk.kik.com', 'the pie is gone', 1700849950000),
+    ('user1@talk.kik.com', 'user3@talk.kik.com', 'Pier 39 tomorrow?', 1700850000000),
+]
+QUERIES = ['hello', 'pie', 'pier', 'the pie', 'user1', 'kik.com', '2023-11-24', 'missing', '']
+
+
+def columns(messages, first=0):
+    """Constructor columns for (sender, receiver, message, sent_at_ms) tuples."""
+    ms = np.array([MISSING_EPOCH if t is None else t for _, _, _, t in messages], dtype=np.int64)
+    n = len(messages)
+    cols = {f: [''] * n for f in CATEGORY_FIELDS}
+    cols['sender'] = [m[0] for m in messages]
+    cols['receiver'] = cols['receiver_jid'] = [m[1] for m in messages]
+    cols['content_id'] = [f'c{first + i}' for i in range(n)]
+    cols['source'] = ['data-text.csv'] * n
+    cols['msg_id'] = [f't{first + i}' for i in range(n)]
+    cols['message'] = [m[2] for m in messages]
+    cols['line_number'] = [str(first + i + 2) for i in range(n)]
+    cols['sent_at_ms'] = ms
+    cols['sent_at'] = np.where(ms == MISSING_EPOCH, MISSING_EPOCH, ms * 1_000_000)
+    return cols
+
+
+@pytest.fixture
+def stores():
+    """(store built from the first rows and then appended to, store built from all rows)."""
+    grown = MessageStore(columns(MESSAGES[:3]))
+    grown.append(columns(MESSAGES[3:], first=3))
+    return grown, MessageStore(columns(MESSAGES))
+
+
+@pytest.mark.parametrize('whole_word', [False, True])
+def test_search_index_update_matches_rebuild(stores, whole_word):
+    grown, full = stores
+    index = SearchIndex(MessageStore(columns(MESSAGES[:3])))
+    index.store.append(columns(MESSAGES[3:], first=3))
+    index.update()
+    for query in QUERIES:
+        expected = full.search_rows(query, whole_word)
+        assert grown.search_rows(query, whole_word).tolist() == expected.tolist(), query
+        assert index.search(query, whole_word).tolist() == expected.tolist(), query
+        assert SearchIndex(full).search(query, whole_word).tolist() == expected.tolist(), query
+
+
+@pytest.mark.parametrize('whole_word', [False, True])
+def test_keyword_hits_update_matches_add(whole_word):
+    keywords = ['pie', 'hello', 'tomorrow']
+    store = MessageStore(columns(MESSAGES[:3]))
+    hits = KeywordHits(store)
+    hits.add({'list': (keywords, whole_word)})
+    store.append(columns(MESSAGES[3:], first=3))
+    assert hits.mask(keywords, whole_word) is None  # Does not cover the new rows yet
+    hits.update()
+
+    fresh = KeywordHits(MessageStore(columns(MESSAGES)))
+    fresh.add({'list': (keywords, whole_word)})
+    updated, expected = hits.get(keywords, whole_word), fresh.get(keywords, whole_word)
+    assert updated.size == expected.size == len(MESSAGES)
+    assert updated.mask().tolist() == expected.mask().tolist()
+    assert [updated.term_ids(row) for row in range(len(MESSAGES))] == \
+        [expected.term_ids(row) for row in range(len(MESSAGES))]
+    assert hits.get(list(keywords), whole_word) is None  # Found by identity only
+
+
+def test_set_values_changes_only_the_given_rows(stores):
+    store, _ = stores
+    store.set_values([1, 4], {'source': ['msgs.csv; data-text.csv', 'chat.txt'], 'line_number': ['3; 7', '12']})
+    assert [store.value('source', row) for row in range(len(store))] == \
+        ['data-text.csv', 'msgs.csv; data-text.csv', 'data-text.csv', 'data-text.csv', 'chat.txt', 'data-text.csv']
+    assert [store.value('line_number', row) for row in range(len(store))] == ['2', '3; 7', '4', '5', '12', '7']
+    assert store.value('message', 4) == 'the pie is gone'
+    with pytest.raises(ValueError):
+        store.set_values([0], {'message': ['changed']})
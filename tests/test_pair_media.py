@@ -0,0 +1,39 @@
+"""Media pairing when a (content_id, epoch second) key repeats."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kik_ingest import KikIngestEngine
+
+DATA_MEDIA = (
+    'id,sender_id,receiver_id,message,sent_at_ts,content_id,filename,ip,port,app_name\n'
+    'md0,user0@talk.kik.com,user1@talk.kik.com,,1700849790000,mcid0,mcid0.jpg,10.2.2.2,8080,kik-media\n'
+    'md1,user0@talk.kik.com,user1@talk.kik.com,,1700849790500,mcid0,mcid0.jpg,10.2.2.2,9090,kik-media\n'
+)
+GROUP_SEND = (
+    'ts,epoch,sender,receiver,group_jid,cid,sender_ip,app_name\n'
+    '2023-11-24 18:16:30,1700849790870,user0@talk.kik.com,150000_g@groups.kik.com,150000@groups.kik.com,mcid0,10.3.3.3,\n'
+    '2023-11-24 18:16:30,1700849790100,user0@talk.kik.com,150000_g@groups.kik.com,150000@groups.kik.com,mcid0,10.3.3.3,\n'
+)
+
+
+def test_duplicate_key_pairs_first_rows(tmp_path):
+    (tmp_path / 'content').mkdir()
+    (tmp_path / 'logs').mkdir()
+    (tmp_path / 'content' / 'data-media.csv').write_text(DATA_MEDIA, encoding='utf-8')
+    (tmp_path / 'logs' / 'group_send_msg_platform.csv').write_text(GROUP_SEND, encoding='utf-8')
+    engine = KikIngestEngine(max_workers=1)
+    case = engine.ingest(engine.discover(str(tmp_path)))
+    store = case.messages
+    messages = sorted(
+        (store[row]['source'], str(store[row]['line_number']), store[row]['port'])
+        for row in range(len(store))
+    )
+    # Each data-media row claims a group_send row, but both pairs are built from the
+    # first row of each file; the second group_send row also stays as it was parsed.
+    assert messages == [
+        ('group_send_msg_platform.csv', '2', '8080'),
+        ('group_send_msg_platform.csv', '3', '8080'),
+        ('logs/group_send_msg_platform.csv', '3', ''),
+    ]
@@ -0,0 +1,36 @@
+"""Duplicate merging across the productions of a session."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kik_ingest import KikIngestEngine
+
+HEADER = 'id,sender_id,receiver_id,message,sent_at_ts,content_id,ip,port,app_name\n'
+# The same message twice in one return (same duplicate key), and once in the other
+TWICE = (
+    HEADER +
+    'a0,user0@talk.kik.com,user1@talk.kik.com,hello,1700849790000,c0,10.0.0.1,80,kik\n'
+    'a1,user0@talk.kik.com,user1@talk.kik.com,hello,1700849790500,c0,10.0.0.1,80,kik\n'
+)
+ONCE = HEADER + 'b0,user0@talk.kik.com,user1@talk.kik.com,hello,1700849790000,c0,10.0.0.1,80,kik\n'
+
+
+def make_return(folder, data_text):
+    (folder / 'content').mkdir(parents=True)
+    (folder / 'logs').mkdir()
+    (folder / 'content' / 'data-text.csv').write_text(data_text, encoding='utf-8')
+    return str(folder)
+
+
+def test_rows_of_one_csv_only_return_stay_apart(tmp_path):
+    folders = [make_return(tmp_path / 'prodA', TWICE), make_return(tmp_path / 'prodB', ONCE)]
+    session = KikIngestEngine(max_workers=1).ingest_productions(folders)
+    store = session.messages
+    messages = sorted((store[row]['msg_id'], store[row]['production'], store[row]['source'], store[row]['line_number'])
+                      for row in range(len(store)))
+    # Loaded alone, prodA keeps both rows; in the session its first row merges with prodB's
+    assert messages == [
+        ('a0', 'prodA; prodB', 'prodA/data-text.csv; prodB/data-text.csv', '2; 2'),
+        ('a1', 'prodA', 'content/data-text.csv', '3'),
+    ]
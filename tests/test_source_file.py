@@ -0,0 +1,35 @@
+"""Line numbers of parsed rows are the file lines their records start on."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kik_ingest import SourceFile, parse_new_content_csv
+
+DATA_TEXT = (
+    'id,sender_id,receiver_id,message,sent_at_ts,content_id,ip,port,app_name\n'
+    't0,user0@talk.kik.com,user1@talk.kik.com,hello,1700849790000,c0,10.0.0.1,80,kik\n'
+    '\n'
+    't1,user1@talk.kik.com,user0@talk.kik.com,"two\n'
+    'lines, ""quoted""",1700849800000,c1,10.0.0.2,80,kik\n'
+    't2,user0@talk.kik.com,user1@talk.kik.com,"blank line inside\n'
+    '\n'
+    'the quotes",1700849810000,c2,10.0.0.1,80,kik\n'
+    't3,user0@talk.kik.com,user1@talk.kik.com,last,1700849820000,c3,10.0.0.1,80,kik\n'
+    '\n'
+)
+
+
+@pytest.mark.parametrize('block_size', [SourceFile.BLOCK_SIZE, 7])
+@pytest.mark.parametrize('chunk_budget', [None, 1])
+def test_line_numbers_follow_file_lines(tmp_path, monkeypatch, block_size, chunk_budget):
+    path = tmp_path / 'data-text.csv'
+    path.write_bytes(DATA_TEXT.encode('utf-8'))
+    # Small blocks split records, quoted newlines and blank lines across reads
+    monkeypatch.setattr(SourceFile, 'BLOCK_SIZE', block_size)
+    df = parse_new_content_csv(str(path), 'content/data-text.csv', chunk_budget=chunk_budget)
+    assert df['msg_id'].tolist() == ['t0', 't1', 't2', 't3']
+    assert df['line_number'].astype(str).tolist() == ['2', '4', '6', '9']
+    assert df['msg'].tolist()[1] == 'two\nlines, "quoted"'
@@ -0,0 +1,86 @@
+"""A supplemental load leaves the case as a full load of the folder would."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kik_ingest import KikIngestEngine
+
+DATA_TEXT = (
+    'id,sender_id,receiver_id,message,sent_at_ts,content_id,ip,port,app_name\n'
+    't0,user0@talk.kik.com,user1@talk.kik.com,hello,1700849790000,c0,10.0.0.1,80,kik\n'
+    't1,user1@talk.kik.com,user0@talk.kik.com,reply,1700849800000,c1,10.0.0.2,80,kik\n'
+    't2,user0@talk.kik.com,user1@talk.kik.com,later,1700849900000,c2,10.0.0.1,80,kik\n'
+)
+CHAT_SENT = (
+    'ts,user_jid,friend_user_jid,cid,ip\n'
+    '1700849790400,user0@talk.kik.com,user1@talk.kik.com,c0,10.0.0.1\n'
+)
+CHAT_SENT_RECEIVED = (
+    'ts,user_jid,friend_user_jid,cid,ip\n'
+    '1700849800200,user1@talk.kik.com,user0@talk.kik.com,c1,10.0.0.2\n'
+    '1700849850000,user0@talk.kik.com,user1@talk.kik.com,c3,10.0.0.1\n'
+    '1700849790900,user0@talk.kik.com,user1@talk.kik.com,c0,10.0.0.1\n'
+)
+
+LEGACY_CSV = (
+    'msg_id,sender_jid,receiver_jid,msg,sent_at,content_id,ip\n'
+    'c0,user0@talk.kik.com,user1@talk.kik.com,hello,2023-11-24 18:16:30,c0,10.0.0.1\n'
+    'c1,user1@talk.kik.com,user0@talk.kik.com,reply,2023-11-24 18:16:40,c1,10.0.0.2\n'
+    'c2,user0@talk.kik.com,user1@talk.kik.com,later,2023-11-24 18:18:20,c2,10.0.0.1\n'
+)
+LEGACY_SENT = '1700849790000\tuser0@talk.kik.com\tuser1@talk.kik.com\tkik\tc0\t10.0.0.1\t2023-11-24 18:16:30\n'
+LEGACY_SENT_RECEIVED = (
+    '1700849800000\tuser1@talk.kik.com\tuser0@talk.kik.com\tkik\tc1\t10.0.0.2\t2023-11-24 18:16:40\n'
+    '1700849850000\tuser0@talk.kik.com\tuser1@talk.kik.com\tkik\tc3\t10.0.0.1\t2023-11-24 18:17:30\n'
+    '1700849790000\tuser0@talk.kik.com\tuser1@talk.kik.com\tkik\tc0\t10.0.0.1\t2023-11-24 18:16:30\n'
+)
+LEGACY_SENT_MORE = '1700849900000\tuser0@talk.kik.com\tuser1@talk.kik.com\tkik\tc2\t10.0.0.1\t2023-11-24 18:18:20\n'
+
+
+def conversation_rows(case):
+    return {
+        conv_id: [(m['msg_id'], m['source'], m['line_number'], m['sent_at_ms']) for m in conversation]
+        for conv_id, conversation in case.conversations.items()
+    }
+
+
+def full_load(folder):
+    engine = KikIngestEngine(max_workers=1)
+    return engine.ingest(engine.discover(str(folder)))
+
+
+def test_new_format_supplement_matches_full_load(tmp_path):
+    (tmp_path / 'content').mkdir()
+    (tmp_path / 'logs').mkdir()
+    (tmp_path / 'content' / 'data-text.csv').write_text(DATA_TEXT, encoding='utf-8')
+    (tmp_path / 'logs' / 'chat_platform_sent.csv').write_text(CHAT_SENT, encoding='utf-8')
+    case = full_load(tmp_path)
+    (tmp_path / 'logs' / 'chat_platform_sent_received.csv').write_text(CHAT_SENT_RECEIVED, encoding='utf-8')
+
+    # CSV logs are content-type sources, so nothing merges and every log row is a message
+    assert KikIngestEngine(max_workers=1).ingest_supplement(case) == 3
+    assert conversation_rows(case) == conversation_rows(full_load(tmp_path))
+
+
+def test_legacy_supplement_merges_like_full_load(tmp_path):
+    (tmp_path / 'content' / 'text-msg-data').mkdir(parents=True)
+    (tmp_path / 'logs').mkdir()
+    (tmp_path / 'content' / 'text-msg-data' / 'msgs.csv').write_text(LEGACY_CSV, encoding='utf-8')
+    sent = tmp_path / 'logs' / 'chat_platform_sent.txt'
+    sent.write_text(LEGACY_SENT, encoding='utf-8')
+    case = full_load(tmp_path)
+    engine = KikIngestEngine(max_workers=1)
+
+    (tmp_path / 'logs' / 'chat_platform_sent_received.txt').write_text(LEGACY_SENT_RECEIVED, encoding='utf-8')
+    assert engine.ingest_supplement(case) == 1
+    rows = conversation_rows(case)
+    assert rows == conversation_rows(full_load(tmp_path))
+    hello = next(m for m in rows[('user0@talk.kik.com', 'user1@talk.kik.com')] if m[0] == 'c0')
+    assert hello[1:3] == ('msgs.csv; chat_platform_sent.txt; chat_platform_sent_received.txt', '2; 1; 3')
+
+    # A changed file is parsed again: its old rows add nothing, its new row joins the CSV message
+    sent.write_text(LEGACY_SENT + LEGACY_SENT_MORE, encoding='utf-8')
+    os.utime(sent, ns=(sent.stat().st_atime_ns, sent.stat().st_mtime_ns + 10**9))
+    assert engine.ingest_supplement(case) == 0
+    assert conversation_rows(case) == conversation_rows(full_load(tmp_path))
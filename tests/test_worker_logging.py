@@ -0,0 +1,43 @@
+"""Log records from parser processes reach the parent's handlers exactly once."""
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import kik_ingest
+from kik_ingest import KikIngestEngine
+
+DATA_TEXT = (
+    'id,sender_id,receiver_id,message,sent_at_ts,ip,port,app_name\n'
+    'mt0,user0@talk.kik.com,user1@talk.kik.com,hello,1700849790000,10.2.2.2,8080,kik\n'
+)
+DATA_MEDIA = (
+    'id,sender_id,receiver_id,message,sent_at_ts,content_id,filename,ip,port,app_name\n'
+    'md0,user0@talk.kik.com,user1@talk.kik.com,,1700849791000,mcid0,mcid0.jpg,10.2.2.2,8080,kik-media\n'
+)
+
+
+def test_worker_records_logged_once(tmp_path, monkeypatch):
+    (tmp_path / 'content').mkdir()
+    (tmp_path / 'logs').mkdir()
+    (tmp_path / 'content' / 'data-text.csv').write_text(DATA_TEXT, encoding='utf-8')
+    (tmp_path / 'content' / 'data-media.csv').write_text(DATA_MEDIA, encoding='utf-8')
+    monkeypatch.setattr(kik_ingest, 'PARALLEL_MIN_BYTES', 0)
+    log_path = tmp_path / 'kik.log'
+    handler = logging.FileHandler(log_path, encoding='utf-8')
+    level = kik_ingest.logger.level
+    kik_ingest.logger.addHandler(handler)
+    kik_ingest.logger.setLevel(logging.INFO)
+    try:
+        engine = KikIngestEngine(max_workers=2)
+        case = engine.ingest(engine.discover(str(tmp_path)))
+    finally:
+        kik_ingest.logger.removeHandler(handler)
+        kik_ingest.logger.setLevel(level)
+        handler.close()
+    assert [stat['parser'] for stat in case.file_stats] == ['parse_new_content_csv'] * 2
+    lines = log_path.read_text(encoding='utf-8').splitlines()
+    assert any('with 2 worker(s)' in line for line in lines), lines
+    for name in ('content/data-text.csv', 'content/data-media.csv'):
+        assert sum(line.startswith(f'Loaded {name}:') for line in lines) == 1, lines